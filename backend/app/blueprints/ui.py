@@ -1,17 +1,182 @@
-from flask import Blueprint, render_template, send_from_directory, current_app
-from pathlib import Path
+from flask import Blueprint, Response, abort, render_template, send_file, send_from_directory, current_app, request
+from functools import lru_cache
+import hashlib
+import mimetypes
+import os
 
 ui_bp = Blueprint('ui', __name__)
 
+# Resolved Vite build directory (static/app), captured once at registration
+_APP_DIR: str | None = None
+_ICONS_DIR: str | None = None
+
+# Relative paths of every file in the build output. The build is immutable at
+# runtime, so membership replaces a stat() per request (debug mode still stats).
+_ASSET_SET: frozenset[str] = frozenset()
+
+# Vite content-hashes everything under assets/, so those files never change
+ASSET_MAX_AGE = 31536000  # 1 year
+
+# Icon filenames carry no content hash, so browsers may reuse them for a day
+# and then revalidate with the ETag instead of treating them as immutable
+ICON_MAX_AGE = 86400  # 1 day
+
+# Pre-compressed siblings emitted by the Vite build, in preference order
+_PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+# Fixed-name PWA files (also served from the site root), with their content types
+_KNOWN_FILES = {
+    'sw.js': 'application/javascript',
+    'manifest.webmanifest': 'application/manifest+json',
+    'manifest.json': 'application/json',
+    'offline.html': 'text/html',
+}
+
+# Served in place of a known file the build did not emit
+_KNOWN_FILE_FALLBACKS = {'manifest.json': 'manifest.webmanifest'}
+
+# name -> (abs_path, mimetype), resolved once at registration
+_KNOWN_FILE_META: dict[str, tuple[str, str]] = {}
+
+
+def _scan_build(app_dir: str) -> frozenset[str]:
+    """Collect '/'-separated relative paths of all files under app_dir"""
+    files = set()
+    for root, _dirs, names in os.walk(app_dir):
+        rel_root = os.path.relpath(root, app_dir)
+        for name in names:
+            rel = name if rel_root == '.' else os.path.join(rel_root, name)
+            files.add(rel.replace(os.sep, '/'))
+    return frozenset(files)
+
+
+def _stat_known_file(app_dir: str, name: str) -> tuple[str, str] | None:
+    """Resolve path and content type for a fixed-name file, if the build has it"""
+    path = os.path.join(app_dir, name)
+    if not os.path.isfile(path):
+        return None
+    return path, _KNOWN_FILES[name]
+
+
+def _load_build(static_folder: str):
+    """Resolve the Vite build directory and warm the asset set"""
+    global _APP_DIR, _ICONS_DIR, _ASSET_SET
+    _APP_DIR = os.path.join(static_folder, 'app')
+    _ICONS_DIR = os.path.join(_APP_DIR, 'icons')
+    _ASSET_SET = _scan_build(_APP_DIR)
+    _KNOWN_FILE_META.clear()
+    for name in _KNOWN_FILES:
+        meta = _stat_known_file(_APP_DIR, name)
+        if meta:
+            _KNOWN_FILE_META[name] = meta
+
+
+@ui_bp.record_once
+def _capture_app_dir(state):
+    """Resolve the Vite build directory once when the blueprint is registered"""
+    _load_build(state.app.static_folder)
+
+
+def _get_app_dir() -> str:
+    """Return the cached Vite build directory, resolving lazily if needed"""
+    if _APP_DIR is None:
+        _load_build(current_app.static_folder)
+    return _APP_DIR
+
+
+def _has_file(path: str) -> bool:
+    """Check whether the build output contains path"""
+    if current_app.debug:
+        # Dev rebuilds change the output underneath us
+        return os.path.isfile(os.path.join(_get_app_dir(), path))
+    return path in _ASSET_SET
+
+def _get_known_file(name: str) -> tuple[str, str] | None:
+    """Look up a fixed-name file's cached metadata (re-stat in debug mode)"""
+    if current_app.debug:
+        return _stat_known_file(_get_app_dir(), name)
+    _get_app_dir()  # ensures the build metadata is loaded
+    return _KNOWN_FILE_META.get(name)
+
+
+def _send_known_file(name: str) -> Response:
+    """
+    Send a fixed-name build file from its pre-resolved path and content type,
+    skipping send_from_directory's safe_join and mimetype guessing. send_file
+    still handles X-Sendfile (USE_X_SENDFILE), ETags and conditional requests
+    like every other static route.
+    """
+    meta = _get_known_file(name)
+    if meta is None:
+        abort(404)
+    path, mimetype = meta
+    return _apply_cache_headers(send_file(path, mimetype=mimetype), name)
+
+def _apply_cache_headers(resp, path: str):
+    """
+    Hashed Vite bundles are cached forever; entry points (index.html, sw.js,
+    manifests) must revalidate so new builds are picked up via ETag.
+    """
+    resp.cache_control.no_cache = None
+    if path.startswith('assets/'):
+        resp.cache_control.public = True
+        resp.cache_control.max_age = ASSET_MAX_AGE
+        resp.cache_control.immutable = True
+    else:
+        resp.cache_control.max_age = 0
+        resp.cache_control.must_revalidate = True
+    return resp
+
+def _send_asset(app_dir: str, path: str):
+    """Serve a build file, preferring a pre-compressed .br/.gz sibling"""
+    if not path.startswith('assets/'):
+        return send_from_directory(app_dir, path)
+    
+    accepted = request.accept_encodings
+    for encoding, suffix in _PRECOMPRESSED:
+        if accepted[encoding] and _has_file(path + suffix):
+            resp = send_from_directory(app_dir, path + suffix,
+                                       mimetype=mimetypes.guess_type(path)[0])
+            resp.content_encoding = encoding
+            break
+    else:
+        resp = send_from_directory(app_dir, path)
+    
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+@lru_cache(maxsize=8)
+def _render_shell(name: str, mtime: float) -> tuple[str, str]:
+    """
+    Render a context-free page shell once and hash it for a strong ETag.
+    mtime in the key invalidates the entry when the template is edited.
+    """
+    html = render_template(name)
+    return html, hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+def _shell_response(name: str) -> Response:
+    """Serve a dashboard shell from the render cache, honouring If-None-Match"""
+    mtime = 0.0
+    if current_app.debug:
+        # Pick up template edits during development
+        mtime = os.stat(os.path.join(current_app.template_folder, name)).st_mtime
+    
+    html, etag = _render_shell(name, mtime)
+    resp = Response(html, mimetype='text/html')
+    resp.set_etag(etag)
+    _apply_cache_headers(resp, name)
+    return resp.make_conditional(request)
+
 @ui_bp.route('/')
 def index():
     """Main mobile dashboard"""
-    return render_template('mobile.html')
+    return _shell_response('mobile.html')
 
 @ui_bp.route('/modern')
 def modern_dashboard():
     """Legacy React+Tailwind Prototype"""
-    return render_template('modern_dashboard.html')
+    return _shell_response('modern_dashboard.html')
 
 @ui_bp.route('/app')
 def app_root():
@@ -20,44 +185,28 @@ def app_root():
 
 @ui_bp.route('/app/')
 @ui_bp.route('/app/<path:path>')
+@ui_bp.route('/<any(%s):path>' % ', '.join(f'"{name}"' for name in _KNOWN_FILES))
 def serve_vite_app(path=''):
-    """Serve the Vite-built React app"""
-    # static_folder is defined in create_app from helper config
-    app_dir = Path(current_app.static_folder) / 'app'
+    """Serve the Vite-built React app and its root-level PWA files"""
+    if path in _KNOWN_FILES:
+        # Vite PWA might generate manifest.webmanifest or manifest.json depending on config
+        if not _get_known_file(path) and path in _KNOWN_FILE_FALLBACKS:
+            path = _KNOWN_FILE_FALLBACKS[path]
+        return _send_known_file(path)
     
-    # If path exists as a file, serve it
-    if path and (app_dir / path).exists():
-        return send_from_directory(app_dir, path)
+    app_dir = _get_app_dir()
+    
+    # If path is a file in the build output, serve it
+    if path and _has_file(path):
+        return _apply_cache_headers(_send_asset(app_dir, path), path)
     
     # Otherwise serve index.html (for SPA routing)
-    return send_from_directory(app_dir, 'index.html')
-
-@ui_bp.route('/sw.js')
-def serve_service_worker():
-    """Serve service worker from build output"""
-    app_dir = Path(current_app.static_folder) / 'app'
-    return send_from_directory(app_dir, 'sw.js', mimetype='application/javascript')
-
-@ui_bp.route('/manifest.webmanifest')
-def serve_manifest_alias():
-    app_dir = Path(current_app.static_folder) / 'app'
-    return send_from_directory(app_dir, 'manifest.webmanifest', mimetype='application/manifest+json')
-
-@ui_bp.route('/manifest.json')
-def serve_manifest():
-    app_dir = Path(current_app.static_folder) / 'app'
-    # Vite PWA might generate manifest.webmanifest or manifest.json depending on config
-    # Creating a fallback
-    if (app_dir / 'manifest.json').exists():
-        return send_from_directory(app_dir, 'manifest.json', mimetype='application/json')
-    return send_from_directory(app_dir, 'manifest.webmanifest', mimetype='application/manifest+json')
+    return _apply_cache_headers(send_from_directory(app_dir, 'index.html'), 'index.html')
 
 @ui_bp.route('/icons/<path:filename>')
 def serve_icons(filename):
-    app_dir = Path(current_app.static_folder) / 'app'
-    return send_from_directory(app_dir / 'icons', filename)
-
-@ui_bp.route('/offline.html')
-def serve_offline():
-    app_dir = Path(current_app.static_folder) / 'app'
-    return send_from_directory(app_dir, 'offline.html')
+    """Serve PWA icons; unhashed names, so cached briefly and revalidated by ETag"""
+    _get_app_dir()  # ensures the build metadata is loaded
+    resp = send_from_directory(_ICONS_DIR, filename, max_age=ICON_MAX_AGE)
+    resp.cache_control.public = True
+    return resp
@@ -1,20 +1,49 @@
-from datetime import datetime
-import json
+import copy
+import threading
 from pathlib import Path
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Text, Boolean, Float, ForeignKey
+from sqlalchemy import create_engine, event, Index, Column, String, Integer, DateTime, Text, Boolean, Float, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.sql import func
+from backend.app.core import json_utils
 
 Base = declarative_base()
 
+
+def _decode_json_column(instance, column: str, cache_key: str) -> dict:
+    """
+    Decode a JSON text column, parsing each distinct raw value only once.
+    
+    The decoded value is cached on the instance next to the raw string it came
+    from, so a reload or direct write of the column invalidates it naturally.
+    Callers get a copy: changes only reach the column through the setter, so
+    editing the returned dict in place can't leave it out of step with the
+    stored JSON.
+    """
+    raw = getattr(instance, column)
+    cached = instance.__dict__.get(cache_key)
+    if cached is None or cached[0] is not raw:
+        cached = (raw, json_utils.loads(raw) if raw else {})
+        instance.__dict__[cache_key] = cached
+    return copy.deepcopy(cached[1])
+
+
+def _encode_json_column(instance, column: str, cache_key: str, value: dict):
+    """Serialize value into a JSON text column and prime the decode cache"""
+    raw = json_utils.dumps(value)
+    setattr(instance, column, raw)
+    instance.__dict__[cache_key] = (raw, copy.deepcopy(value))
+
 class JobModel(Base):
     """Database model for queue jobs"""
     __tablename__ = 'jobs'
+    # Fetch server-generated timestamps in the INSERT (RETURNING) itself
+    __mapper_args__ = {'eager_defaults': True}
     
     id = Column(String(10), primary_key=True)
     folder_path = Column(Text, nullable=False)
     folder_name = Column(String(255), nullable=False)
-    status = Column(String(20), default='pending')
+    status = Column(String(20), default='pending', index=True)
     listing_id = Column(String(50))
     offer_id = Column(String(50))
     price = Column(String(20))
@@ -22,43 +51,91 @@ class JobModel(Base):
     error_message = Column(Text)
     attempts = Column(Integer, default=0)
     max_attempts = Column(Integer, default=3)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Timestamps are produced by SQLite. The SQL-expression default covers
+    # databases created before the server_default existed.
+    created_at = Column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     timing_json = Column(Text)  # Stores JSON string of timing data
     
     @property
     def timing(self):
-        return json.loads(self.timing_json) if self.timing_json else {}
+        return _decode_json_column(self, 'timing_json', '_timing_cache')
     
     @timing.setter
     def timing(self, value):
-        self.timing_json = json.dumps(value)
+        _encode_json_column(self, 'timing_json', '_timing_cache', value)
+
+# Queue dispatch filters on status and orders by age
+Index('ix_jobs_status_created', JobModel.status, JobModel.created_at)
 
 class TemplateModel(Base):
     """Database model for listing templates"""
     __tablename__ = 'templates'
+    __mapper_args__ = {'eager_defaults': True}
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), unique=True, nullable=False)
     data_json = Column(Text, nullable=False)  # Stores the template configuration
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
+    # SQLite has no ON UPDATE, so the refresh is emitted as SQL by the ORM
+    updated_at = Column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp(),
+                        onupdate=func.current_timestamp())
     use_count = Column(Integer, default=0)
     
     @property
     def data(self):
-        return json.loads(self.data_json) if self.data_json else {}
+        return _decode_json_column(self, 'data_json', '_data_cache')
     
     @data.setter
     def data(self, value):
-        self.data_json = json.dumps(value)
+        _encode_json_column(self, 'data_json', '_data_cache', value)
 
 # Database Setup
+# Applied to every new SQLite connection: WAL lets the web thread read while the
+# queue worker writes, and synchronous=NORMAL is durable enough under WAL.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",     # 64 MB page cache
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+)
+
 def get_db_engine(db_path: Path):
-    return create_engine(f"sqlite:///{db_path}")
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False},
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+    
+    return engine
+
+def _ensure_indexes(engine):
+    """create_all() skips indexes on tables that already exist; add any missing ones"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+# One (engine, session factory) pair per database file, shared by every caller
+# so connection pools and per-connection PRAGMA state are reused.
+_ENGINES: dict[str, tuple] = {}
+_ENGINES_LOCK = threading.Lock()
 
 def init_db(db_path: Path):
-    engine = get_db_engine(db_path)
-    Base.metadata.create_all(engine)
-    return sessionmaker(bind=engine)
+    key = str(Path(db_path).resolve())
+    with _ENGINES_LOCK:
+        if key not in _ENGINES:
+            engine = get_db_engine(db_path)
+            Base.metadata.create_all(engine)
+            _ensure_indexes(engine)
+            # Sessions are short-lived; keep loaded values after commit
+            # instead of re-fetching every row on next attribute access.
+            _ENGINES[key] = (engine, sessionmaker(bind=engine, expire_on_commit=False))
+        return _ENGINES[key][1]
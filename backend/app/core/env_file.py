@@ -0,0 +1,68 @@
+"""
+Cached .env parsing for eBay Draft Commander.
+
+eBay clients read their credentials from .env every time they are built,
+and Flask handlers build them per request. The parsed file is memoized on
+(path, inode, mtime, size), so repeat reads are a stat() call and a token
+save (which rewrites the file) is picked up on the next read. Writes go
+through write_env, which swaps the file in atomically so a crash mid-write
+can't leave readers a truncated .env.
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+from dotenv import dotenv_values
+
+
+@lru_cache(maxsize=4)
+def _parse_env(path_str: str, inode: int, mtime: float, size: int) -> Dict[str, str]:
+    """
+    Parse the file with python-dotenv; inode/mtime/size are only part of the cache key.
+
+    dotenv handles quoted values, escapes, `export` prefixes and inline
+    comments. Bare keys without a value are dropped, as before.
+    """
+    return {key: value for key, value in dotenv_values(path_str).items() if value is not None}
+
+
+def read_env(env_path: Path) -> Dict[str, str]:
+    """
+    Read a .env file, reusing the parsed result while the file is unchanged.
+
+    Args:
+        env_path: Path to the .env file
+
+    Returns:
+        Dict of settings (a copy, safe to modify); empty if the file is missing
+    """
+    try:
+        stat = env_path.stat()
+    except OSError:
+        return {}
+    return dict(_parse_env(str(env_path), stat.st_ino, stat.st_mtime, stat.st_size))
+
+
+def write_env(env_path: Path, content: str):
+    """
+    Replace a .env file's contents atomically.
+
+    The new contents are written to a sibling temp file and moved over the
+    original with os.replace, so readers see either the old file or the
+    new one, never a partial write.
+
+    Args:
+        env_path: Path to the .env file
+        content: Full new file contents
+    """
+    tmp_path = env_path.with_name(env_path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, env_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
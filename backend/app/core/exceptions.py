@@ -101,6 +101,18 @@ class SettingsError(DraftCommanderError):
 # Helper Functions
 # ============================================================================
 
+# HTTP status -> exception class; anything unlisted maps to eBayAPIError
+_STATUS_EXCEPTIONS = {
+    400: eBayValidationError,
+    401: eBayAuthError,
+    404: eBayNotFoundError,
+    429: eBayRateLimitError,
+    502: eBayTimeoutError,
+    503: eBayTimeoutError,
+    504: eBayTimeoutError,
+}
+
+
 def from_http_status(status_code: int, message: str = None) -> eBayAPIError:
     """
     Create appropriate eBay exception from HTTP status code.
@@ -117,16 +129,4 @@ def from_http_status(status_code: int, message: str = None) -> eBayAPIError:
             raise from_http_status(response.status_code, response.text)
     """
     msg = message or f"eBay API returned status {status_code}"
-    
-    if status_code == 401:
-        return eBayAuthError(msg)
-    elif status_code == 404:
-        return eBayNotFoundError(msg)
-    elif status_code == 429:
-        return eBayRateLimitError(msg)
-    elif status_code == 400:
-        return eBayValidationError(msg)
-    elif status_code in (502, 503, 504):
-        return eBayTimeoutError(msg)
-    else:
-        return eBayAPIError(msg)
+    return _STATUS_EXCEPTIONS.get(status_code, eBayAPIError)(msg)
@@ -0,0 +1,61 @@
+"""
+Shared HTTP sessions for eBay Draft Commander.
+
+Module-level requests.get() opens a fresh TCP+TLS connection on every call.
+A Session keeps connections alive per host, so service modules create one
+with create_session() at import time and reuse it for all their requests.
+Transient failures (rate limits, gateway errors) are retried with backoff,
+honouring any Retry-After header the server sends. Responses are requested
+compressed with every encoding urllib3 can decode here (brotli when the
+brotli package is installed, else gzip/deflate).
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+# Status codes worth retrying for idempotent requests
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(
+    pool_connections: int = 20,
+    pool_maxsize: int = 50,
+    total_retries: int = 3,
+    backoff_factor: float = 0.3,
+    status_forcelist=RETRY_STATUS_CODES,
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+) -> requests.Session:
+    """
+    Build a requests.Session with a sized keep-alive pool and retry policy.
+
+    Args:
+        pool_connections: Number of per-host pools to cache
+        pool_maxsize: Connections kept alive per host
+        total_retries: Retry budget for connection errors and retryable statuses
+        backoff_factor: Exponential backoff base in seconds
+        status_forcelist: Response codes that trigger a retry
+        allowed_methods: HTTP methods that may be retried (idempotent ones by
+            default; add POST only for endpoints where a repeat is harmless)
+
+    Returns:
+        Session mounted for both http:// and https://. After the last retry
+        the final response is returned rather than raised, so callers keep
+        their existing status_code checks.
+    """
+    retry = Retry(
+        total=total_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=allowed_methods,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    # Only advertise what urllib3 can decode, so 'br' needs brotli installed
+    session.headers.update(make_headers(accept_encoding=True))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
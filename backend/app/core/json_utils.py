@@ -0,0 +1,75 @@
+"""
+Fast JSON helpers for eBay Draft Commander.
+
+Uses orjson when it is installed (a C/Rust encoder several times faster
+than the standard library) and falls back to the stdlib json module
+otherwise, so callers never need to care which one is active.
+"""
+import json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads(data):
+    """
+    Parse JSON from str or bytes.
+
+    Args:
+        data: JSON document as str, bytes or bytearray
+
+    Returns:
+        Decoded Python object
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, sort_keys: bool = False) -> str:
+    """
+    Serialize obj to a compact JSON string.
+
+    Args:
+        obj: JSON-serializable object
+        sort_keys: Emit object keys in sorted order (stable output for hashing)
+
+    Returns:
+        JSON text (str, not bytes)
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, sort_keys=sort_keys)
+
+
+def dumps_bytes(obj) -> bytes:
+    """
+    Serialize obj to compact UTF-8 JSON bytes, ready to send as a request body.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def dumps_indented(obj) -> bytes:
+    """
+    Serialize obj to human-readable JSON indented by two spaces.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        UTF-8 encoded JSON bytes, ready for Path.write_bytes
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
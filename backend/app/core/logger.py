@@ -10,43 +10,69 @@ Provides structured logging with:
 """
 import logging
 import logging.handlers
-import json
 import sys
+import time
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 import traceback
+from backend.app.core import json_utils
 from backend.app.core.paths import get_logs_dir
 
 
+def _exc_text(record: logging.LogRecord) -> str:
+    """
+    Format record.exc_info once and cache it on record.exc_text, following
+    logging.Formatter's contract, so every handler reuses the same string.
+    """
+    if not record.exc_text:
+        record.exc_text = ''.join(traceback.format_exception(*record.exc_info))
+    return record.exc_text
+
+
+def _message(record: logging.LogRecord) -> str:
+    """
+    Interpolate msg % args once per record. get_logger attaches a console and
+    a file handler, each with its own formatter, so the result is cached on
+    the record for the second one.
+    """
+    try:
+        return record._cached_message
+    except AttributeError:
+        record._cached_message = message = record.getMessage()
+        return message
+
+
 class JSONFormatter(logging.Formatter):
     """Format logs as JSON for production environments"""
     
+    # Optional context fields copied from `extra=` when present
+    EXTRA_FIELDS = ('request_id', 'url', 'status_code')
+    
     def format(self, record: logging.LogRecord) -> str:
+        created = record.created
         log_data = {
-            'timestamp': datetime.utcfromtimestamp(record.created).isoformat() + 'Z',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(created))
+                         + f'.{int((created % 1) * 1_000_000):06d}Z',
             'level': record.levelname,
             'module': record.name,
-            'message': record.getMessage(),
+            'message': _message(record),
         }
         
         # Add extra fields if present
-        if hasattr(record, 'request_id'):
-            log_data['request_id'] = record.request_id
-        if hasattr(record, 'url'):
-            log_data['url'] = record.url
-        if hasattr(record, 'status_code'):
-            log_data['status_code'] = record.status_code
+        record_fields = record.__dict__
+        for field in self.EXTRA_FIELDS:
+            if field in record_fields:
+                log_data[field] = record_fields[field]
             
         # Add exception info if present
         if record.exc_info:
             log_data['exception'] = {
                 'type': record.exc_info[0].__name__,
                 'message': str(record.exc_info[1]),
-                'traceback': traceback.format_exception(*record.exc_info)
+                'traceback': _exc_text(record).splitlines(keepends=True)
             }
             
-        return json.dumps(log_data)
+        return json_utils.dumps(log_data)
 
 
 class ColoredFormatter(logging.Formatter):
@@ -61,17 +87,35 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m',      # Reset
     }
     
+    # Pre-rendered "<color>[LEVEL]<reset>" tags
+    LEVEL_TAGS = {
+        level: f"{color}[{level}]\033[0m"
+        for level, color in COLORS.items() if level != 'RESET'
+    }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (whole second, formatted string) - records within a second share it
+        self._last_timestamp = (-1, '')
+    
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, cached = self._last_timestamp
+        if second != cached_second:
+            cached = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+            self._last_timestamp = (second, cached)
+        return cached
+    
     def format(self, record: logging.LogRecord) -> str:
-        color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        reset = self.COLORS['RESET']
+        level = record.levelname
+        tag = self.LEVEL_TAGS.get(level) or f"[{level}]"
         
         # Format: 2026-01-19 14:30:15 [INFO] module_name: Message
-        timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')
-        message = f"{timestamp} {color}[{record.levelname}]{reset} {record.name}: {record.getMessage()}"
+        message = f"{self._timestamp(record.created)} {tag} {record.name}: {_message(record)}"
         
         # Add exception traceback if present
         if record.exc_info:
-            message += '\n' + ''.join(traceback.format_exception(*record.exc_info))
+            message += '\n' + _exc_text(record)
             
         return message
 
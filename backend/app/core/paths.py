@@ -10,11 +10,22 @@ Key Features:
 - Uses user-writable directories for logs and data in production
 - Maintains project-relative paths during development
 - Cross-platform support (Windows, macOS, Linux)
+
+Directories are resolved (and created) once on first use and memoized,
+since they are looked up on hot paths such as logger setup and DB access.
 """
 import sys
 import os
+from functools import cache
 from pathlib import Path
 
+# The execution context cannot change after startup
+_IS_FROZEN = bool(getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'))
+
+# Source-tree locations: backend/app/core/paths.py -> project root
+_CORE_DIR = Path(__file__).parent
+_PROJECT_ROOT = _CORE_DIR.parent.parent.parent
+
 
 def is_frozen() -> bool:
     """
@@ -23,9 +34,10 @@ def is_frozen() -> bool:
     Returns:
         True if running as packaged executable, False if running from source
     """
-    return getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS')
+    return _IS_FROZEN
 
 
+@cache
 def get_app_directory() -> Path:
     """
     Get the appropriate base directory based on execution context.
@@ -65,10 +77,10 @@ def get_app_directory() -> Path:
             return fallback_dir
     else:
         # Running from source - use project root
-        # Navigate up from: backend/app/core/paths.py -> project root
-        return Path(__file__).parent.parent.parent.parent
+        return _PROJECT_ROOT
 
 
+@cache
 def get_logs_dir() -> Path:
     """
     Get the logs directory.
@@ -82,12 +94,13 @@ def get_logs_dir() -> Path:
         log_dir = get_app_directory() / 'logs'
     else:
         # Development: Keep logs next to logger.py for convenience
-        log_dir = Path(__file__).parent / 'logs'
+        log_dir = _CORE_DIR / 'logs'
     
     log_dir.mkdir(parents=True, exist_ok=True)
     return log_dir
 
 
+@cache
 def get_data_dir() -> Path:
     """
     Get the data directory for database and state files.
@@ -102,6 +115,7 @@ def get_data_dir() -> Path:
     return data_dir
 
 
+@cache
 def get_inbox_dir() -> Path:
     """
     Get the inbox directory for raw listing data.
@@ -114,6 +128,7 @@ def get_inbox_dir() -> Path:
     return inbox_dir
 
 
+@cache
 def get_ready_dir() -> Path:
     """
     Get the ready directory for processed listing data.
@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from backend.app.core.env_file import write_env
+
 
 class SettingsManager:
     """Centralized settings management for the application"""
@@ -195,8 +197,7 @@ class SettingsManager:
                 lines.append(f"{key}={value}")
         
         # Write to file
-        with open(self.env_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        write_env(self.env_path, '\n'.join(lines))
     
     def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """
@@ -4,107 +4,147 @@ Uses Gemini to analyze product photos and extract listing data
 Includes Search-Grounded Research Mode for NOS/industrial equipment
 """
 import os
+import io
+import re
+import asyncio
 import base64
+import hashlib
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-import os
-import base64
-import json
-from pathlib import Path
+from string import Template
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+from PIL import Image as PILImage, ImageOps
 
-class AIAnalyzer:
-    """Analyzes product images using Gemini AI"""
-    
-    def __init__(self):
-        """Initialize the Gemini client"""
-        # Robust .env lookup
-        current_path = Path(__file__).resolve()
-        env_path = None
-        for parent in [current_path] + list(current_path.parents):
-            check_path = parent / ".env"
-            if check_path.exists():
-                env_path = check_path
-                break
-        if not env_path:
-             env_path = Path.cwd() / ".env"
-        
-        api_key = None
-        
-        # Load API key custom
-        if env_path and env_path.exists():
-            with open(env_path, 'r') as f:
-                for line in f:
-                    if line.strip().startswith('GOOGLE_API_KEY='):
-                        api_key = line.split('=')[1].strip()
-                        break
-        
-        if not api_key:
-            # Fallback for dev/testing or system env
-            api_key = os.getenv('GOOGLE_API_KEY')
-            
-        if not api_key:
-            print("⚠️ GOOGLE_API_KEY not found in .env")
-            self.client = None
-            return
+from backend.app.core import json_utils
 
-        # Initialize the new GenAI Client
-        self.client = genai.Client(api_key=api_key)
-        print("✅ AI Analyzer initialized (google-genai SDK)")
+# Non-blocking file reads for the async analysis path
+try:
+    import aiofiles
+    HAS_AIOFILES = True
+except ImportError:
+    HAS_AIOFILES = False
 
+# SIMD base64 for encode_image; the stdlib encoder is the fallback
+try:
+    import pybase64
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
 
+# HTTP/2 lets analysis and research calls share one multiplexed connection
+try:
+    import h2  # noqa: F401  (httpx only needs it importable)
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+from backend.app.core.paths import get_data_dir
 
+# Book mode and item-specifics helpers are optional; analysis works without them
+try:
+    from backend.app.services.isbn_scanner import HAS_PYZBAR, ISBNScanner, scan_barcode
+except ImportError:
+    HAS_PYZBAR, ISBNScanner, scan_barcode = False, None, None
+try:
+    from backend.app.services.book_service import BookService
+except ImportError:
+    BookService = None
+try:
+    from backend.app.services.item_specifics_mapper import ItemSpecificsMapper
+except ImportError:
+    ItemSpecificsMapper = None
 
-    
-    def encode_image(self, image_path):
-        """Encode image to base64"""
-        try:
-            with open(image_path, 'rb') as f:
-                return base64.b64encode(f.read()).decode('utf-8')
-        except Exception as e:
-            print(f"⚠️ Could not encode {image_path}: {e}")
-            return None
-    
-    def get_images_from_folder(self, folder_path, max_images=8):
-        """Get all images from a folder"""
-        folder = Path(folder_path)
-        extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.webp']
-        
-        images = []
-        for ext in extensions:
-            images.extend(folder.glob(f'*{ext}'))
-            images.extend(folder.glob(f'*{ext.upper()}'))
-        
-        # Sort by name and limit
-        images = sorted(set(images))[:max_images]
-        return [str(img) for img in images]
-    
-    def analyze_item(self, image_paths):
-        """
-        Analyze images and extract structured listing data
-        
-        Args:
-            image_paths: List of paths to item images
-            
-        Returns:
-            Dict with all extracted listing data
-        """
-        if not image_paths:
-            return {"error": "No images provided"}
-        
-        # Encode all images
-        encoded_images = []
-        for path in image_paths:
-            encoded = self.encode_image(path)
-            if encoded:
-                encoded_images.append(encoded)
-        
-        if not encoded_images:
-            return {"error": "Could not encode any images"}
-        
-        # Build the prompt
-        prompt = """Analyze these product photos for a high-end eBay listing.
+# Only the first photos are checked for an ISBN barcode before Phase 1: a
+# book's cover or back is shot first, and most items aren't books at all
+BARCODE_SCAN_IMAGES = 2
+
+# Upper bound on concurrent image loads (get_images_from_folder caps at 8)
+MAX_DECODE_WORKERS = 8
+
+# Files picked up from an item folder
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+
+# Leading bytes of each supported format (WebP is checked separately)
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',         # JPEG
+    b'\x89PNG\r\n\x1a\n',    # PNG
+    b'BM',                  # BMP
+)
+
+# Formats Gemini accepts as-is; the raw file bytes are sent without decoding
+PASSTHROUGH_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+}
+
+
+# Gemini downsamples large images anyway; bigger photos are resized before upload
+MAX_IMAGE_EDGE = 1024
+JPEG_QUALITY = 85
+
+# Resized copies are kept in a hidden folder next to the originals so re-runs
+# skip the resize (non-recursive image globs elsewhere never see them)
+THUMB_DIR_NAME = '.thumbs'
+
+# Gemini responses are cached on disk so re-running a folder is free
+CACHE_DIR_NAME = 'ai_cache'
+ANALYSIS_MODEL = 'gemini-1.5-pro'
+RESEARCH_MODEL = 'gemini-2.0-flash-exp'
+# Market research goes stale; image analysis only changes with the inputs
+RESEARCH_CACHE_TTL = 7 * 24 * 3600
+
+# Rate limits and transient server errors are retried with backoff
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 2.0
+
+# Output budget: the JSON schema needs a fixed base, and more photos mean
+# more visible labels and specs to report
+MAX_OUTPUT_TOKENS = 4000
+BASE_OUTPUT_TOKENS = 2000
+OUTPUT_TOKENS_PER_IMAGE = 250
+
+# Per-request HTTP timeout (HttpOptions takes milliseconds)
+HTTP_TIMEOUT_MS = 60_000
+
+
+# Listing description for books identified via ISBN
+BOOK_DESCRIPTION_TEMPLATE = Template(
+    "<h2>$title</h2>"
+    "<p><b>Author:</b> $authors<br><b>Publisher:</b> $publisher<br><b>Year:</b> $published</p>"
+    "<p>$description</p>"
+)
+
+# eBay category for ISBN-identified books, and the condition assumed when
+# the barcode scan skips the Gemini pass that would have graded it
+BOOK_CATEGORY_SUGGESTION = 'Books & Magazines > Books'
+BOOK_DEFAULT_CONDITION = {'state': 'Used - Good'}
+
+# Per-phase results of analyze_with_research, written next to ai_data.json
+PHASE1_ARTIFACT = 'phase1.json'
+PHASE2_ARTIFACT = 'phase2_research.json'
+PHASE3_ARTIFACT = 'phase3_specifics.json'
+PHASE3_KEYS = ('item_specifics', 'seo_title', 'condition_id', 'condition_description')
+
+# Condition IDs accepted from the model (see ItemSpecificsMapper.get_condition_id)
+EBAY_CONDITION_IDS = {1000, 1500, 1750, 2000, 2500, 3000, 4000, 5000, 6000, 7000}
+
+# The analyzer handed out by AIAnalyzer.get_instance, once it has a client
+_INSTANCE = None
+_INSTANCE_LOCK = threading.Lock()
+
+# A response wrapped in a single Markdown code fence, with optional json tag
+_FENCE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+# The prompts are byte-identical on every call so Gemini's implicit prefix
+# caching can reuse them; the image Parts always come after the prompt
+ANALYZE_PROMPT = """Analyze these product photos for a high-end eBay listing.
         
 ROLE: You are an expert e-commerce specialist with deep knowledge of:
 - Broadcast/video production equipment (cameras, switchers, routers, converters)
@@ -164,9 +204,17 @@ OUTPUT FORMAT: Return a JSON object with this EXACT structure:
         "price_reasoning": "For NOS/industrial: consider rarity, current availability, and B2B market rates"
     },
     "category_keywords": ["keyword1", "keyword2"],
-    "ebay_category_suggestion": "Best eBay category path (e.g., 'Computers/Tablets > Enterprise Networking > Switches')"
+    "ebay_category_suggestion": "Best eBay category path (e.g., 'Computers/Tablets > Enterprise Networking > Switches')",
+    "item_specifics": {"Brand": "...", "MPN": "...", "Model": "...", "Type": "...", "Compatible Model": "...", "Country/Region of Manufacture": "..."},
+    "seo_title": "80-char max eBay title: Brand MPN ProductType TopCompatibleSystems NOS/NEW",
+    "condition_id": 1000|1500|3000|5000|6000|7000
 }
 
+INSTRUCTIONS FOR 'item_specifics', 'seo_title' AND 'condition_id':
+1. 'item_specifics' keys are eBay item specific names (Brand, MPN, Model, Type, Capacity, Speed, Interface, Voltage, Form Factor, Color, ...). Only include values you can read or are certain of.
+2. 'seo_title' leads with brand and part number, because B2B buyers search by part number.
+3. 'condition_id' is the eBay condition ID: 1000 New, 1500 New (Other) incl. sealed NOS, 3000 Used, 5000 Good, 6000 Acceptable, 7000 For parts.
+
 INSTRUCTIONS FOR 'description' FIELD (HTML_STRING):
 1. Use valid HTML tags: <h2>, <ul>, <li>, <b>, <br>, <p>.
 2. Do NOT use <html>, <head>, or <body> tags.
@@ -196,78 +244,588 @@ INSTRUCTIONS FOR 'description' FIELD (HTML_STRING):
 4. TONE: Professional, technically accurate, B2B-friendly.
 5. ACCURACY: Do not hallucinate specs or accessories not shown in photos."""
 
+# Filled in with str.format(item=...)
+RESEARCH_PROMPT = """Research this industrial equipment part for eBay listing:
 
-        # Prepare content: Modern GenAI SDK accepts text strings and PIL images directly
-        from PIL import Image as PILImage
+Item: {item}
+
+Find and return:
+1. EXACT product specifications (capacity, speed, interface, voltage)
+2. What systems/equipment this is compatible with
+3. Current market price range on eBay in 2026
+4. Whether this is a rare/hard-to-find item
+5. Common alternative part numbers
+
+Return as JSON:
+{{
+    "product_name": "Full product name",
+    "specifications": {{"key": "value"}},
+    "compatible_with": ["system1", "system2"],
+    "market_price": {{"low": 0, "mid": 0, "high": 0, "currency": "USD"}},
+    "availability": "common|moderate|rare|very_rare",
+    "alternative_part_numbers": [],
+    "notes": "Any important details"
+}}"""
+
+
+def _parse_json_response(text):
+    """
+    Decode model output that should be JSON
+    
+    Strips a surrounding code fence; if the text still isn't valid JSON,
+    retries on the outermost {...} span to drop any prose around it.
+    
+    Raises:
+        ValueError: if no JSON object can be recovered
+    """
+    match = _FENCE.match(text)
+    if match:
+        text = match.group(1)
+    try:
+        return json_utils.loads(text)
+    except ValueError:
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end < start:
+            raise
+        return json_utils.loads(text[start:end + 1])
+
+
+def _should_retry(error, attempt) -> bool:
+    """Whether a Gemini APIError on this (0-based) attempt is worth another try"""
+    return error.code in RETRY_STATUS_CODES and attempt < MAX_RETRIES - 1
+
+
+def _backoff(error, attempt) -> float:
+    """Seconds to wait before retrying after attempt, announcing the retry"""
+    delay = RETRY_BASE_DELAY * (2 ** attempt)
+    print(f"⏳ Gemini returned {error.code}, retrying in {delay:.0f}s...")
+    return delay
+
+
+@lru_cache(maxsize=1)
+def _load_api_key():
+    """Read GOOGLE_API_KEY from the nearest .env (or the environment) once per process"""
+    # Robust .env lookup
+    current_path = Path(__file__).resolve()
+    env_path = None
+    for parent in [current_path] + list(current_path.parents):
+        check_path = parent / ".env"
+        if check_path.exists():
+            env_path = check_path
+            break
+    if not env_path:
+         env_path = Path.cwd() / ".env"
+    
+    api_key = None
+    
+    # Load API key custom
+    if env_path and env_path.exists():
+        env = dict(
+            line.strip().split('=', 1)
+            for line in env_path.read_text().splitlines()
+            if '=' in line and not line.lstrip().startswith('#')
+        )
+        api_key = env.get('GOOGLE_API_KEY', '').strip()
+    
+    if not api_key:
+        # Fallback for dev/testing or system env
+        api_key = os.getenv('GOOGLE_API_KEY')
+    
+    return api_key
+
+
+def _has_image_signature(path) -> bool:
+    """Check the first 12 bytes so renamed non-images are never uploaded"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(12)
+    except OSError:
+        return False
+    return head.startswith(IMAGE_SIGNATURES) or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')
+
+
+def _thumb_path(path) -> Path:
+    path = Path(path)
+    return path.parent / THUMB_DIR_NAME / f"{path.name}.jpg"
+
+
+def _read_thumb(path):
+    """Return cached resized bytes if they are newer than the original"""
+    thumb = _thumb_path(path)
+    try:
+        if thumb.stat().st_mtime >= os.stat(path).st_mtime:
+            return thumb.read_bytes()
+    except OSError:
+        pass
+    return None
+
+
+def _write_thumb(path, data: bytes):
+    """Persist resized bytes atomically; caching is best-effort"""
+    thumb = _thumb_path(path)
+    try:
+        thumb.parent.mkdir(exist_ok=True)
+        tmp = thumb.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, thumb)
+    except OSError as e:
+        print(f"⚠️ Could not cache resized image for {path}: {e}")
+
+
+def _downscale_to_jpeg(img) -> bytes:
+    """Resize to MAX_IMAGE_EDGE on the longest side and re-encode as JPEG"""
+    # Let libjpeg decode at reduced scale instead of full 12MP resolution
+    img.draft('RGB', (MAX_IMAGE_EDGE, MAX_IMAGE_EDGE))
+    # Phone photos store rotation in EXIF, which re-encoding would drop
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), PILImage.Resampling.LANCZOS)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buf.getvalue()
+
+
+def _cache_key(*parts) -> str:
+    """Hash model name, prompt text and input bytes into a cache key"""
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _new_digest():
+    return hashlib.blake2b(digest_size=20)
+
+
+def _image_digest(path, data: bytes = None) -> bytes:
+    """Content hash of an image file (renames and re-copies still hit)"""
+    if data is not None:
+        h = _new_digest()
+        h.update(data)
+        return h.digest()
+    
+    with open(path, 'rb') as f:
+        # Hashing reads front to back once; let the kernel read ahead
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        # Streams the file through a fixed buffer instead of loading it whole
+        return hashlib.file_digest(f, _new_digest).digest()
+
+
+def _cache_path(key: str) -> Path:
+    return get_data_dir() / CACHE_DIR_NAME / f"{key}.json"
+
+
+def _cache_get(key: str, ttl: float = None):
+    """Return a cached response, or None if missing, expired or corrupt"""
+    path = _cache_path(key)
+    try:
+        if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+            return None
+        return json_utils.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_put(key: str, data):
+    """Persist a response atomically; caching is best-effort"""
+    path = _cache_path(key)
+    try:
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json_utils.dumps(data), encoding='utf-8')
+        os.replace(tmp, path)
+    except (OSError, TypeError) as e:
+        print(f"⚠️ Could not cache AI response: {e}")
+
+
+async def _read_bytes(path):
+    """Read a file without blocking the event loop; None if unreadable"""
+    try:
+        if HAS_AIOFILES:
+            async with aiofiles.open(path, 'rb') as f:
+                return await f.read()
+        return await asyncio.to_thread(Path(path).read_bytes)
+    except OSError as e:
+        print(f"⚠️ Could not read image {path}: {e}")
+        return None
+
+
+def _load_image(path, data: bytes = None):
+    """
+    Build an image Part for Gemini; returns None if it can't be read
+    
+    data, when given, is the already-read file content and saves a re-read.
+    """
+    try:
+        cached = _read_thumb(path)
+        if cached:
+            return types.Part.from_bytes(data=cached, mime_type='image/jpeg')
         
-        contents = [prompt]  # Start with text prompt
+        # Opening only parses the header; pixels are decoded on demand
+        with PILImage.open(path if data is None else io.BytesIO(data)) as img:
+            if max(img.size) > MAX_IMAGE_EDGE:
+                data = _downscale_to_jpeg(img)
+                _write_thumb(path, data)
+                return types.Part.from_bytes(data=data, mime_type='image/jpeg')
+            
+            mime_type = PASSTHROUGH_MIME_TYPES.get(os.path.splitext(str(path))[1].lower())
+            if not mime_type:
+                # Formats Gemini doesn't accept (e.g. BMP) are re-encoded as PNG
+                buf = io.BytesIO()
+                img.save(buf, 'PNG')
+                return types.Part.from_bytes(data=buf.getvalue(), mime_type='image/png')
         
-        for path in image_paths:
+        # Small enough and natively supported: send the file bytes untouched
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        return types.Part.from_bytes(data=data, mime_type=mime_type)
+    except Exception as e:
+        print(f"⚠️ Could not load image {path}: {e}")
+        return None
+
+
+class _PhaseArtifacts:
+    """
+    Intermediate results of analyze_with_research, saved in the item folder
+    
+    An artifact is reused only if it is newer than every source image and
+    no earlier phase had to be recomputed during this run, so a retry
+    resumes at the first phase that didn't finish.
+    """
+    
+    def __init__(self, image_paths):
+        self.folder = Path(image_paths[0]).parent
+        try:
+            self.source_mtime = max(os.stat(p).st_mtime for p in image_paths)
+            self.fresh = True
+        except OSError:
+            self.source_mtime = None
+            self.fresh = False
+    
+    def load(self, name):
+        """Return the saved artifact, or None if it must be recomputed"""
+        if self.fresh:
+            path = self.folder / name
             try:
-                img = PILImage.open(path)
-                contents.append(img)
-            except Exception as e:
-                print(f"⚠️ Could not load image {path}: {e}")
-            
+                if path.stat().st_mtime >= self.source_mtime:
+                    return json_utils.loads(path.read_bytes())
+            except (OSError, ValueError):
+                pass
+        # Everything downstream of a recomputed phase is stale too
+        self.fresh = False
+        return None
+    
+    def save(self, name, data):
+        if self.source_mtime is None:
+            return  # Sources can't be stat'ed, so the artifact could never be validated
+        try:
+            (self.folder / name).write_bytes(json_utils.dumps_indented(data))
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Could not save {name}: {e}")
+
+
+class AIAnalyzer:
+    """Analyzes product images using Gemini AI"""
+    
+    def __init__(self):
+        """Initialize the Gemini client"""
+        api_key = _load_api_key()
+        
+        if not api_key:
+            print("⚠️ GOOGLE_API_KEY not found in .env")
+            self.client = None
+            return
+
+        # Initialize the new GenAI Client
+        client_args = {'http2': True} if HAS_HTTP2 else {}
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=HTTP_TIMEOUT_MS,
+                client_args=client_args,
+                async_client_args=client_args,
+            ),
+        )
+        print("✅ AI Analyzer initialized (google-genai SDK)")
+
+    @staticmethod
+    def get_instance():
+        """
+        Shared process-wide analyzer
+        
+        Reusing one instance keeps a single HTTP connection pool (and its
+        TLS session) warm instead of handshaking per analyzer. Only an
+        analyzer whose client was created is kept; until then every call
+        re-reads GOOGLE_API_KEY, so a key saved after startup (first-run
+        setup) takes effect without a restart.
+        """
+        global _INSTANCE
+        with _INSTANCE_LOCK:
+            if _INSTANCE is not None:
+                return _INSTANCE
+            _load_api_key.cache_clear()
+            analyzer = AIAnalyzer()
+            if analyzer.client:
+                _INSTANCE = analyzer
+            return analyzer
+
+    @staticmethod
+    def reset():
+        """Forget the shared analyzer and cached API key, e.g. after the key changes"""
+        global _INSTANCE
+        with _INSTANCE_LOCK:
+            _INSTANCE = None
+            _load_api_key.cache_clear()
+
+    def _generate(self, **kwargs):
+        """generate_content with exponential backoff on 429/5xx responses"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                return self.client.models.generate_content(**kwargs)
+            except errors.APIError as e:
+                if not _should_retry(e, attempt):
+                    raise
+                time.sleep(_backoff(e, attempt))
+    
+    def _stream_text(self, **kwargs):
+        """
+        Stream a response and return its full text
+        
+        Chunks are consumed as Gemini produces them rather than waiting for
+        the whole generation; 429/5xx errors restart the stream with backoff.
+        """
+        for attempt in range(MAX_RETRIES):
+            try:
+                return ''.join(
+                    chunk.text for chunk in self.client.models.generate_content_stream(**kwargs)
+                    if chunk.text
+                )
+            except errors.APIError as e:
+                if not _should_retry(e, attempt):
+                    raise
+                time.sleep(_backoff(e, attempt))
+    
+    async def _stream_text_async(self, **kwargs):
+        """Async _stream_text over the client's aio transport"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                stream = await self.client.aio.models.generate_content_stream(**kwargs)
+                return ''.join([chunk.text async for chunk in stream if chunk.text])
+            except errors.APIError as e:
+                if not _should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(_backoff(e, attempt))
+    
+    def encode_image(self, image_path):
+        """Encode image to base64"""
         try:
-            if not self.client:
-                 return {"error": "AI Client not initialized (Check API Key)"}
-
-            # Config for JSON response
-            config = types.GenerateContentConfig(
-                temperature=0.3,
-                top_p=0.95,
-                max_output_tokens=4000,
-                response_mime_type="application/json",
-                safety_settings=[
-                    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE"),
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            if HAS_PYBASE64:
+                return pybase64.b64encode_as_string(data)
+            return base64.b64encode(data).decode('ascii')
+        except Exception as e:
+            print(f"⚠️ Could not encode {image_path}: {e}")
+            return None
+    
+    def get_images_from_folder(self, folder_path, max_images=8):
+        """Get all images from a folder"""
+        # One directory read; extensions are matched case-insensitively
+        try:
+            with os.scandir(folder_path) as entries:
+                images = [
+                    entry.path for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS and entry.is_file()
                 ]
-            )
+        except OSError:
+            return []
+        
+        # Sort by name and limit, skipping files whose header isn't an image
+        valid = []
+        for path in sorted(images):
+            if _has_image_signature(path):
+                valid.append(path)
+                if len(valid) == max_images:
+                    break
+            else:
+                print(f"⚠️ Skipping {os.path.basename(path)}: not a supported image")
+        return valid
+    
+    def _prepare_analysis(self, image_paths, raw_images=None):
+        """
+        Build the Gemini request for a set of images
+        
+        Args:
+            image_paths: List of paths to item images
+            raw_images: Optional file contents matching image_paths (None
+                entries are read from disk)
+            
+        Returns:
+            (cache_key, contents, result) - result is set instead of contents
+            when no API call is needed (cache hit or no readable images)
+        """
+        raw_images = raw_images or [None] * len(image_paths)
+        
+        # Hash every file once: drops duplicate photos and keys the cache
+        unique_paths, unique_raw, digests = [], [], []
+        seen = set()
+        for path, raw in zip(image_paths, raw_images):
+            try:
+                digest = _image_digest(path, raw)
+            except OSError:
+                digest = None
+            if digest is not None:
+                if digest in seen:
+                    continue
+                seen.add(digest)
+            unique_paths.append(path)
+            unique_raw.append(raw)
+            digests.append(digest)
+        
+        dropped = len(image_paths) - len(unique_paths)
+        if dropped:
+            print(f"🧹 Skipping {dropped} duplicate image(s)")
+        
+        # Identical photos + model + prompt always produce a reusable answer
+        if None in digests:
+            cache_key = None
+        else:
+            cache_key = _cache_key(ANALYSIS_MODEL, ANALYZE_PROMPT, *digests)
+        cached = _cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            print("♻️ Using cached AI analysis")
+            cached['image_paths'] = image_paths
+            cached['image_count'] = len(image_paths)
+            return cache_key, None, cached
 
+        # Prepare content: text prompt followed by one image Part per file
+        contents = [ANALYZE_PROMPT]  # Start with text prompt
+        
+        # File reads (and the occasional transcode) overlap across threads
+        with ThreadPoolExecutor(max_workers=min(MAX_DECODE_WORKERS, len(unique_paths))) as executor:
+            contents.extend(img for img in executor.map(_load_image, unique_paths, unique_raw) if img is not None)
+        
+        if len(contents) == 1:
+            return cache_key, None, {"error": "Could not load any images"}
+        return cache_key, contents, None
+    
+    def _analysis_config(self, image_count):
+        """Generation config for JSON listing analysis"""
+        return types.GenerateContentConfig(
+            temperature=0.3,
+            top_k=40,
+            max_output_tokens=min(MAX_OUTPUT_TOKENS, BASE_OUTPUT_TOKENS + OUTPUT_TOKENS_PER_IMAGE * image_count),
+            response_mime_type="application/json",
+            safety_settings=[
+                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"),
+                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"),
+                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_NONE"),
+                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE"),
+            ]
+        )
+    
+    def _parse_analysis(self, response_text, cache_key, image_paths):
+        """Turn Gemini's response text into the listing data dict"""
+        try:
+            data = _parse_json_response(response_text)
+        except ValueError as e:
+            print(f"⚠️ Failed to parse AI response as JSON: {e}")
+            print(f"   Raw response: {response_text[:500]}...")
+            return {"error": f"JSON parse error: {e}", "raw": response_text}
+        
+        if isinstance(data, list):
+            if data:
+                data = data[0]
+            else:
+                return {"error": "AI returned an empty list"}
+        
+        if cache_key:
+            _cache_put(cache_key, data)
+        
+        data['image_paths'] = image_paths
+        data['image_count'] = len(image_paths)
+        
+        return data
+    
+    def analyze_item(self, image_paths):
+        """
+        Analyze images and extract structured listing data
+        
+        Args:
+            image_paths: List of paths to item images
+            
+        Returns:
+            Dict with all extracted listing data
+        """
+        if not image_paths:
+            return {"error": "No images provided"}
+        if not self.client:
+            return {"error": "AI Client not initialized (Check API Key)"}
+        
+        cache_key, contents, result = self._prepare_analysis(image_paths)
+        if result is not None:
+            return result
+            
+        try:
             # Use Pro model for high-fidelity vision as requested
-            model_name = 'gemini-1.5-pro'
-            print(f"🧠 Using AI Model: {model_name}")
+            print(f"🧠 Using AI Model: {ANALYSIS_MODEL}")
             
-            response = self.client.models.generate_content(
-                model=model_name,
+            response_text = self._stream_text(
+                model=ANALYSIS_MODEL,
                 contents=contents,
-                config=config
+                config=self._analysis_config(len(contents) - 1)
             )
             
-            # Parse the JSON response
-            response_text = response.text
-            
-            # Clean up the response if needed
-            if response_text.startswith('```'):
-                response_text = response_text.split('```')[1]
-                if response_text.startswith('json'):
-                    response_text = response_text[4:]
-            
-            data = json.loads(response_text.strip())
-            
-            if isinstance(data, list):
-                if data:
-                    data = data[0]
-                else:
-                    return {"error": "AI returned an empty list"}
+            return self._parse_analysis(response_text, cache_key, image_paths)
             
-            data['image_paths'] = image_paths
-            data['image_count'] = len(image_paths)
-            
-            return data
+        except Exception as e:
+            print(f"❌ AI analysis failed: {e}")
+            return {"error": str(e)}
+    
+    async def analyze_item_async(self, image_paths):
+        """
+        Async variant of analyze_item using the client's aio transport
+        
+        Files are read concurrently without blocking the event loop; hashing
+        and any resizing then run on a worker thread.
+        """
+        if not image_paths:
+            return {"error": "No images provided"}
+        if not self.client:
+            return {"error": "AI Client not initialized (Check API Key)"}
+        
+        raw_images = await asyncio.gather(*(_read_bytes(p) for p in image_paths))
+        cache_key, contents, result = await asyncio.to_thread(self._prepare_analysis, image_paths, raw_images)
+        if result is not None:
+            return result
+        
+        try:
+            response_text = await self._stream_text_async(
+                model=ANALYSIS_MODEL,
+                contents=contents,
+                config=self._analysis_config(len(contents) - 1)
+            )
             
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse AI response as JSON: {e}")
-            print(f"   Raw response: {response_text[:500]}...")
-            return {"error": f"JSON parse error: {e}", "raw": response_text}
+            return self._parse_analysis(response_text, cache_key, image_paths)
             
         except Exception as e:
             print(f"❌ AI analysis failed: {e}")
             return {"error": str(e)}
     
+    def _save_ai_data(self, folder_path, result):
+        """Write analysis result to the folder's ai_data.json"""
+        try:
+            data_path = Path(folder_path) / 'ai_data.json'
+            data_path.write_bytes(json_utils.dumps_indented(result))
+            print(f"✅ Saved analysis to {data_path.name}")
+        except Exception as e:
+            print(f"⚠️ Failed to save ai_data.json: {e}")
+            # We still return success as we have the data in memory/result
+    
     def analyze_folder(self, folder_path):
         """Analyze all images in a folder"""
         images = self.get_images_from_folder(folder_path)
@@ -285,14 +843,7 @@ INSTRUCTIONS FOR 'description' FIELD (HTML_STRING):
             return result
             
         # Save result to ai_data.json
-        try:
-            data_path = Path(folder_path) / 'ai_data.json'
-            with open(data_path, 'w') as f:
-                json.dump(result, f, indent=2)
-            print(f"✅ Saved analysis to {data_path.name}")
-        except Exception as e:
-            print(f"⚠️ Failed to save ai_data.json: {e}")
-            # We still return success as we have the data in memory/result
+        self._save_ai_data(folder_path, result)
             
         # Return success structure for queue manager
         return {
@@ -301,7 +852,7 @@ INSTRUCTIONS FOR 'description' FIELD (HTML_STRING):
             'listing_id': None, # No listing created yet, just analysis
             'offer_id': None
         }
-
+    
     def research_part_number(self, brand: str, model: str, part_number: str = None) -> dict:
         """
         Use Google Search grounding to research an industrial part.
@@ -316,31 +867,17 @@ INSTRUCTIONS FOR 'description' FIELD (HTML_STRING):
         if part_number:
             search_terms.append(part_number)
         
-        query = f"""Research this industrial equipment part for eBay listing:
+        query = RESEARCH_PROMPT.format(item=' '.join(search_terms))
 
-Item: {' '.join(search_terms)}
-
-Find and return:
-1. EXACT product specifications (capacity, speed, interface, voltage)
-2. What systems/equipment this is compatible with
-3. Current market price range on eBay in 2026
-4. Whether this is a rare/hard-to-find item
-5. Common alternative part numbers
-
-Return as JSON:
-{{
-    "product_name": "Full product name",
-    "specifications": {{"key": "value"}},
-    "compatible_with": ["system1", "system2"],
-    "market_price": {{"low": 0, "mid": 0, "high": 0, "currency": "USD"}},
-    "availability": "common|moderate|rare|very_rare",
-    "alternative_part_numbers": [],
-    "notes": "Any important details"
-}}"""
+        cache_key = _cache_key(RESEARCH_MODEL, query)
+        cached = _cache_get(cache_key, ttl=RESEARCH_CACHE_TTL)
+        if cached is not None:
+            print(f"♻️ Using cached research for {brand} {model}")
+            return cached
 
         try:
-            response = self.client.models.generate_content(
-                model='gemini-2.0-flash-exp',
+            response = self._generate(
+                model=RESEARCH_MODEL,
                 contents=query,
                 config=types.GenerateContentConfig(
                     tools=[types.Tool(google_search=types.GoogleSearch())],
@@ -362,15 +899,10 @@ Return as JSON:
                             })
             
             # Parse response
-            response_text = response.text
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0]
-            elif '```' in response_text:
-                response_text = response_text.split('```')[1].split('```')[0]
-            
-            research_data = json.loads(response_text.strip())
+            research_data = _parse_json_response(response.text)
             research_data['sources'] = sources[:5]  # Keep top 5 sources
             research_data['researched'] = True
+            _cache_put(cache_key, research_data)
             
             print(f"🔍 Researched: {brand} {model} - Found {len(sources)} sources")
             return research_data
@@ -379,6 +911,74 @@ Return as JSON:
             print(f"⚠️ Research failed: {e}")
             return {"error": str(e), "researched": False}
 
+    def _apply_book_metadata(self, result: dict, book_data: dict, isbn: str) -> dict:
+        """Overwrite identification and listing text with Google Books metadata"""
+        print(f"✅ Found Book Metadata: {book_data.get('title')}")
+        result['book_metadata'] = book_data
+        result['analysis_mode'] = 'book_scan'
+        
+        # Override identification with book data
+        ident = result.setdefault('identification', {})
+        ident['brand'] = book_data.get('publisher', 'Unknown')
+        ident['model'] = book_data.get('title')
+        ident['mpn'] = isbn
+        ident['product_type'] = 'Book'
+        
+        # Construct description
+        authors = ", ".join(book_data.get('authors', []))
+        desc = BOOK_DESCRIPTION_TEMPLATE.substitute(
+            title=book_data.get('title'),
+            authors=authors,
+            publisher=book_data.get('publisher'),
+            published=book_data.get('publishedDate'),
+            description=book_data.get('description', ''),
+        )
+        
+        year = (book_data.get('publishedDate') or '')[:4]
+        listing = result.setdefault('listing', {})
+        listing['suggested_title'] = f"{book_data.get('title')} by {authors} ({year}) {isbn}"
+        listing['description'] = desc
+        
+        # Book aspects replace whatever Phase 1 read off the cover; Phase 3
+        # keeps a non-empty item_specifics and seo_title as they are
+        specifics = {
+            'Book Title': book_data.get('title'),
+            'Author': authors,
+            'Publisher': book_data.get('publisher'),
+            'Publication Year': year,
+            'ISBN': isbn,
+            'Number of Pages': str(book_data['pageCount']) if book_data.get('pageCount') else None,
+        }
+        result['item_specifics'] = {name: value for name, value in specifics.items() if value}
+        result['seo_title'] = listing['suggested_title']
+        result['ebay_category_suggestion'] = BOOK_CATEGORY_SUGGESTION
+        result['category_keywords'] = book_data.get('categories') or ['Books']
+        
+        return result
+    
+    def _book_result(self, result: dict, book_data: dict, isbn: str) -> dict:
+        """Apply Google Books metadata, then run Phase 3 on the book result"""
+        self._apply_book_metadata(result, book_data, isbn)
+        self._map_item_specifics(result)
+        return result
+    
+    def _scan_book_barcode(self, image_paths: list):
+        """
+        Look for an ISBN barcode before spending a Gemini call
+        
+        Returns the ISBN decoded from the first BARCODE_SCAN_IMAGES photos,
+        otherwise None (including when the optional pyzbar isn't installed).
+        """
+        if not HAS_PYZBAR or BookService is None:
+            return None
+        
+        for path in image_paths[:BARCODE_SCAN_IMAGES]:
+            isbn = scan_barcode(path)
+            if isbn:
+                print(f"✅ Found ISBN barcode: {isbn}")
+                return isbn
+        return None
+    
     def analyze_with_research(self, image_paths: list) -> dict:
         """
         Two-phase analysis: 
@@ -388,13 +988,33 @@ Return as JSON:
         
         Best for NOS/industrial equipment where identification is complex.
         """
-        # Phase 1: Basic analysis
-        print("📸 Phase 1: Analyzing images...")
-        basic_result = self.analyze_item(image_paths)
+        # A readable ISBN barcode identifies a book without any Gemini call
+        isbn = self._scan_book_barcode(image_paths)
+        if isbn:
+            book_data = BookService().lookup_isbn(isbn)
+            if book_data.get('success'):
+                result = {
+                    'condition': dict(BOOK_DEFAULT_CONDITION),
+                    'image_paths': image_paths,
+                    'image_count': len(image_paths),
+                }
+                return self._book_result(result, book_data, isbn)
         
-        if basic_result.get('error'):
-            return basic_result
+        artifacts = _PhaseArtifacts(image_paths)
         
+        # Phase 1: Basic analysis
+        basic_result = artifacts.load(PHASE1_ARTIFACT)
+        if basic_result is not None:
+            print("📸 Phase 1: Reusing saved analysis")
+            basic_result['image_paths'] = image_paths
+            basic_result['image_count'] = len(image_paths)
+        else:
+            print("📸 Phase 1: Analyzing images...")
+            basic_result = self.analyze_item(image_paths)
+            
+            if basic_result.get('error'):
+                return basic_result
+            artifacts.save(PHASE1_ARTIFACT, basic_result)
 
         # Phase 2: Research / Book Mode
         if self.client and basic_result.get('identification'):
@@ -405,52 +1025,35 @@ Return as JSON:
             product_type = ident.get('product_type', '').lower()
             
             # --- BOOK MODE CHECK ---
-            if "book" in product_type or "textbook" in product_type:
+            # Skipped when the barcode pass already found an ISBN Google Books
+            # doesn't know; photos that pass decoded aren't scanned again
+            if ISBNScanner is not None and BookService is not None and "book" in product_type and not isbn:
                 print("📚 Detected Book! Attempting ISBN Scan...")
-                from backend.app.services.isbn_scanner import ISBNScanner
-                from backend.app.services.book_service import BookService
-                
                 isbn_scanner = ISBNScanner()
-                isbn = None
+                scanned = BARCODE_SCAN_IMAGES if HAS_PYZBAR else 0
                 
-                # Scan all images for ISBN
-                for path in image_paths:
+                # Scan the remaining images for ISBN
+                for path in image_paths[scanned:]:
                     isbn = isbn_scanner.scan_image(path)
                     if isbn:
                         print(f"✅ Found ISBN: {isbn}")
                         break
                 
                 if isbn:
-                    book_service = BookService()
-                    book_data = book_service.lookup_isbn(isbn)
+                    book_data = BookService().lookup_isbn(isbn)
                     
                     if book_data.get('success'):
-                        print(f"✅ Found Book Metadata: {book_data.get('title')}")
-                        basic_result['book_metadata'] = book_data
-                        basic_result['analysis_mode'] = 'book_scan'
-                        
-                        # Override identification with book data
-                        basic_result['identification']['brand'] = book_data.get('publisher', 'Unknown')
-                        basic_result['identification']['model'] = book_data.get('title')
-                        basic_result['identification']['mpn'] = isbn
-                        basic_result['identification']['product_type'] = 'Book'
-                        
-                        # Construct description
-                        authors = ", ".join(book_data.get('authors', []))
-                        desc = f"<h2>{book_data.get('title')}</h2>"
-                        desc += f"<p><b>Author:</b> {authors}<br><b>Publisher:</b> {book_data.get('publisher')}<br><b>Year:</b> {book_data.get('publishedDate')}</p>"
-                        desc += f"<p>{book_data.get('description', '')}</p>"
-                        
-                        basic_result['listing']['suggested_title'] = f"{book_data.get('title')} by {authors} ({book_data.get('publishedDate')[:4]}) {isbn}"
-                        basic_result['listing']['description'] = desc
-                        
-                        return basic_result
+                        return self._book_result(basic_result, book_data, isbn)
 
             # --- END BOOK MODE ---
 
             if brand or model or mpn:
-                print("🔍 Phase 2: Researching part...")
-                research = self.research_part_number(brand, model, mpn)
+                research = artifacts.load(PHASE2_ARTIFACT)
+                if research is None:
+                    print("🔍 Phase 2: Researching part...")
+                    research = self.research_part_number(brand, model, mpn)
+                    if research.get('researched'):
+                        artifacts.save(PHASE2_ARTIFACT, research)
                 
                 if research.get('researched'):
                     # Merge research into result
@@ -469,21 +1072,38 @@ Return as JSON:
                     print(f"✅ Enhanced with research data")
         
         # Phase 3: Map to eBay item specifics and generate SEO title
+        # (Phase 1 usually returns these already; the mapper fills any gaps)
+        saved = artifacts.load(PHASE3_ARTIFACT)
+        if saved is not None:
+            basic_result.update(saved)
+        else:
+            self._map_item_specifics(basic_result)
+            artifacts.save(PHASE3_ARTIFACT, {key: basic_result[key] for key in PHASE3_KEYS if key in basic_result})
+        
+        basic_result['analysis_mode'] = 'research_enhanced' if basic_result.get('research') else 'basic'
+        return basic_result
+    
+    def _map_item_specifics(self, basic_result: dict):
+        """Phase 3 of analyze_with_research; updates basic_result in place"""
         try:
-            from backend.app.services.item_specifics_mapper import ItemSpecificsMapper
+            if ItemSpecificsMapper is None:
+                raise ImportError("item_specifics_mapper is unavailable")
             mapper = ItemSpecificsMapper()
+            condition = basic_result.get('condition', {})
             
-            print("📋 Phase 3: Mapping to eBay item specifics...")
-            basic_result['item_specifics'] = mapper.map_research_to_specifics(basic_result)
-            basic_result['seo_title'] = mapper.generate_seo_title(basic_result)
-            basic_result['condition_id'] = mapper.get_condition_id(basic_result.get('condition', {}))
-            basic_result['condition_description'] = mapper.generate_condition_description(basic_result.get('condition', {}))
+            if not isinstance(basic_result.get('item_specifics'), dict) or not basic_result['item_specifics']:
+                print("📋 Phase 3: Mapping to eBay item specifics...")
+                basic_result['item_specifics'] = mapper.map_research_to_specifics(basic_result)
+            if isinstance(basic_result.get('seo_title'), str) and basic_result['seo_title'].strip():
+                basic_result['seo_title'] = basic_result['seo_title'].strip()[:80]
+            else:
+                basic_result['seo_title'] = mapper.generate_seo_title(basic_result)
+            if basic_result.get('condition_id') not in EBAY_CONDITION_IDS:
+                basic_result['condition_id'] = mapper.get_condition_id(condition)
+            basic_result['condition_description'] = mapper.generate_condition_description(condition)
             print(f"✅ Generated {len(basic_result['item_specifics'])} item specifics")
         except Exception as e:
             print(f"⚠️ Item specifics mapping failed: {e}")
-        
-        basic_result['analysis_mode'] = 'research_enhanced' if basic_result.get('research') else 'basic'
-        return basic_result
 
 
     def analyze_folder_with_research(self, folder_path):
@@ -504,8 +1124,7 @@ Return as JSON:
         # Save result
         try:
             data_path = Path(folder_path) / 'ai_data.json'
-            with open(data_path, 'w') as f:
-                json.dump(result, f, indent=2)
+            data_path.write_bytes(json_utils.dumps_indented(result))
             print(f"✅ Saved research-enhanced analysis to {data_path.name}")
         except Exception as e:
             print(f"⚠️ Failed to save ai_data.json: {e}")
@@ -523,7 +1142,7 @@ Return as JSON:
 if __name__ == "__main__":
     print("Testing AI Analyzer...")
     
-    analyzer = AIAnalyzer()
+    analyzer = AIAnalyzer.get_instance()
     
     # Test with sample images if available
     inbox = Path(__file__).parent / "inbox"
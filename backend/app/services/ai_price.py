@@ -6,15 +6,27 @@ that don't have direct eBay comparables.
 Updated for 2026 google-genai SDK syntax.
 """
 import os
+import re
+import copy
 import json
+import math
+import time
+import random
+import asyncio
 import base64
+import hashlib
+import threading
+import importlib.util
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 # Try the NEW google-genai SDK first (2025+)
 try:
+    import httpx
     from google import genai
-    from google.genai import types
+    from google.genai import errors, types
     HAS_NEW_GENAI = True
 except ImportError:
     HAS_NEW_GENAI = False
@@ -31,6 +43,315 @@ if not HAS_NEW_GENAI:
 else:
     HAS_LEGACY_GENAI = False
 
+from backend.app.core import json_utils
+from backend.app.core.paths import get_data_dir
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Static appraiser instructions, sent as the system instruction so every
+# call shares an identical prefix and only the item lines vary
+APPRAISER_INSTRUCTIONS = """You are an expert appraiser and e-commerce pricing specialist.
+
+TASK: Research and estimate a fair selling price on eBay for the item given
+as ITEM / CONDITION (and ADDITIONAL CONTEXT, if any).
+
+INSTRUCTIONS:
+1. Search for actual market data for this item or similar items
+2. Look for:
+   - Current eBay listings and sold prices
+   - Amazon prices for new items
+   - Specialty retailer prices
+   - Auction results for collectibles/antiques
+3. Consider:
+   - Brand reputation and rarity
+   - Condition impact on price
+   - Current market demand
+   - Age and availability
+
+RESPOND WITH THIS EXACT JSON STRUCTURE:
+{
+    "estimate": {
+        "low": 0.00,
+        "mid": 0.00,
+        "high": 0.00,
+        "currency": "USD"
+    },
+    "confidence": "low|medium|high",
+    "reasoning": "Detailed explanation of how you arrived at this price range",
+    "comparable_items": [
+        "Item 1 - $XX on Platform",
+        "Item 2 - $XX on Platform"
+    ],
+    "value_factors": [
+        "Factor that increases value",
+        "Factor that decreases value"
+    ],
+    "pricing_notes": "Any special considerations"
+}
+
+Be thorough. Base your estimate on real market data you find."""
+
+
+# Stable Gemini 2.0 model for price estimates
+PRICE_MODEL = 'gemini-2.0-flash'
+
+# JSON-mode schema mirroring the structure in APPRAISER_INSTRUCTIONS.
+# Google Search grounding can't be combined with response_schema on these
+# models, so grounded calls stay free-text and only off-format answers get
+# a (cheap, search-free) JSON-mode restructuring pass.
+PRICE_ESTIMATE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'estimate': {
+            'type': 'OBJECT',
+            'properties': {
+                'low': {'type': 'NUMBER'},
+                'mid': {'type': 'NUMBER'},
+                'high': {'type': 'NUMBER'},
+                'currency': {'type': 'STRING'},
+            },
+            'required': ['low', 'mid', 'high'],
+        },
+        'confidence': {'type': 'STRING', 'enum': ['low', 'medium', 'high']},
+        'reasoning': {'type': 'STRING'},
+        'comparable_items': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'value_factors': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'pricing_notes': {'type': 'STRING'},
+    },
+    'required': ['estimate', 'confidence', 'reasoning'],
+}
+
+# Bulk estimation (PriceEstimateQueue): pacing and retry policy
+PRICE_QUEUE_QPM = 500
+PRICE_QUEUE_CONCURRENCY = 20
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+STRUCTURE_INSTRUCTIONS = """Convert this appraiser's price research into the requested JSON.
+Use only figures stated in the text; do not invent prices."""
+
+# Dollar amounts in free-text responses; the group drops the '$'
+_PRICE_RE = re.compile(r'\$(\d[\d,]*(?:\.\d{2})?)')
+
+# Keep-alive pool shared by every estimator so concurrent calls reuse
+# connections instead of paying a TLS handshake each
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 100
+
+
+@lru_cache(maxsize=1)
+def _load_google_api_key() -> Optional[str]:
+    """GOOGLE_API_KEY from the project .env, else the environment; read once per process"""
+    env_path = Path(__file__).resolve().parents[3] / ".env"
+    if env_path.exists():
+        with open(env_path, 'r') as f:
+            for line in f:
+                if line.strip().startswith('GOOGLE_API_KEY='):
+                    return line.split('=', 1)[1].strip()
+    return os.getenv('GOOGLE_API_KEY')
+
+
+@lru_cache(maxsize=1)
+def _get_genai_client():
+    """One google-genai Client (and connection pool) per process"""
+    api_key = _load_google_api_key()
+    limits = {'limits': httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+    )}
+    # With aiohttp installed the SDK uses it for async calls (one shared
+    # session already), and httpx-only arguments would be rejected there
+    async_limits = limits if importlib.util.find_spec('aiohttp') is None else None
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(client_args=limits, async_client_args=async_limits),
+    )
+
+
+# Estimates are reused until market prices have had time to move
+PRICE_CACHE_TTL = 7 * 24 * 3600
+PRICE_CACHE_MEMORY_SIZE = 256
+# Marks estimates regex-scraped from a non-JSON answer; those are never
+# cached, so the next request asks the model again
+FALLBACK_PRICING_NOTES = 'Extracted from unstructured AI response'
+# Opt-in: reuse an estimate for a differently worded query about the same
+# item. Off by default since every exact-key miss then pays an embedding
+# call. A match needs embeddings at least this similar AND the same
+# model/part-number tokens, so "iPhone 12" never answers for "iPhone 13".
+SEMANTIC_CACHE_ENABLED = False
+SEMANTIC_MATCH_THRESHOLD = 0.97
+EMBEDDING_MODEL = 'text-embedding-004'
+
+# Query tokens; those containing a digit (model and part numbers, capacities,
+# years) must match exactly for a semantic hit
+_IDENTIFIER_RE = re.compile(r'[a-z0-9][a-z0-9\-./]*')
+
+
+def _price_cache_key(query: str, condition: str, context: Optional[str], image_digests=()) -> str:
+    """Exact-match key over the normalized query, condition, context and photos"""
+    payload = json_utils.dumps(
+        {'q': ' '.join(query.lower().split()), 'cond': condition, 'ctx': context, 'img': sorted(image_digests)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Files API uploads are deleted server-side after 48 hours; re-upload a
+# little before that
+UPLOAD_TTL = 47 * 3600
+_UPLOADED_FILES: Dict[str, tuple] = {}  # content digest -> (types.File, uploaded_at)
+_UPLOADED_FILES_LOCK = threading.Lock()
+
+
+def _file_digest(path: str) -> Optional[str]:
+    """SHA-256 of a file's bytes, or None if it can't be read"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    except OSError as e:
+        print(f"⚠️ Could not read image {path}: {e}")
+        return None
+
+
+def _cacheable(result: Dict) -> bool:
+    """Successful estimates are cached, except _extract_from_text fallbacks"""
+    return bool(result.get('success')) and result.get('ai_analysis', {}).get('pricing_notes') != FALLBACK_PRICING_NOTES
+
+
+def _identifier_tokens(query: str) -> List[str]:
+    """Sorted model/part-number tokens of a query (those containing a digit)"""
+    return sorted({token for token in _IDENTIFIER_RE.findall(query.lower()) if any(c.isdigit() for c in token)})
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    """Scale to unit length so cosine similarity is a plain dot product"""
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class PriceCache:
+    """
+    Two-level cache of successful price estimates.
+    
+    Exact hits come from an in-process LRU backed by one JSON file per key.
+    Records that carry a query embedding can also be matched semantically,
+    so rephrasings of the same item reuse an earlier estimate.
+    """
+    
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: float = PRICE_CACHE_TTL):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_data_dir() / 'price_cache'
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._index = None  # key -> (condition, identifiers, unit embedding, cached_at); loaded lazily
+        self._lock = threading.Lock()
+    
+    def _expired(self, record: Dict) -> bool:
+        return time.time() - record.get('cached_at', 0) > self.ttl
+    
+    def _remember(self, key: str, record: Dict):
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        if len(self._memory) > PRICE_CACHE_MEMORY_SIZE:
+            self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for an exact key, if still fresh"""
+        with self._lock:
+            record = self._memory.get(key)
+        if record is None:
+            try:
+                record = json_utils.loads((self.cache_dir / f"{key}.json").read_bytes())
+            except (OSError, ValueError):
+                return None
+        if self._expired(record):
+            return None
+        with self._lock:
+            self._remember(key, record)
+        # A copy, so callers editing their estimate don't change later hits
+        return copy.deepcopy(record['result'])
+    
+    def find_similar(self, embedding: List[float], condition: str, query: str) -> Optional[Dict]:
+        """
+        Return the closest cached result for a reworded query, if close enough.
+        
+        Only records with the same condition and the same model/part-number
+        tokens as `query` are considered.
+        """
+        identifiers = _identifier_tokens(query)
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index()
+            now = time.time()
+            candidates = [
+                (key, vector) for key, (cond, idents, vector, cached_at) in self._index.items()
+                if cond == condition and idents == identifiers and now - cached_at <= self.ttl
+            ]
+        if not candidates:
+            return None
+        
+        target = _normalize(embedding)
+        if HAS_NUMPY:
+            scores = np.asarray([vector for _, vector in candidates]) @ np.asarray(target)
+            best = int(scores.argmax())
+            score = float(scores[best])
+        else:
+            score, best = max(
+                (sum(a * b for a, b in zip(vector, target)), i)
+                for i, (_, vector) in enumerate(candidates)
+            )
+        
+        if score < SEMANTIC_MATCH_THRESHOLD:
+            return None
+        return self.get(candidates[best][0])
+    
+    def put(self, key: str, result: Dict, condition: str, embedding: Optional[List[float]] = None):
+        """Store a successful estimate; persistence is best-effort"""
+        record = {
+            'cached_at': time.time(),
+            'condition': condition,
+            'identifiers': _identifier_tokens(result.get('query', '')),
+            'embedding': _normalize(embedding) if embedding else None,
+            'result': copy.deepcopy(result),
+        }
+        with self._lock:
+            self._remember(key, record)
+            if self._index is not None and record['embedding']:
+                self._index[key] = (condition, record['identifiers'], record['embedding'], record['cached_at'])
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.json"
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json_utils.dumps(record), encoding='utf-8')
+            os.replace(tmp, path)
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Could not cache price estimate: {e}")
+    
+    def _load_index(self) -> Dict:
+        """Read the embeddings of all persisted records"""
+        index = {}
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                record = json_utils.loads(path.read_bytes())
+            except (OSError, ValueError):
+                continue
+            if record.get('embedding') and 'identifiers' in record:
+                index[path.stem] = (
+                    record.get('condition'), record['identifiers'], record['embedding'], record.get('cached_at', 0)
+                )
+        return index
+
+
+@lru_cache(maxsize=1)
+def _get_price_cache() -> PriceCache:
+    """Process-wide PriceCache so every estimator shares the in-memory LRU"""
+    return PriceCache()
+
 
 class AIPriceEstimator:
     """
@@ -41,23 +362,12 @@ class AIPriceEstimator:
     def __init__(self):
         self.client = None
         self.legacy_model = None
+        self.cache = _get_price_cache()
         self._load_api_key()
     
     def _load_api_key(self):
-        """Load Google API key from .env"""
-        env_path = Path(__file__).resolve().parents[3] / ".env"
-        api_key = None
-        
-        if env_path.exists():
-            with open(env_path, 'r') as f:
-                for line in f:
-                    if line.strip().startswith('GOOGLE_API_KEY='):
-                        api_key = line.split('=', 1)[1].strip()
-                        break
-        
-        if not api_key:
-            api_key = os.getenv('GOOGLE_API_KEY')
-        
+        """Attach the shared client (or legacy model) for the configured API key"""
+        api_key = _load_google_api_key()
         if not api_key:
             print("⚠️ GOOGLE_API_KEY not found")
             return
@@ -65,7 +375,7 @@ class AIPriceEstimator:
         # Initialize with NEW google-genai SDK (preferred)
         if HAS_NEW_GENAI:
             try:
-                self.client = genai.Client(api_key=api_key)
+                self.client = _get_genai_client()
                 print("✅ AI Price Estimator initialized (google-genai SDK with Google Search)")
                 return
             except Exception as e:
@@ -75,7 +385,9 @@ class AIPriceEstimator:
         if HAS_LEGACY_GENAI:
             try:
                 genai_legacy.configure(api_key=api_key)
-                self.legacy_model = genai_legacy.GenerativeModel('gemini-2.0-flash-exp')
+                self.legacy_model = genai_legacy.GenerativeModel(
+                    'gemini-2.0-flash-exp', system_instruction=APPRAISER_INSTRUCTIONS
+                )
                 print("✅ AI Price Estimator initialized (legacy SDK, no live search)")
             except Exception as e:
                 print(f"❌ Legacy SDK init failed: {e}")
@@ -93,61 +405,258 @@ class AIPriceEstimator:
         Args:
             query: Item description/name
             condition: Item condition (New, Used, etc.)
-            image_paths: Optional list of image paths to analyze
+            image_paths: Optional photos, uploaded once and sent as file references
             additional_context: Any extra info about the item
             
         Returns:
             Dict with price estimate, reasoning, and sources
         """
+        images = {}
+        for path in image_paths or []:
+            digest = _file_digest(path)
+            if digest:
+                images[digest] = path
+        
+        key = _price_cache_key(query, condition, additional_context, images)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Free-form context and photos can change the price, so only plain
+        # queries are matched against similar earlier ones
+        embedding = None
+        if SEMANTIC_CACHE_ENABLED and self.client and not additional_context and not images:
+            embedding = self._embed(query)
+            if embedding:
+                similar = self.cache.find_similar(embedding, condition, query)
+                if similar is not None:
+                    print(f"♻️ Reusing price estimate for a similar item: {similar.get('query')}")
+                    return similar
+        
         # Try new SDK with Google Search first
         if self.client:
-            return self._estimate_with_search(query, condition, additional_context)
-        
+            result = self._estimate_with_search(query, condition, additional_context, images)
         # Fall back to legacy SDK (no live search)
-        if self.legacy_model:
-            return self._estimate_legacy(query, condition, additional_context)
+        elif self.legacy_model:
+            result = self._estimate_legacy(query, condition, additional_context)
+        else:
+            return self._error_result("AI not initialized")
+        
+        if _cacheable(result):
+            self.cache.put(key, result, condition, embedding)
+        return result
+    
+    def _embed(self, query: str) -> Optional[List[float]]:
+        """Embed a query for semantic cache lookups; None if unavailable"""
+        try:
+            response = self.client.models.embed_content(model=EMBEDDING_MODEL, contents=query)
+            return list(response.embeddings[0].values)
+        except Exception as e:
+            print(f"⚠️ Query embedding failed: {e}")
+            return None
+    
+    def _upload_images(self, images: Dict[str, str]) -> List:
+        """
+        Upload photos through the Files API and return their file references.
         
-        return self._error_result("AI not initialized")
+        Referencing uploaded files keeps image bytes out of every request
+        body. Uploads are remembered by content digest, so the same photo
+        is only sent once per UPLOAD_TTL.
+        
+        Args:
+            images: Content digest -> local path
+        """
+        files = []
+        now = time.time()
+        for digest, path in images.items():
+            with _UPLOADED_FILES_LOCK:
+                entry = _UPLOADED_FILES.get(digest)
+            if entry and now - entry[1] < UPLOAD_TTL:
+                files.append(entry[0])
+                continue
+            
+            try:
+                uploaded = self.client.files.upload(file=path)
+            except Exception as e:
+                print(f"⚠️ Image upload failed for {path}: {e}")
+                continue
+            with _UPLOADED_FILES_LOCK:
+                _UPLOADED_FILES[digest] = (uploaded, now)
+            files.append(uploaded)
+        return files
     
-    def _estimate_with_search(self, query: str, condition: str, context: Optional[str]) -> Dict:
+    def _estimate_with_search(
+        self, query: str, condition: str, context: Optional[str], images: Optional[Dict[str, str]] = None
+    ) -> Dict:
         """Estimate using new SDK with Google Search grounding"""
         prompt = self._build_prompt(query, condition, context)
+        if images:
+            prompt = [prompt, *self._upload_images(images)]
         
         try:
             # Use google-genai SDK with Google Search tool
-            # Using Gemini 3 Flash Preview for best price analysis with search
             response = self.client.models.generate_content(
-                model='gemini-2.0-flash',  # Stable Gemini 2.0 model
+                model=PRICE_MODEL,
                 contents=prompt,
                 config=types.GenerateContentConfig(
+                    system_instruction=APPRAISER_INSTRUCTIONS,
                     tools=[types.Tool(google_search=types.GoogleSearch())]
                 )
             )
+            sources = self._extract_sources(response)
+            data = self._decode_json(response.text)
+            if data is None:
+                data = self._structure_text(response.text)
+            if data is None:
+                return self._extract_from_text(response.text, query, sources)
+            return self._build_result(data, query, sources)
             
-            # Extract grounding metadata (sources)
-            sources = []
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
-                    metadata = candidate.grounding_metadata
-                    for chunk in getattr(metadata, 'grounding_chunks', []) or []:
-                        if hasattr(chunk, 'web') and chunk.web:
-                            sources.append(f"{chunk.web.title}: {chunk.web.uri}")
-            
-            return self._parse_response(response.text, query, sources)
+        except Exception as e:
+            print(f"❌ Google Search grounding failed: {e}")
+            # Try without search tool (JSON mode is allowed there)
+            try:
+                response = self.client.models.generate_content(
+                    model=PRICE_MODEL,
+                    contents=prompt,
+                    config=self._json_config(APPRAISER_INSTRUCTIONS)
+                )
+                return self._result_from_json_response(response, query)
+            except Exception as e2:
+                return self._error_result(str(e2))
+    
+    async def _estimate_with_search_async(
+        self, query: str, condition: str, context: Optional[str], raise_retryable: bool = False
+    ) -> Dict:
+        """
+        Async variant of _estimate_with_search over the client's aio transport.
+        
+        With raise_retryable, rate limits and timeouts are raised to the
+        caller (PriceEstimateQueue backs off and retries) instead of
+        falling back to an ungrounded call.
+        """
+        prompt = self._build_prompt(query, condition, context)
+        
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=PRICE_MODEL,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=APPRAISER_INSTRUCTIONS,
+                    tools=[types.Tool(google_search=types.GoogleSearch())]
+                )
+            )
+            sources = self._extract_sources(response)
+            data = self._decode_json(response.text)
+            if data is None:
+                data = await self._structure_text_async(response.text)
+            if data is None:
+                return self._extract_from_text(response.text, query, sources)
+            return self._build_result(data, query, sources)
             
         except Exception as e:
+            if raise_retryable and _is_retryable(e):
+                raise
             print(f"❌ Google Search grounding failed: {e}")
             # Try without search tool
             try:
-                response = self.client.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=prompt
+                response = await self.client.aio.models.generate_content(
+                    model=PRICE_MODEL,
+                    contents=prompt,
+                    config=self._json_config(APPRAISER_INSTRUCTIONS)
                 )
-                return self._parse_response(response.text, query, [])
+                return self._result_from_json_response(response, query)
             except Exception as e2:
                 return self._error_result(str(e2))
     
+    def _json_config(self, system_instruction: str):
+        """JSON-mode config: Gemini returns PRICE_ESTIMATE_SCHEMA-shaped JSON"""
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            response_mime_type='application/json',
+            response_schema=PRICE_ESTIMATE_SCHEMA,
+        )
+    
+    def _structure_text(self, text: str) -> Optional[Dict]:
+        """Second pass for off-format grounded answers: restructure them in JSON mode"""
+        try:
+            response = self.client.models.generate_content(
+                model=PRICE_MODEL,
+                contents=text,
+                config=self._json_config(STRUCTURE_INSTRUCTIONS)
+            )
+            return getattr(response, 'parsed', None)
+        except Exception as e:
+            print(f"⚠️ Could not restructure AI response: {e}")
+            return None
+    
+    async def _structure_text_async(self, text: str) -> Optional[Dict]:
+        """Async variant of _structure_text"""
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=PRICE_MODEL,
+                contents=text,
+                config=self._json_config(STRUCTURE_INSTRUCTIONS)
+            )
+            return getattr(response, 'parsed', None)
+        except Exception as e:
+            print(f"⚠️ Could not restructure AI response: {e}")
+            return None
+    
+    def _result_from_json_response(self, response, query: str) -> Dict:
+        """Result from a JSON-mode response (SDK-parsed when available)"""
+        data = getattr(response, 'parsed', None)
+        if data is None:
+            return self._parse_response(response.text, query, [])
+        return self._build_result(data, query, [])
+    
+    async def estimate_prices_batch(self, items: List[Dict], concurrency: int = 20) -> List:
+        """
+        Estimate prices for many items concurrently.
+        
+        Args:
+            items: Dicts with 'query' and optional 'condition' / 'additional_context'
+            concurrency: Maximum number of in-flight Gemini requests
+            
+        Returns:
+            One result per item, in order (an exception object if that item raised)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def estimate(item: Dict) -> Dict:
+            query = item['query']
+            condition = item.get('condition', 'Used')
+            context = item.get('additional_context')
+            key = _price_cache_key(query, condition, context)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            
+            async with semaphore:
+                if self.client:
+                    result = await self._estimate_with_search_async(query, condition, context)
+                elif self.legacy_model:
+                    result = await asyncio.to_thread(self._estimate_legacy, query, condition, context)
+                else:
+                    return self._error_result("AI not initialized")
+            
+            if _cacheable(result):
+                self.cache.put(key, result, condition)
+            return result
+        
+        return await asyncio.gather(*(estimate(item) for item in items), return_exceptions=True)
+    
+    def _extract_sources(self, response) -> List[str]:
+        """Collect Google Search grounding sources from a response"""
+        sources = []
+        if hasattr(response, 'candidates') and response.candidates:
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
+                metadata = candidate.grounding_metadata
+                for chunk in getattr(metadata, 'grounding_chunks', []) or []:
+                    if hasattr(chunk, 'web') and chunk.web:
+                        sources.append(f"{chunk.web.title}: {chunk.web.uri}")
+        return sources
+    
     def _estimate_legacy(self, query: str, condition: str, context: Optional[str]) -> Dict:
         """Estimate using legacy SDK (no live search)"""
         prompt = self._build_prompt(query, condition, context)
@@ -159,67 +668,33 @@ class AIPriceEstimator:
             return self._error_result(str(e))
     
     def _build_prompt(self, query: str, condition: str, context: Optional[str]) -> str:
-        """Build the price estimation prompt"""
-        prompt = f"""You are an expert appraiser and e-commerce pricing specialist.
-
-TASK: Research and estimate a fair selling price for this item on eBay.
-
-ITEM: {query}
-CONDITION: {condition}
-{f"ADDITIONAL CONTEXT: {context}" if context else ""}
-
-INSTRUCTIONS:
-1. Search for actual market data for this item or similar items
-2. Look for:
-   - Current eBay listings and sold prices
-   - Amazon prices for new items
-   - Specialty retailer prices
-   - Auction results for collectibles/antiques
-3. Consider:
-   - Brand reputation and rarity
-   - Condition impact on price
-   - Current market demand
-   - Age and availability
-
-RESPOND WITH THIS EXACT JSON STRUCTURE:
-{{
-    "estimate": {{
-        "low": 0.00,
-        "mid": 0.00,
-        "high": 0.00,
-        "currency": "USD"
-    }},
-    "confidence": "low|medium|high",
-    "reasoning": "Detailed explanation of how you arrived at this price range",
-    "comparable_items": [
-        "Item 1 - $XX on Platform",
-        "Item 2 - $XX on Platform"
-    ],
-    "value_factors": [
-        "Factor that increases value",
-        "Factor that decreases value"
-    ],
-    "pricing_notes": "Any special considerations"
-}}
-
-Be thorough. Base your estimate on real market data you find."""
-        
+        """Build the per-item part of the prompt (instructions are in APPRAISER_INSTRUCTIONS)"""
+        prompt = f"ITEM: {query}\nCONDITION: {condition}"
+        if context:
+            prompt += f"\nADDITIONAL CONTEXT: {context}"
         return prompt
     
+    def _decode_json(self, text: str) -> Optional[Dict]:
+        """Decode a free-text reply that should be JSON (possibly fenced); None if it isn't"""
+        if '```' in text:
+            text = text.split('```json')[1] if '```json' in text else text.split('```')[1]
+            text = text.split('```')[0]
+        try:
+            return json_utils.loads(text.strip())
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Failed to parse AI response: {e}")
+            return None
+    
     def _parse_response(self, text: str, query: str, sources: List[str]) -> Dict:
-        """Parse the AI response into structured data"""
+        """Parse a free-text AI response into structured data"""
+        data = self._decode_json(text)
+        if data is None:
+            return self._extract_from_text(text, query, sources)
+        return self._build_result(data, query, sources)
+    
+    def _build_result(self, data: Dict, query: str, sources: List[str]) -> Dict:
+        """Normalize decoded estimate JSON into the price-result structure"""
         try:
-            # Clean up markdown code blocks if present
-            if '```json' in text:
-                text = text.split('```json')[1].split('```')[0]
-            elif '```' in text:
-                parts = text.split('```')
-                if len(parts) >= 2:
-                    text = parts[1]
-            
-            data = json.loads(text.strip())
-            
-            # Normalize the response
             estimate = data.get('estimate', {})
             
             return {
@@ -246,22 +721,15 @@ Be thorough. Base your estimate on real market data you find."""
                 }
             }
             
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse AI response: {e}")
-            return self._extract_from_text(text, query, sources)
         except Exception as e:
             return self._error_result(str(e))
     
     def _extract_from_text(self, text: str, query: str, sources: List[str]) -> Dict:
         """Fallback: Extract price info from unstructured text"""
-        import re
-        
         # Try to find price mentions
-        prices = re.findall(r'\$[\d,]+(?:\.\d{2})?', text)
-        prices = [float(p.replace('$', '').replace(',', '')) for p in prices]
+        prices = sorted(float(p.replace(',', '')) for p in _PRICE_RE.findall(text))
         
         if prices:
-            prices.sort()
             return {
                 'success': True,
                 'query': query,
@@ -282,7 +750,7 @@ Be thorough. Base your estimate on real market data you find."""
                     'comparable_items': [],
                     'value_factors': [],
                     'search_sources': sources,
-                    'pricing_notes': 'Extracted from unstructured AI response'
+                    'pricing_notes': FALLBACK_PRICING_NOTES
                 }
             }
         
@@ -303,6 +771,152 @@ Be thorough. Base your estimate on real market data you find."""
         }
 
 
+def _is_retryable(exc: Exception) -> bool:
+    """Rate limits, transient server errors and timeouts are worth retrying"""
+    if isinstance(exc, (TimeoutError, httpx.TimeoutException)):
+        return True
+    return isinstance(exc, errors.APIError) and exc.code in RETRY_STATUS_CODES
+
+
+class _RateLimiter:
+    """Async token bucket: up to `per_minute` acquisitions a minute, refilled continuously"""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class PriceEstimateQueue:
+    """
+    Rate-limited worker pool in front of AIPriceEstimator for bulk imports.
+    
+    Items are paced to max_qpm, at most max_concurrency are in flight, and
+    rate-limit/timeout failures are retried with jittered exponential
+    backoff.
+    
+    Usage:
+        async with PriceEstimateQueue(max_qpm=500) as queue:
+            futures = [await queue.submit({'query': q}) for q in queries]
+            results = await asyncio.gather(*futures)
+    """
+    
+    def __init__(
+        self,
+        estimator: Optional['AIPriceEstimator'] = None,
+        max_qpm: int = PRICE_QUEUE_QPM,
+        max_concurrency: int = PRICE_QUEUE_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ):
+        """
+        Args:
+            estimator: Estimator to use (a new one by default)
+            max_qpm: Gemini requests per minute, across all workers
+            max_concurrency: Number of worker coroutines
+            max_retries: Retries per item after the first attempt
+            progress_callback: Called with (completed, submitted) after each item
+        """
+        self.estimator = estimator or AIPriceEstimator()
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.progress_callback = progress_callback
+        self.submitted = 0
+        self.completed = 0
+        self._limiter = _RateLimiter(max_qpm)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    async def submit(self, item: Dict) -> asyncio.Future:
+        """
+        Queue an item ('query' plus optional 'condition' / 'additional_context').
+        
+        Returns:
+            Future resolving to the estimate result dict
+        """
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        future = asyncio.get_running_loop().create_future()
+        self.submitted += 1
+        await self._queue.put((item, future))
+        return future
+    
+    async def close(self):
+        """Wait for queued items to finish, then stop the workers"""
+        if not self._workers:
+            return
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def _worker(self):
+        while True:
+            item, future = await self._queue.get()
+            try:
+                result = await self._estimate(item)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.completed += 1
+                self._queue.task_done()
+                if self.progress_callback:
+                    self.progress_callback(self.completed, self.submitted)
+    
+    async def _estimate(self, item: Dict) -> Dict:
+        estimator = self.estimator
+        query = item['query']
+        condition = item.get('condition', 'Used')
+        context = item.get('additional_context')
+        
+        if not estimator.client:
+            return await asyncio.to_thread(estimator.estimate_price, query, condition, None, context)
+        
+        key = _price_cache_key(query, condition, context)
+        cached = estimator.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.acquire()
+            try:
+                result = await estimator._estimate_with_search_async(query, condition, context, raise_retryable=True)
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_retries:
+                    return estimator._error_result(str(e))
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)) + random.uniform(0, RETRY_BASE_DELAY)
+                print(f"⏳ Price estimate for {query!r} hit {e}, retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+            
+            if _cacheable(result):
+                estimator.cache.put(key, result, condition)
+            return result
+
+
 # Test the estimator
 if __name__ == "__main__":
     print("Testing AI Price Estimator (2026 SDK)...")
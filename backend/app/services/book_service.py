@@ -1,13 +1,64 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List
+
+from backend.app.core import json_utils
+from backend.app.core.http_session import create_session
+
+# Keep-alive pool reused across ISBN lookups
+_SESSION = create_session()
+
+GOOGLE_BOOKS_API = "https://www.googleapis.com/books/v1/volumes"
+
+# Google Books returns at most 40 volumes per query, so OR-ed ISBN
+# queries are chunked to that size; stragglers are looked up one by one
+ISBN_BATCH_SIZE = 40
+LOOKUP_WORKERS = 16
+
+
+def _book_from_volume(volume: Dict, isbn: str) -> Dict:
+    """Flatten a Google Books volumeInfo into the BookService result dict"""
+    return {
+        'success': True,
+        'title': volume.get('title'),
+        'authors': volume.get('authors', []),
+        'publisher': volume.get('publisher'),
+        'publishedDate': volume.get('publishedDate'),
+        'description': volume.get('description'),
+        'pageCount': volume.get('pageCount'),
+        'categories': volume.get('categories', []),
+        'thumbnail': volume.get('imageLinks', {}).get('thumbnail'),
+        'isbn': isbn,
+        'source': 'google_books'
+    }
+
+
+@lru_cache(maxsize=4096)
+def _fetch_isbn(isbn: str) -> Dict:
+    """
+    Single-ISBN lookup, memoized per process.
+
+    HTTP and network errors propagate, so only real answers (found or
+    not found) are cached.
+    """
+    response = _SESSION.get(GOOGLE_BOOKS_API, params={'q': f'isbn:{isbn}'}, timeout=10)
+    response.raise_for_status()
+    data = json_utils.loads(response.content)
+
+    if data.get('totalItems', 0) > 0 and 'items' in data:
+        # Get the first match
+        return _book_from_volume(data['items'][0].get('volumeInfo', {}), isbn)
+
+    return {'success': False, 'error': 'Book not found'}
 
-import requests
-from typing import Dict, Optional
 
 class BookService:
     """
     Fetches book metadata from Google Books API using ISBN.
     """
     
-    GOOGLE_BOOKS_API = "https://www.googleapis.com/books/v1/volumes"
+    GOOGLE_BOOKS_API = GOOGLE_BOOKS_API
     
     def __init__(self):
         pass  # API Key not strictly valid for public access but recommended for higher limits
@@ -18,42 +69,72 @@ class BookService:
         
         Args:
             isbn: ISBN-10 or ISBN-13 string (digits only)
-            
+        
         Returns:
             Dict with title, authors, publisher, publishedDate, description, imageLinks
         """
+        try:
+            # Deep copy so callers can't mutate the cached entry's lists either
+            return copy.deepcopy(_fetch_isbn(isbn))
+        except Exception as e:
+            print(f"⚠️ Google Books API failed: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def lookup_isbns(self, isbns: List[str]) -> Dict[str, Dict]:
+        """
+        Lookup many ISBNs with as few requests as possible.
+        
+        ISBNs are queried in OR-ed groups of ISBN_BATCH_SIZE; any not matched
+        in a group's results are then looked up individually in parallel.
+        
+        Args:
+            isbns: ISBN-10 / ISBN-13 strings (digits only)
+        
+        Returns:
+            Dict of isbn -> lookup_isbn-style result
+        """
+        wanted = list(dict.fromkeys(isbns))
+        results = {}
+        
+        for start in range(0, len(wanted), ISBN_BATCH_SIZE):
+            results.update(self._lookup_batch(wanted[start:start + ISBN_BATCH_SIZE]))
+        
+        missing = [isbn for isbn in wanted if isbn not in results]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(LOOKUP_WORKERS, len(missing))) as executor:
+                results.update(zip(missing, executor.map(self.lookup_isbn, missing)))
+        
+        return results
+    
+    def _lookup_batch(self, isbns: List[str]) -> Dict[str, Dict]:
+        """One OR-ed query for a group of ISBNs; returns only the ones matched"""
+        if len(isbns) < 2:
+            return {}  # a single ISBN goes through the cached lookup_isbn path
+        
         params = {
-            'q': f'isbn:{isbn}'
+            'q': ' OR '.join(f'isbn:{isbn}' for isbn in isbns),
+            'maxResults': ISBN_BATCH_SIZE
         }
         
         try:
-            response = requests.get(self.GOOGLE_BOOKS_API, params=params, timeout=10)
+            response = _SESSION.get(GOOGLE_BOOKS_API, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
-            
-            if data.get('totalItems', 0) > 0 and 'items' in data:
-                # Get the first match
-                volume = data['items'][0].get('volumeInfo', {})
-                
-                return {
-                    'success': True,
-                    'title': volume.get('title'),
-                    'authors': volume.get('authors', []),
-                    'publisher': volume.get('publisher'),
-                    'publishedDate': volume.get('publishedDate'),
-                    'description': volume.get('description'),
-                    'pageCount': volume.get('pageCount'),
-                    'categories': volume.get('categories', []),
-                    'thumbnail': volume.get('imageLinks', {}).get('thumbnail'),
-                    'isbn': isbn,
-                    'source': 'google_books'
-                }
-            
-            return {'success': False, 'error': 'Book not found'}
-            
+            data = json_utils.loads(response.content)
         except Exception as e:
-            print(f"⚠️ Google Books API failed: {e}")
-            return {'success': False, 'error': str(e)}
+            print(f"⚠️ Google Books batch lookup failed: {e}")
+            return {}
+        
+        # Results aren't in request order, so match them back by identifier
+        remaining = set(isbns)
+        found = {}
+        for item in data.get('items', []):
+            volume = item.get('volumeInfo', {})
+            for identifier in volume.get('industryIdentifiers', []):
+                isbn = identifier.get('identifier')
+                if isbn in remaining:
+                    remaining.discard(isbn)
+                    found[isbn] = _book_from_volume(volume, isbn)
+        return found
 
 if __name__ == "__main__":
     # Test
@@ -1,10 +1,116 @@
-import requests
-from datetime import datetime, timedelta
+import heapq
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from backend.app.core import json_utils
+from backend.app.core.http_session import create_session
 from backend.app.core.logger import get_logger
 from backend.app.services.ebay.policies import _get_headers, _refresh_token_if_needed
 
 logger = get_logger('ebay_analytics_service')
 
+# Optional: ijson lets order pages be reduced while they download instead
+# of decoding each whole payload into a dict tree first
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# 500 is left to the token-refresh path below (eBay reports expired tokens
+# that way), so only rate limits and gateway errors are retried here
+_SESSION = create_session(status_forcelist=(429, 502, 503, 504))
+
+FULFILLMENT_URL = 'https://api.ebay.com/sell/fulfillment/v1'
+
+# getOrders returns at most 200 orders per page; the summary fetches the
+# remaining pages in parallel, up to a cap that bounds memory
+ORDERS_PAGE_SIZE = 200
+MAX_SUMMARY_ORDERS = 5000
+PAGE_FETCH_WORKERS = 8
+BEST_SELLER_COUNT = 5
+
+
+def _page_orders(response):
+    """Iterate the orders in a getOrders page, streaming when ijson is available"""
+    if HAS_IJSON:
+        response.raw.decode_content = True
+        return ijson.items(response.raw, 'orders.item')
+    return iter(json_utils.loads(response.content).get('orders', []))
+
+
+class _OrderTotals:
+    """
+    Running revenue/quantity totals for the analytics summary.
+    
+    Each page is reduced into its own instance as it is read, and the
+    page totals are merged, so the full order list never sits in memory.
+    """
+    
+    def __init__(self):
+        self.orders_count = 0
+        self.total_revenue = 0.0
+        self.items_sold = 0
+        self.daily_sales = defaultdict(float)  # 'YYYY-MM-DD' -> revenue
+        self.item_sales = defaultdict(lambda: [0, 0.0])  # title -> [qty, revenue]
+    
+    def add(self, orders):
+        """Fold an iterable of orders into the totals"""
+        daily_sales = self.daily_sales
+        item_sales = self.item_sales
+        
+        for order in orders:
+            self.orders_count += 1
+            order_total = float(order.get('pricingSummary', {}).get('total', {}).get('value', 0))
+            self.total_revenue += order_total
+            
+            # "2023-10-27T10:00:00.000Z" -> "2023-10-27"
+            date_str = order.get('creationDate')
+            if date_str:
+                daily_sales[date_str[:10]] += order_total
+            
+            for line_item in order.get('lineItems', []):
+                qty = int(line_item.get('quantity', 1))
+                self.items_sold += qty
+                # Line item totals, not the order total, so multi-item orders split correctly
+                stats = item_sales[line_item.get('title', 'Unknown Item')]
+                stats[0] += qty
+                stats[1] += float(line_item.get('total', {}).get('value', 0))
+        return self
+    
+    def merge(self, other):
+        """Add another page's totals into this one"""
+        self.orders_count += other.orders_count
+        self.total_revenue += other.total_revenue
+        self.items_sold += other.items_sold
+        for day, revenue in other.daily_sales.items():
+            self.daily_sales[day] += revenue
+        for title, (qty, revenue) in other.item_sales.items():
+            stats = self.item_sales[title]
+            stats[0] += qty
+            stats[1] += revenue
+        return self
+
+
+def _daily_chart(daily_sales, start, end):
+    """
+    Dense chart series: one point per day from start to end, zero-filled.
+    
+    The range widens to include any order day outside it (eBay dates are
+    UTC, so the edges can fall a day either side of the local window).
+    """
+    if daily_sales:
+        days = sorted(daily_sales)
+        start = min(start, date.fromisoformat(days[0]))
+        end = max(end, date.fromisoformat(days[-1]))
+    
+    chart_data = []
+    for offset in range((end - start).days + 1):
+        day = (start + timedelta(days=offset)).isoformat()
+        chart_data.append({'date': day, 'sales': round(daily_sales.get(day, 0.0), 2)})
+    return chart_data
+
+
 class AnalyticsService:
     """Service for handling eBay Analytics and Order data"""
     
@@ -14,26 +120,21 @@ class AnalyticsService:
     def get_recent_orders(self, days=30, limit=50):
         """Fetch recent orders from eBay Fulfillment API"""
         try:
-            FULFILLMENT_URL = 'https://api.ebay.com/sell/fulfillment/v1'
             date_from = (datetime.now() - timedelta(days=int(days))).strftime('%Y-%m-%dT00:00:00.000Z')
             
-            response = requests.get(
-                f'{FULFILLMENT_URL}/order',
-                headers=_get_headers(),
-                params={'filter': f'creationdate:[{date_from}..]', 'limit': limit}
-            )
+            url = f'{FULFILLMENT_URL}/order'
+            params = {'filter': f'creationdate:[{date_from}..]', 'limit': limit}
+            headers = _get_headers()
+            response = _SESSION.get(url, headers=headers, params=params)
             
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.get(
-                    f'{FULFILLMENT_URL}/order',
-                    headers=_get_headers(),
-                    params={'filter': f'creationdate:[{date_from}..]', 'limit': limit}
-                )
+            if response.status_code in [401, 500] and (token := _refresh_token_if_needed(response)):
+                headers['Authorization'] = f'Bearer {token}'
+                response = _SESSION.get(url, headers=headers, params=params)
             
             if response.status_code != 200:
                 return {'error': f'eBay API error: {response.status_code}', 'details': response.text[:200]}, 500
             
-            data = response.json()
+            data = json_utils.loads(response.content)
             orders = []
             
             for order in data.get('orders', []):
@@ -56,82 +157,79 @@ class AnalyticsService:
             logger.exception("Error getting recent orders")
             return {'error': str(e)}, 500
 
+    def _fetch_order_totals(self, date_from):
+        """
+        Reduce every order created since date_from (up to MAX_SUMMARY_ORDERS).
+        
+        The first page reports the total; the remaining pages are then
+        requested concurrently over the shared session, and each is reduced
+        as it streams in rather than being kept.
+        
+        Returns:
+            (totals, error) - error is a message if any page failed
+        """
+        url = f'{FULFILLMENT_URL}/order'
+        params = {'filter': f'creationdate:[{date_from}..]', 'limit': ORDERS_PAGE_SIZE}
+        
+        headers = _get_headers()
+        response = _SESSION.get(url, headers=headers, params=params)
+        
+        if response.status_code in [401, 500] and (token := _refresh_token_if_needed(response)):
+            headers['Authorization'] = f'Bearer {token}'
+            response = _SESSION.get(url, headers=headers, params=params)
+        
+        if response.status_code != 200:
+            return None, f'eBay API error: {response.status_code}'
+        
+        data = json_utils.loads(response.content)
+        orders = data.get('orders', [])
+        totals = _OrderTotals().add(orders)
+        total = min(data.get('total', len(orders)), MAX_SUMMARY_ORDERS)
+        offsets = range(ORDERS_PAGE_SIZE, total, ORDERS_PAGE_SIZE)
+        
+        if offsets:
+            def reduce_page(offset):
+                with _SESSION.get(url, headers=headers, params={**params, 'offset': offset}, stream=True) as page:
+                    if page.status_code != 200:
+                        return page.status_code
+                    return _OrderTotals().add(_page_orders(page))
+            
+            with ThreadPoolExecutor(max_workers=min(PAGE_FETCH_WORKERS, len(offsets))) as executor:
+                for page_totals in executor.map(reduce_page, offsets):
+                    if not isinstance(page_totals, _OrderTotals):
+                        return None, f'eBay API error: {page_totals}'
+                    totals.merge(page_totals)
+        
+        return totals, None
+
     def get_analytics_summary(self, days=30):
         """Calculate analytics summary from orders"""
         try:
             # 1. Fetch Orders
-            FULFILLMENT_URL = 'https://api.ebay.com/sell/fulfillment/v1'
-            date_from = (datetime.now() - timedelta(days=int(days))).strftime('%Y-%m-%dT00:00:00.000Z')
+            now = datetime.now()
+            start = now - timedelta(days=int(days))
+            date_from = start.strftime('%Y-%m-%dT00:00:00.000Z')
             
-            # We need ALL orders for calculation, so increase limit
-            response = requests.get(
-                f'{FULFILLMENT_URL}/order',
-                headers=_get_headers(),
-                params={'filter': f'creationdate:[{date_from}..]', 'limit': 200}
-            )
-            
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.get(
-                    f'{FULFILLMENT_URL}/order',
-                    headers=_get_headers(),
-                    params={'filter': f'creationdate:[{date_from}..]', 'limit': 200}
-                )
-            
-            if response.status_code != 200:
-                return {'error': f'eBay API error: {response.status_code}'}, 500
-                
-            data = response.json()
-            orders = data.get('orders', [])
+            # We need ALL orders for calculation, so walk every page
+            totals, error = self._fetch_order_totals(date_from)
+            if error:
+                return {'error': error}, 500
             
             # 2. Calculate Stats
-            total_revenue = 0.0
-            items_sold = 0
-            daily_sales = {}
-            item_sales = {} # title -> {qty, revenue}
-            
-            for order in orders:
-                # Revenue
-                order_total = float(order.get('pricingSummary', {}).get('total', {}).get('value', 0))
-                total_revenue += order_total
-                
-                # Date for chart
-                date_str = order.get('creationDate')
-                if date_str:
-                    # Parse "2023-10-27T10:00:00.000Z" -> "2023-10-27"
-                    day = date_str.split('T')[0]
-                    daily_sales[day] = daily_sales.get(day, 0) + order_total
-                
-                # Items
-                for line_item in order.get('lineItems', []):
-                    qty = int(line_item.get('quantity', 1))
-                    items_sold += qty
-                    title = line_item.get('title', 'Unknown Item')
-                    
-                    if title not in item_sales:
-                        item_sales[title] = {'qty': 0, 'revenue': 0.0}
-                    item_sales[title]['qty'] += qty
-                    # Approximate revenue per item (split order total? or use line item price?)
-                    # Using line item total is better
-                    line_total = float(line_item.get('total', {}).get('value', 0))
-                    item_sales[title]['revenue'] += line_total
-
-            # 3. Format Chart Data
-            chart_data = []
-            # Fill in missing dates? For now just present ones
-            for day in sorted(daily_sales.keys()):
-                chart_data.append({'date': day, 'sales': round(daily_sales[day], 2)})
+            total_revenue = totals.total_revenue
+            items_sold = totals.items_sold
+            daily_sales = totals.daily_sales
+            item_sales = totals.item_sales
+
+            # 3. Format Chart Data (every day in the window, so the chart has no gaps)
+            chart_data = _daily_chart(daily_sales, start.date(), now.date())
                 
-            # 4. Format Best Sellers
-            best_sellers = []
-            for title, stats in item_sales.items():
-                best_sellers.append({
-                    'title': title,
-                    'qty': stats['qty'],
-                    'revenue': round(stats['revenue'], 2)
-                })
-            # Sort by revenue desc
-            best_sellers.sort(key=lambda x: x['revenue'], reverse=True)
-            best_sellers = best_sellers[:5]
+            # 4. Format Best Sellers (top N by revenue)
+            top_items = heapq.nlargest(BEST_SELLER_COUNT, item_sales.items(), key=lambda entry: entry[1][1])
+            best_sellers = [
+                {'title': title, 'qty': qty, 'revenue': round(revenue, 2)}
+                for title, (qty, revenue) in top_items
+            ]
             
             # 5. Get Active Listings Count (for sell-through)
             active_count = 0
@@ -144,7 +242,7 @@ class AnalyticsService:
                     logger.warning(f"Failed to get active count via callback: {e}")
             
             # 6. Calculate Averages
-            orders_count = len(orders)
+            orders_count = totals.orders_count
             average_order_value = total_revenue / orders_count if orders_count > 0 else 0
             
             sell_through_rate = 0
@@ -4,14 +4,38 @@ Uses official eBay OAuth methodology with proper RuName configuration
 """
 import os
 import base64
-import webbrowser
 import urllib.parse
-import requests
 import json
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
-import time
+
+from urllib3.util.retry import Retry
+
+from backend.app.core import json_utils
+from backend.app.core.env_file import read_env, write_env
+from backend.app.core.http_session import create_session
+
+# Keep-alive pool for token requests. Token grants are POSTs, which urllib3
+# doesn't retry by default; a failed refresh sends the user back through
+# interactive consent, so transient 429/5xx and resets are retried here too
+_SESSION = create_session(
+    total_retries=5,
+    backoff_factor=0.5,
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'},
+)
+
+# Authorization codes are single-use: a resent exchange whose first attempt
+# reached eBay fails with invalid_grant, so the code exchange only retries
+# connection failures (urllib3 never resends a POST it has transmitted)
+_CODE_SESSION = create_session()
+
+# (connect, read) seconds, so a stalled token endpoint can't hang the caller
+REQUEST_TIMEOUT = (3.05, 10)
+
+
+def get_token_session():
+    """The retrying session for refresh and client-credentials token grants"""
+    return _SESSION
+
 
 class eBayOAuth:
     """Complete eBay OAuth implementation"""
@@ -56,14 +80,7 @@ class eBayOAuth:
         
     def load_credentials(self):
         """Load credentials from .env"""
-        credentials = {}
-        if self.env_path.exists():
-            with open(self.env_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        credentials[key.strip()] = value.strip()
+        credentials = read_env(self.env_path)
         
         self.app_id = credentials.get('EBAY_APP_ID')
         self.cert_id = credentials.get('EBAY_CERT_ID')
@@ -71,6 +88,12 @@ class eBayOAuth:
         self.user_token = credentials.get('EBAY_USER_TOKEN')
         self.refresh_token = credentials.get('EBAY_REFRESH_TOKEN')
         
+        # Reused by every token request instead of re-encoding/joining each time
+        self._basic_auth_header = "Basic " + base64.b64encode(
+            f"{self.app_id}:{self.cert_id}".encode('ascii')
+        ).decode('ascii')
+        self._scope_str = ' '.join(self.SCOPES)
+        
         print(f"✅ Loaded App ID: {self.app_id[:20]}..." if self.app_id else "❌ No App ID")
         print(f"✅ RuName: {self.ru_name}" if self.ru_name else "⚠️ No RuName configured")
         
@@ -86,7 +109,7 @@ class eBayOAuth:
             'client_id': self.app_id,
             'redirect_uri': redirect_uri,
             'response_type': 'code',
-            'scope': ' '.join(self.SCOPES),
+            'scope': self._scope_str,
             'prompt': 'login',  # Force fresh login
         }
         
@@ -94,12 +117,9 @@ class eBayOAuth:
     
     def exchange_code_for_token(self, auth_code):
         """Exchange authorization code for access token"""
-        credentials = f"{self.app_id}:{self.cert_id}"
-        encoded = base64.b64encode(credentials.encode()).decode()
-        
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
-            'Authorization': f'Basic {encoded}'
+            'Authorization': self._basic_auth_header
         }
         
         # Determine redirect URI
@@ -115,10 +135,10 @@ class eBayOAuth:
         }
         
         try:
-            response = requests.post(self.token_url, headers=headers, data=data)
+            response = _CODE_SESSION.post(self.token_url, headers=headers, data=data, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = json_utils.loads(response.content)
                 self.user_token = token_data['access_token']
                 self.refresh_token = token_data.get('refresh_token')
                 
@@ -147,25 +167,22 @@ class eBayOAuth:
             print("❌ No refresh token available")
             return False
             
-        credentials = f"{self.app_id}:{self.cert_id}"
-        encoded = base64.b64encode(credentials.encode()).decode()
-        
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
-            'Authorization': f'Basic {encoded}'
+            'Authorization': self._basic_auth_header
         }
         
         data = {
             'grant_type': 'refresh_token',
             'refresh_token': self.refresh_token,
-            'scope': ' '.join(self.SCOPES)
+            'scope': self._scope_str
         }
         
         try:
-            response = requests.post(self.token_url, headers=headers, data=data)
+            response = _SESSION.post(self.token_url, headers=headers, data=data, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = json_utils.loads(response.content)
                 self.user_token = token_data['access_token']
                 
                 print("✅ Token refreshed successfully!")
@@ -206,8 +223,7 @@ class eBayOAuth:
         if not refresh_updated and self.refresh_token:
             new_lines.append(f'EBAY_REFRESH_TOKEN={self.refresh_token}\n')
         
-        with open(self.env_path, 'w') as f:
-            f.writelines(new_lines)
+        write_env(self.env_path, ''.join(new_lines))
         
         print("✅ Tokens saved to .env")
     
@@ -241,6 +257,9 @@ class eBayOAuth:
             # Try with default redirect
             print("\nAttempting with eBay's default redirect URL...")
         
+        # Interactive-only; kept out of the import path for server use
+        import webbrowser
+        
         url = self.get_authorization_url()
         
         print(f"\n📌 Opening browser for authorization...")
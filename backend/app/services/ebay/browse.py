@@ -2,22 +2,188 @@
 eBay Browse API Client for Price Research
 Uses the official Browse API to get current market prices for similar items.
 """
+import copy
+import time
 import base64
+import asyncio
+import statistics
+import threading
 import requests
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
+from backend.app.core import json_utils
+from backend.app.core.env_file import read_env
+from backend.app.core.http_session import create_session
+from backend.app.services.ebay.auth import REQUEST_TIMEOUT, get_token_session
 
-@dataclass
-class MarketItem:
-    """Represents an item from market research"""
-    title: str
-    price: float
-    condition: str
-    image_url: str
-    item_url: str
-    seller: str
+# Optional: aiohttp runs concurrent searches on one event loop; without it
+# search_many falls back to worker threads over the pooled session
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Optional: numpy reduces large aggregated price lists in C
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Keep-alive pool to api.ebay.com shared by every client instance. Token
+# grants go through auth.py's session instead, which also retries POSTs;
+# both use its (connect, read) REQUEST_TIMEOUT.
+_SESSION = create_session(pool_connections=10, pool_maxsize=20)
+_TOKEN_SESSION = get_token_session()
+
+# Renew application tokens this long before eBay says they expire
+TOKEN_EXPIRY_MARGIN = 60
+
+# Renew tokens in the background once this fraction of their lifetime has passed
+TOKEN_PREFETCH_FRACTION = 0.9
+
+# Below this many prices numpy's median costs more than statistics.median
+NUMPY_STATS_MIN = 32
+
+# Search responses are streamed and abandoned past this size rather than
+# buffered whole; a normal 200-item page is well under 1 MB
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+RESPONSE_CHUNK_SIZE = 65536
+
+# Upper bound on simultaneous Browse requests from search_many
+MAX_CONCURRENT_SEARCHES = 20
+
+# Items per search request, and the deepest offset Browse will serve
+PAGE_SIZE = 50
+MAX_SEARCH_OFFSET = 10000
+
+# Identical searches within this many seconds reuse the earlier result
+# (UI refreshes, retries, batch enrichment); shared by all instances since
+# Flask builds a new client per request
+SEARCH_CACHE_TTL = 60
+SEARCH_CACHE_SIZE = 256
+_search_cache: OrderedDict = OrderedDict()  # (query, limit) -> (stored_at, result)
+_search_cache_lock = threading.Lock()
+
+
+def _cached_search(key: tuple) -> Optional[Dict]:
+    """A copy of a fresh cached search result, or None"""
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= SEARCH_CACHE_TTL:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+
+def _remember_search(key: tuple, result: Dict):
+    """Store a search result, evicting the least recently used past SEARCH_CACHE_SIZE"""
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic(), copy.deepcopy(result))
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+def _read_capped(response: requests.Response) -> Optional[bytes]:
+    """Read a stream=True response body, or None once it passes MAX_RESPONSE_BYTES"""
+    declared = response.headers.get('Content-Length')
+    if declared and int(declared) > MAX_RESPONSE_BYTES:
+        return None
+    
+    chunks = []
+    total = 0
+    for chunk in response.iter_content(RESPONSE_CHUNK_SIZE):
+        total += len(chunk)
+        if total > MAX_RESPONSE_BYTES:
+            return None
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+# Application tokens are shared by every client (Flask builds a new one per
+# request), as is the one timer that renews them; all guarded by _token_lock
+_token_lock = threading.Lock()
+_token_state = {
+    'basic_auth': None,     # credentials the token was issued for
+    'access_token': None,
+    'expiry': 0.0,          # time.monotonic() deadline, less TOKEN_EXPIRY_MARGIN
+    'search_headers': None,
+    'used': False,          # read since the last fetch; idle tokens aren't renewed
+}
+_refresh_timer: Optional[threading.Timer] = None
+
+
+def _valid_token(basic_auth: str) -> Optional[str]:
+    """The shared token if it was issued for these credentials and hasn't expired"""
+    if (_token_state['basic_auth'] == basic_auth and _token_state['access_token']
+            and time.monotonic() < _token_state['expiry']):
+        return _token_state['access_token']
+    return None
+
+
+def _schedule_refresh(delay: float):
+    """Arm the shared daemon timer to renew the token; caller holds _token_lock"""
+    global _refresh_timer
+    if _refresh_timer is not None:
+        _refresh_timer.cancel()
+    _refresh_timer = threading.Timer(delay, _prefetch_token)
+    _refresh_timer.daemon = True
+    _refresh_timer.start()
+
+
+def _prefetch_token():
+    """Timer target: renew the token ahead of expiry if it was used since the last fetch"""
+    global _refresh_timer
+    with _token_lock:
+        _refresh_timer = None
+        if not _token_state['used'] or not _token_state['basic_auth']:
+            return  # idle: let the next search fetch lazily instead
+        _fetch_token(_token_state['basic_auth'])
+
+
+def _fetch_token(basic_auth: str) -> Optional[str]:
+    """Request a new application token; caller holds _token_lock"""
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Authorization": basic_auth
+    }
+    
+    data = {
+        "grant_type": "client_credentials",
+        "scope": "https://api.ebay.com/oauth/api_scope"
+    }
+    
+    try:
+        response = _TOKEN_SESSION.post(eBayBrowseAPI.AUTH_URL, headers=headers, data=data, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        
+        token_data = json_utils.loads(response.content)
+        expires_in = int(token_data.get('expires_in', 7200))
+        access_token = token_data['access_token']
+        _token_state.update(
+            basic_auth=basic_auth,
+            access_token=access_token,
+            expiry=time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN,
+            # Browse headers only change with the token, so build them once here
+            search_headers={
+                "Authorization": f"Bearer {access_token}",
+                "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
+                "X-EBAY-C-ENDUSERCTX": "affiliateCampaignId=<ePNCampaignId>,affiliateReferenceId=<referenceId>"
+            },
+            used=False
+        )
+        _schedule_refresh(expires_in * TOKEN_PREFETCH_FRACTION)
+        return access_token
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"❌ Browse API auth failed: {e}")
+        return None
 
 
 class eBayBrowseAPI:
@@ -33,7 +199,7 @@ class eBayBrowseAPI:
     
     def __init__(self):
         self.load_credentials()
-        self._access_token = None
+        self._inflight = {}  # (query, limit) -> in-flight search task
     
     def load_credentials(self):
         """Load API credentials from .env file"""
@@ -51,48 +217,47 @@ class eBayBrowseAPI:
         if not env_path.exists():
             raise FileNotFoundError(f"No .env file found at {env_path}")
         
-        credentials = {}
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    credentials[key.strip()] = value.strip()
+        credentials = read_env(env_path)
         
         self.app_id = credentials.get('EBAY_APP_ID')
         self.cert_id = credentials.get('EBAY_CERT_ID')
         
         if not all([self.app_id, self.cert_id]):
             raise ValueError("Missing EBAY_APP_ID or EBAY_CERT_ID in .env file")
-    
-    def get_access_token(self) -> Optional[str]:
-        """Get OAuth access token using Client Credentials Grant"""
-        if self._access_token:
-            return self._access_token
         
-        credentials = f"{self.app_id}:{self.cert_id}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        # Client credentials never change for an instance, so encode them once
+        self._basic_auth_header = "Basic " + base64.b64encode(
+            f"{self.app_id}:{self.cert_id}".encode('ascii')
+        ).decode('ascii')
+    
+    def get_access_token(self, force: bool = False) -> Optional[str]:
+        """
+        Get OAuth access token using Client Credentials Grant (cached until it expires).
         
-        data = {
-            "grant_type": "client_credentials",
-            "scope": "https://api.ebay.com/oauth/api_scope"
-        }
+        Args:
+            force: Fetch a new token even if the cached one is still valid
+        """
+        _token_state['used'] = True
+        if not force:
+            token = _valid_token(self._basic_auth_header)
+            if token:
+                return token
         
-        try:
-            response = requests.post(self.AUTH_URL, headers=headers, data=data)
-            response.raise_for_status()
-            
-            token_data = response.json()
-            self._access_token = token_data['access_token']
-            return self._access_token
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Browse API auth failed: {e}")
-            return None
+        with _token_lock:
+            # Another thread may have fetched one while we waited
+            if not force:
+                token = _valid_token(self._basic_auth_header)
+                if token:
+                    return token
+            token = _fetch_token(self._basic_auth_header)
+            if token:
+                _token_state['used'] = True
+            return token
+    
+    @property
+    def _search_headers(self) -> Optional[Dict]:
+        """Browse request headers for the current shared token"""
+        return _token_state['search_headers']
     
     def search_items(self, query: str, limit: int = 30) -> Dict:
         """
@@ -105,92 +270,243 @@ class eBayBrowseAPI:
         Returns:
             Dict with 'stats' and 'items' keys
         """
-        token = self.get_access_token()
-        if not token:
+        cached = _cached_search((query, limit))
+        if cached is not None:
+            return cached
+        
+        data = self._fetch_page(query, limit)
+        if data is None:
             return self._empty_result()
         
+        result = self._build_result(data)
+        _remember_search((query, limit), result)
+        return result
+    
+    def _fetch_page(self, query: str, limit: int, offset: int = 0) -> Optional[Dict]:
+        """One item_summary/search request; the decoded response, or None on failure"""
         url = f"{self.BROWSE_URL}/item_summary/search"
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "X-EBAY-C-MARKETPLACE-ID": "EBAY_US",
-            "X-EBAY-C-ENDUSERCTX": "affiliateCampaignId=<ePNCampaignId>,affiliateReferenceId=<referenceId>"
-        }
+        for attempt in range(2):
+            token = self.get_access_token(force=attempt > 0)
+            if not token:
+                return None
+            
+            try:
+                with _SESSION.get(
+                    url,
+                    headers=self._search_headers,
+                    params=self._search_params(query, limit, offset),
+                    stream=True,
+                    timeout=REQUEST_TIMEOUT
+                ) as response:
+                    if response.status_code == 401 and attempt == 0:
+                        # Token revoked or expired early: fetch a new one and retry once
+                        continue
+                    response.raise_for_status()
+                    
+                    body = _read_capped(response)
+                if body is None:
+                    print(f"❌ Browse API response for '{query}' exceeded {MAX_RESPONSE_BYTES // (1024 * 1024)} MB, discarded")
+                    return None
+                return json_utils.loads(body)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"❌ Browse API search failed: {e}")
+                if hasattr(e, 'response') and e.response:
+                    print(f"   Response: {e.response.text[:500]}")
+                return None
+    
+    async def search_items_async(self, query: str, limit: int = 30) -> Dict:
+        """
+        Async variant of search_items (see search_many for several queries).
+        
+        Concurrent calls for the same (query, limit) share one in-flight
+        request instead of each hitting eBay.
+        """
+        key = (query, limit)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.search_many([query], limit))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
         
+        # Shielded so one caller being cancelled doesn't cancel the others
+        results = await asyncio.shield(task)
+        return copy.deepcopy(results[0])
+    
+    async def search_many(self, queries: List[str], limit: int = 30) -> List[Dict]:
+        """
+        Search several queries concurrently.
+        
+        Args:
+            queries: Search keywords, one search each
+            limit: Max items per query
+            
+        Returns:
+            One search_items-style result per query, in order
+        """
+        results = [_cached_search((query, limit)) for query in queries]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        pages = await self._fetch_pages([(queries[i], limit, 0) for i in missing])
+        for i, data in zip(missing, pages):
+            if data is None:
+                results[i] = self._empty_result()
+            else:
+                results[i] = self._build_result(data)
+                _remember_search((queries[i], limit), results[i])
+        return results
+    
+    async def search_many_pages(self, query: str, total: int) -> Dict:
+        """
+        Collect up to `total` listings for one query.
+        
+        Browse returns PAGE_SIZE items per request here, so the offset
+        pages are requested concurrently and merged before stats are
+        calculated.
+        
+        Args:
+            query: Search keywords
+            total: Number of listings wanted (capped at MAX_SEARCH_OFFSET)
+            
+        Returns:
+            search_items-style result over all pages
+        """
+        total = min(total, MAX_SEARCH_OFFSET)
+        pages = await self._fetch_pages([
+            (query, min(PAGE_SIZE, total - offset), offset) for offset in range(0, total, PAGE_SIZE)
+        ])
+        if all(data is None for data in pages):
+            return self._empty_result()
+        
+        summaries = [summary for data in pages if data for summary in data.get('itemSummaries', [])]
+        return self._build_result({'itemSummaries': summaries})
+    
+    async def _fetch_pages(self, calls: List[tuple]) -> List[Optional[Dict]]:
+        """Run (query, limit, offset) searches concurrently; decoded responses in order"""
+        # Fetch the token once up front rather than racing for it per request
+        if not await asyncio.to_thread(self.get_access_token):
+            return [None] * len(calls)
+        
+        if not HAS_AIOHTTP:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+            
+            async def fetch(args):
+                async with semaphore:
+                    return await asyncio.to_thread(self._fetch_page, *args)
+            
+            return await asyncio.gather(*(fetch(args) for args in calls))
+        
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_SEARCHES, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(sock_connect=REQUEST_TIMEOUT[0], sock_read=REQUEST_TIMEOUT[1])
+        async with aiohttp.ClientSession(connector=connector, headers=self._search_headers, timeout=timeout) as session:
+            return await asyncio.gather(*(self._fetch_page_async(session, *args) for args in calls))
+    
+    async def _fetch_page_async(self, session, query: str, limit: int, offset: int = 0) -> Optional[Dict]:
+        """_fetch_page over a shared aiohttp session"""
+        url = f"{self.BROWSE_URL}/item_summary/search"
+        try:
+            async with session.get(url, params=self._search_params(query, limit, offset)) as response:
+                response.raise_for_status()
+                if (response.content_length or 0) > MAX_RESPONSE_BYTES:
+                    body = None
+                else:
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(RESPONSE_CHUNK_SIZE):
+                        body += chunk
+                        if len(body) > MAX_RESPONSE_BYTES:
+                            body = None
+                            break
+            if body is None:
+                print(f"❌ Browse API response for '{query}' exceeded {MAX_RESPONSE_BYTES // (1024 * 1024)} MB, discarded")
+                return None
+            return json_utils.loads(body)
+        except (aiohttp.ClientError, ValueError) as e:
+            print(f"❌ Browse API search failed: {e}")
+            return None
+    
+    def _search_params(self, query: str, limit: int, offset: int = 0) -> Dict:
+        """Query parameters for item_summary/search"""
         params = {
             "q": query,
-            "limit": min(limit, 50),  # API max is 200, but we keep it reasonable
+            "limit": min(limit, PAGE_SIZE),  # API max is 200, but we keep it reasonable
             "filter": "buyingOptions:{FIXED_PRICE}"  # Only Buy It Now for clean pricing
         }
+        if offset:
+            params["offset"] = offset
+        return params
+    
+    def _build_result(self, data: Dict) -> Dict:
+        """Turn a search response into the stats/items result"""
+        stats, items = self._parse_and_summarize(data.get('itemSummaries', []))
         
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            items = self._parse_items(data.get('itemSummaries', []))
-            stats = self._calculate_stats(items)
-            
-            return {
-                'stats': stats,
-                'items': [self._item_to_dict(item) for item in items],
-                'source': 'browse_api'
-            }
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Browse API search failed: {e}")
-            if hasattr(e, 'response') and e.response:
-                print(f"   Response: {e.response.text[:500]}")
-            return self._empty_result()
+        return {
+            'stats': stats,
+            'items': items,
+            'source': 'browse_api'
+        }
     
-    def _parse_items(self, summaries: List[Dict]) -> List[MarketItem]:
-        """Parse API response into MarketItem objects"""
+    def _parse_and_summarize(self, summaries: List[Dict]) -> Tuple[Dict, List[Dict]]:
+        """
+        Parse API item summaries into result item dicts and price stats.
+        
+        Sum, low and high accumulate in the same pass that builds the items;
+        only the median needs the collected prices afterwards.
+        
+        Returns:
+            (stats, items)
+        """
         items = []
+        prices = []
+        append = items.append
+        add_price = prices.append
+        _float = float
+        total = 0.0
+        low = high = None
         
         for summary in summaries:
+            get = summary.get
             try:
-                # Extract price
-                price_info = summary.get('price', {})
-                price_str = price_info.get('value', '0')
-                price = float(price_str)
-                
-                # Skip items with no price or unreasonable prices
-                if price <= 0 or price > 100000:
-                    continue
-                
-                # Extract other fields
-                title = summary.get('title', 'Unknown')
-                condition = summary.get('condition', 'Unknown')
-                image = summary.get('image', {}).get('imageUrl', '')
-                item_url = summary.get('itemWebUrl', '')
-                seller = summary.get('seller', {}).get('username', 'Unknown')
-                
-                items.append(MarketItem(
-                    title=title,
-                    price=price,
-                    condition=condition,
-                    image_url=image,
-                    item_url=item_url,
-                    seller=seller
-                ))
-            except (ValueError, KeyError):
+                # Extract price; a missing price block is skipped like a zero price
+                price_info = get('price')
+                price = _float(price_info['value']) if price_info else 0.0
+            except (KeyError, TypeError, ValueError):
+                continue
+            
+            # Skip items with no price or unreasonable prices
+            if price <= 0 or price > 100000:
                 continue
+            
+            add_price(price)
+            total += price
+            if low is None or price < low:
+                low = price
+            if high is None or price > high:
+                high = price
+            
+            append({
+                'title': get('title', 'Unknown'),
+                'price': price,
+                'shipping': 0,  # Browse API doesn't always include shipping
+                'date': 'Active',  # These are active listings
+                'condition': get('condition', 'Unknown'),
+                'url': get('itemWebUrl', '')
+            })
         
-        return items
+        if not prices:
+            return self._empty_result()['stats'], items
+        return self._price_stats(prices, total, low, high), items
     
-    def _calculate_stats(self, items: List[MarketItem]) -> Dict:
-        """Calculate pricing statistics from items"""
-        if not items:
-            return {
-                'average': 0, 'median': 0, 'low': 0, 'high': 0,
-                'sold': 0, 'trend': 'neutral', 'trendPercent': 0
-            }
-        
-        prices = sorted([item.price for item in items])
+    def _price_stats(self, prices: List[float], total: float, low: float, high: float) -> Dict:
+        """Calculate pricing statistics from the collected prices and running totals"""
+        count = len(prices)
+        avg_price = total / count
         
-        avg_price = sum(prices) / len(prices)
-        median_price = prices[len(prices) // 2]
-        low_price = prices[0]
-        high_price = prices[-1]
+        if HAS_NUMPY and count >= NUMPY_STATS_MIN:
+            median_price = float(np.median(np.fromiter(prices, dtype=np.float64, count=count)))
+        else:
+            median_price = statistics.median(prices)
         
         # Determine trend based on median vs average
         if avg_price > median_price * 1.1:
@@ -206,24 +522,13 @@ class eBayBrowseAPI:
         return {
             'average': round(avg_price, 2),
             'median': round(median_price, 2),
-            'low': round(low_price, 2),
-            'high': round(high_price, 2),
-            'sold': len(items),  # Note: These are active listings, not sold
+            'low': round(low, 2),
+            'high': round(high, 2),
+            'sold': count,  # Note: These are active listings, not sold
             'trend': trend,
             'trendPercent': trend_pct
         }
     
-    def _item_to_dict(self, item: MarketItem) -> Dict:
-        """Convert MarketItem to dict for JSON serialization"""
-        return {
-            'title': item.title,
-            'price': item.price,
-            'shipping': 0,  # Browse API doesn't always include shipping
-            'date': 'Active',  # These are active listings
-            'condition': item.condition,
-            'url': item.item_url
-        }
-    
     def _empty_result(self) -> Dict:
         """Return empty result structure"""
         return {
@@ -1,29 +1,192 @@
-import requests
+import copy
+import time
+import random
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.core import json_utils
+from backend.app.core.http_session import create_session
 from backend.app.core.logger import get_logger
-from backend.app.services.ebay.policies import _get_headers, _refresh_token_if_needed
+from backend.app.services.ebay.policies import INVENTORY_URL, _get_headers, _refresh_token_if_needed
+
+__all__ = ['InventoryService']
 
 logger = get_logger('ebay_inventory_service')
 
+# Optional: httpx backs the *_async methods, multiplexed over HTTP/2 when h2
+# is installed; the synchronous methods only need requests
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import h2  # noqa: F401  (httpx only needs it importable)
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+# Optional: ijson shapes later inventory pages while they download
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# Shared read-only stand-in for missing nested objects, so lookups on absent
+# keys don't allocate a fresh {} each time. Never mutate it.
+_EMPTY = {}
+
+# Keep-alive pool to api.ebay.com shared by every InventoryService call.
+# Only gateway errors are retried at the adapter: 401/500 mean "refresh the
+# token" and 429/503 are backed off in _call, for POSTs too.
+_SESSION = create_session(pool_connections=20, pool_maxsize=50, status_forcelist=(502, 504))
+
+# Status codes checked on every response: auth failures that warrant a
+# token refresh, and successful writes / creates / bulk (multi-status) calls
+_REFRESH_CODES = frozenset({401, 500})
+_OK_CODES = frozenset({200, 204})
+_CREATE_OK = frozenset({200, 201})
+_BULK_OK = frozenset({200, 207})
+_ENTRY_OK = frozenset({200, 201, 204})
+
+# (connect, read) timeouts for every Inventory API call, so a hung request
+# can't tie up a pooled worker. bulk_update_price_quantity gets a longer
+# read since eBay processes the whole batch before answering.
+_TIMEOUT = (5, 30)
+_BULK_TIMEOUT = (5, 60)
+
+# Rate-limit retries in _call: attempts after the first, and the
+# exponential backoff base/cap in seconds when eBay sends no Retry-After
+RATE_LIMIT_CODES = frozenset({429, 503})
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 10.0
+
+# Serializes token refreshes so concurrent 401s trigger a single refresh
+_refresh_lock = threading.Lock()
+
+# Inventory API maximum page size, and pages fetched at once after the first
+INVENTORY_PAGE_SIZE = 200
+PAGE_WORKERS = 8
+
+# Items looked up concurrently by bulk_update_titles, and the most
+# bulk_create_or_replace_inventory_item accepts per call
+TITLE_UPDATE_WORKERS = 10
+TITLE_BATCH_SIZE = 25
+
+# Connection cap for the httpx client behind the async methods
+ASYNC_MAX_CONNECTIONS = 50
+
+# Successful offer / inventory_item GETs are reused for this long, keyed by
+# API path. Writes through this service drop the entries they touch.
+GET_CACHE_TTL = 60
+GET_CACHE_SIZE = 512
+
+_get_cache = OrderedDict()  # path -> (fetched_at, payload)
+_get_cache_lock = threading.Lock()
+
+
+def _cached_get(path, max_age=GET_CACHE_TTL):
+    """A copy of the cached payload for an API path, or None if absent or older than max_age"""
+    if max_age <= 0:
+        return None  # caller needs the live value
+    with _get_cache_lock:
+        entry = _get_cache.get(path)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > GET_CACHE_TTL:
+            del _get_cache[path]
+            return None
+        if age > max_age:
+            return None
+        _get_cache.move_to_end(path)
+        return copy.deepcopy(entry[1])
+
+
+def _remember_get(path, payload):
+    """Cache a GET payload, evicting the least recently used past GET_CACHE_SIZE"""
+    with _get_cache_lock:
+        _get_cache[path] = (time.monotonic(), copy.deepcopy(payload))
+        _get_cache.move_to_end(path)
+        while len(_get_cache) > GET_CACHE_SIZE:
+            _get_cache.popitem(last=False)
+
+
+def _forget_get(*paths):
+    """Drop cached GETs after a write that may have changed them"""
+    with _get_cache_lock:
+        for path in paths:
+            _get_cache.pop(path, None)
+
+
+def _page_inventory_items(response):
+    """Iterate the items in an inventory_item page, streaming when ijson is available"""
+    if HAS_IJSON:
+        response.raw.decode_content = True
+        return ijson.items(response.raw, 'inventoryItems.item', use_float=True)
+    return iter(json_utils.loads(response.content).get('inventoryItems', []))
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before resending a rate-limited request"""
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY)
+
+
+def _call(method, path, **kwargs):
+    """
+    Send one Inventory API request with auth refresh and rate-limit backoff.
+    
+    Every InventoryService call goes through here: `path` is relative to
+    INVENTORY_URL, and the shared session, auth headers and _TIMEOUT
+    (unless the caller passes its own) are applied in this one place.
+    
+    A 401/500 refreshes the user token once and resends; when several
+    threads fail together, only the first refreshes and the rest resend
+    with its token. 429/503 responses are retried up to MAX_RETRIES times,
+    waiting out Retry-After when eBay sends it and backing off exponentially
+    with jitter otherwise, so the thread-pooled callers don't hammer a
+    throttled API.
+    """
+    url = f'{INVENTORY_URL}{path}'
+    kwargs.setdefault('timeout', _TIMEOUT)
+    refreshed = False
+    attempt = 0
+    while True:
+        headers = _get_headers()
+        response = _SESSION.request(method, url, headers=headers, **kwargs)
+        
+        if response.status_code in _REFRESH_CODES and not refreshed:
+            refreshed = True
+            with _refresh_lock:
+                token_changed = _get_headers().get('Authorization') != headers.get('Authorization')
+                if token_changed or _refresh_token_if_needed(response):
+                    response.close()
+                    continue
+        
+        if response.status_code in RATE_LIMIT_CODES and attempt < MAX_RETRIES:
+            time.sleep(_retry_delay(response, attempt))
+            response.close()
+            attempt += 1
+            continue
+        
+        return response
+
+
 class InventoryService:
     """Service for handling eBay Inventory API (REST) interactions"""
 
     def get_inventory_items(self):
         """Fetch active listings from eBay Inventory API"""
         try:
-            INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
-            
-            response = requests.get(
-                f'{INVENTORY_URL}/inventory_item',
-                headers=_get_headers(),
-                params={'limit': 100, 'offset': 0}
-            )
-            
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.get(
-                    f'{INVENTORY_URL}/inventory_item',
-                    headers=_get_headers(),
-                    params={'limit': 100, 'offset': 0}
-                )
+            response = _call('GET', '/inventory_item', params={'limit': INVENTORY_PAGE_SIZE, 'offset': 0})
             
             if response.status_code != 200:
                 # GRACEFUL FALLBACK: If 401 (Unauthorized) persists, return empty list (Offline Mode)
@@ -39,26 +202,17 @@ class InventoryService:
                 
                 return {'error': f'eBay API error: {response.status_code}'}, 502
 
-            data = response.json()
-            items = []
+            data = json_utils.loads(response.content)
+            items = [self._listing_from_item(item) for item in data.get('inventoryItems', [])]
             
-            for item in data.get('inventoryItems', []):
-                product = item.get('product', {})
-                img_urls = product.get('imageUrls', [])
-                main_image = img_urls[0] if img_urls else None
-                
-                items.append({
-                    'sku': item.get('sku'),
-                    'offerId': None,
-                    'listingId': 'Unknown', 
-                    'title': product.get('title', 'No Title'),
-                    'price': 0.0,
-                    'currency': 'USD',
-                    'availableQuantity': item.get('availability', {}).get('shipToLocationAvailability', {}).get('quantity', 0),
-                    'imageUrl': main_image,
-                    'status': 'Active' if item.get('condition') else 'Draft',
-                    'condition': item.get('condition', 'USED_EXCELLENT')
-                })
+            # The first page tells us the total; fetch the rest side by side
+            offsets = range(INVENTORY_PAGE_SIZE, data.get('total', 0), INVENTORY_PAGE_SIZE)
+            if offsets:
+                with ThreadPoolExecutor(max_workers=min(PAGE_WORKERS, len(offsets))) as executor:
+                    for page_status, page_items in executor.map(self._get_inventory_page, offsets):
+                        if page_status != 200:
+                            return {'error': f'eBay API error: {page_status}'}, 502
+                        items.extend(page_items)
 
             # FALLBACK: If Inventory API returns 0 items, try Legacy Trading API
             if not items:
@@ -88,25 +242,79 @@ class InventoryService:
             # But user wants "tool to work". Let's stick to catching the specific 401 for now.
             return {'error': str(e)}, 500
 
+    def get_inventory_count(self):
+        """
+        Number of inventory items, as {'total': n}.
+
+        Reads 'total' off a one-item page instead of paging the whole
+        inventory; an empty inventory defers to get_inventory_items so the
+        Legacy Trading fallback still counts.
+        """
+        try:
+            response = _call('GET', '/inventory_item', params={'limit': 1, 'offset': 0})
+            if response.status_code != 200:
+                return {'error': f'eBay API error: {response.status_code}'}, 502
+
+            total = json_utils.loads(response.content).get('total', 0)
+            if not total:
+                return self.get_inventory_items()
+            return {'total': total}, 200
+
+        except Exception as e:
+            logger.exception("Inventory API Error")
+            return {'error': str(e)}, 500
+
+    def _listing_from_item(self, item):
+        """Shape one raw inventory item as a listings row"""
+        get = item.get
+        product = get('product') or _EMPTY
+        img_urls = product.get('imageUrls')
+        availability = (get('availability') or _EMPTY).get('shipToLocationAvailability') or _EMPTY
+        condition = get('condition', 'USED_EXCELLENT')
+        
+        return {
+            'sku': get('sku'),
+            'offerId': None,
+            'listingId': 'Unknown', 
+            'title': product.get('title', 'No Title'),
+            'price': 0.0,
+            'currency': 'USD',
+            'availableQuantity': availability.get('quantity', 0),
+            'imageUrl': img_urls[0] if img_urls else None,
+            'status': 'Active' if 'condition' in item and condition else 'Draft',
+            'condition': condition
+        }
+
+    def _get_inventory_page(self, offset):
+        """
+        Listing rows for one inventory_item page after the first, as (status, rows).
+        
+        The page is streamed and each raw item shaped as it is parsed, so only
+        the compact rows are kept rather than the page's whole dict tree.
+        """
+        with _call(
+            'GET',
+            '/inventory_item',
+            params={'limit': INVENTORY_PAGE_SIZE, 'offset': offset},
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                return response.status_code, []
+            return 200, [self._listing_from_item(item) for item in _page_inventory_items(response)]
+
     def get_offer(self, offer_id):
         """Fetch details for a specific Offer ID"""
+        cached = _cached_get(f'/offer/{offer_id}')
+        if cached is not None:
+            return cached, 200
+        
         try:
-            INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
-            response = requests.get(
-                f'{INVENTORY_URL}/offer/{offer_id}',
-                headers=_get_headers(),
-                timeout=10
-            )
-            
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.get(
-                    f'{INVENTORY_URL}/offer/{offer_id}',
-                    headers=_get_headers(),
-                    timeout=10
-                )
+            response = _call('GET', f'/offer/{offer_id}')
             
             if response.status_code == 200:
-                return response.json(), 200
+                data = json_utils.loads(response.content)
+                _remember_get(f'/offer/{offer_id}', data)
+                return data, 200
             
             return {'error': f'eBay Offer Error: {response.text}'}, response.status_code
             
@@ -116,45 +324,28 @@ class InventoryService:
     def get_listing_details(self, sku):
         """Fetch details for a single SKU (Offer + Product Description)"""
         try:
-            # 1. Fetch Offer (Price, Qty, ListingId)
-            INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
-            response = requests.get(
-                f'{INVENTORY_URL}/offer',
-                headers=_get_headers(),
-                params={'sku': sku},
-                timeout=10
-            )
-            
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.get(
-                    f'{INVENTORY_URL}/offer',
-                    headers=_get_headers(),
-                    params={'sku': sku},
-                    timeout=10
+            # Offer (Price, Qty, ListingId) and Inventory Item (Title, Description)
+            # don't depend on each other, so fetch both at once; each call
+            # refreshes the token itself if it comes back 401/500
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                offer_future = executor.submit(
+                    _call, 'GET', '/offer', params={'sku': sku}
                 )
+                item_future = executor.submit(self.get_inventory_item, sku)
+                response = offer_future.result()
+                item_data, item_status = item_future.result()
             
             result_data = {}
             if response.status_code == 200:
-                data = response.json()
+                data = json_utils.loads(response.content)
                 offers = data.get('offers', [])
                 if offers:
-                    offer = offers[0]
-                    price_obj = offer.get('pricingSummary', {}).get('price', {})
-                    result_data = {
-                        'price': float(price_obj.get('value', 0)),
-                        'currency': price_obj.get('currency', 'USD'),
-                        'quantity': offer.get('availableQuantity', 0),
-                        'offerId': offer.get('offerId'),
-                        'listingId': offer.get('listingId'),
-                        'status': offer.get('status')
-                    }
+                    result_data = self._offer_summary(offers[0])
                 else:
                     return {'error': 'No offer found for SKU'}, 404
             else:
                 return {'error': f'eBay API error (Offer): {response.status_code}'}, 502
 
-            # 2. Fetch Inventory Item (Title, Description)
-            item_data, item_status = self.get_inventory_item(sku)
             if item_status == 200:
                 product = item_data.get('product', {})
                 result_data['title'] = product.get('title')
@@ -166,9 +357,47 @@ class InventoryService:
         except Exception as e:
             return {'error': str(e)}, 500
 
+    async def get_listing_details_async(self, sku):
+        """get_listing_details with the offer and inventory item fetched concurrently"""
+        try:
+            async with self._async_client() as client:
+                refresh_lock = asyncio.Lock()
+                offer_response, item_response = await asyncio.gather(
+                    self._request_async(client, refresh_lock, 'GET', '/offer', params={'sku': sku}),
+                    self._request_async(client, refresh_lock, 'GET', f'/inventory_item/{sku}')
+                )
+            
+            if offer_response.status_code != 200:
+                return {'error': f'eBay API error (Offer): {offer_response.status_code}'}, 502
+            offers = json_utils.loads(offer_response.content).get('offers', [])
+            if not offers:
+                return {'error': 'No offer found for SKU'}, 404
+            
+            result_data = self._offer_summary(offers[0])
+            if item_response.status_code == 200:
+                product = json_utils.loads(item_response.content).get('product', {})
+                result_data['title'] = product.get('title')
+                result_data['description'] = product.get('description')
+            
+            return result_data, 200
+        
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+    def _offer_summary(self, offer):
+        """Price, quantity and listing fields of an offer for the listing detail view"""
+        price_obj = offer.get('pricingSummary', {}).get('price', {})
+        return {
+            'price': float(price_obj.get('value', 0)),
+            'currency': price_obj.get('currency', 'USD'),
+            'quantity': offer.get('availableQuantity', 0),
+            'offerId': offer.get('offerId'),
+            'listingId': offer.get('listingId'),
+            'status': offer.get('status')
+        }
+
     def bulk_update(self, updates):
         """Execute bulk_update_price_quantity"""
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
         payload_requests = []
         
         for up in updates:
@@ -188,27 +417,18 @@ class InventoryService:
         if not payload_requests:
             return {'success': True, 'message': 'No valid updates found'}, 200
 
-        response = requests.post(
-            f'{INVENTORY_URL}/bulk_update_price_quantity',
-            headers=_get_headers(),
-            json={'requests': payload_requests}
-        )
-        
-        if response.status_code in [401, 500]:
-            if _refresh_token_if_needed(response):
-                 response = requests.post(
-                    f'{INVENTORY_URL}/bulk_update_price_quantity',
-                    headers=_get_headers(),
-                    json={'requests': payload_requests}
-                )
+        response = _call('POST', '/bulk_update_price_quantity', data=json_utils.dumps_bytes({'requests': payload_requests}), timeout=_BULK_TIMEOUT)
         
         if response.status_code != 200:
              return {'error': f"eBay Update Failed: {response.text}"}, 500
+        
+        _forget_get(*(f'/inventory_item/{up["sku"]}' for up in updates),
+                    *(f'/offer/{up["offerId"]}' for up in updates if up.get('offerId')))
              
-        res_data = response.json()
+        res_data = json_utils.loads(response.content)
         failures = [
             r for r in res_data.get('responses', []) 
-            if r.get('statusCode') not in [200, 204]
+            if r.get('statusCode') not in _OK_CODES
         ]
         
         if failures:
@@ -222,63 +442,132 @@ class InventoryService:
         return {'success': True, 'updated': len(payload_requests)}, 200
 
     def withdraw_listing(self, offer_id):
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
-        response = requests.post(f'{INVENTORY_URL}/offer/{offer_id}/withdraw', headers=_get_headers())
-        
-        if response.status_code in [401, 500]:
-             if _refresh_token_if_needed(response):
-                response = requests.post(f'{INVENTORY_URL}/offer/{offer_id}/withdraw', headers=_get_headers())
+        response = _call('POST', f'/offer/{offer_id}/withdraw')
         
-        if response.status_code in [200, 204]:
+        if response.status_code in _OK_CODES:
+             _forget_get(f'/offer/{offer_id}')
              return {'success': True, 'offerId': offer_id}, 200
         return {'error': response.text}, response.status_code
 
     def publish_listing(self, offer_id):
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
-        response = requests.post(f'{INVENTORY_URL}/offer/{offer_id}/publish', headers=_get_headers())
+        response = _call('POST', f'/offer/{offer_id}/publish')
         
-        if response.status_code in [401, 500]:
-             if _refresh_token_if_needed(response):
-                response = requests.post(f'{INVENTORY_URL}/offer/{offer_id}/publish', headers=_get_headers())
-        
-        if response.status_code in [200, 204]:
-             result = response.json()
+        if response.status_code in _OK_CODES:
+             _forget_get(f'/offer/{offer_id}')
+             result = json_utils.loads(response.content)
              return {'success': True, 'listingId': result.get('listingId')}, 200
         return {'error': response.text}, response.status_code
 
     def bulk_update_titles(self, updates):
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
+        """
+        Retitle many listings.
+        
+        A listing's title is its inventory item's product.title, so each
+        update's item is looked up (in parallel, from cache where possible),
+        retitled, and written back through bulk_create_or_replace_inventory_item
+        in batches of TITLE_BATCH_SIZE. Updates may carry 'sku' to skip the
+        offer lookup that otherwise resolves it from 'offerId'.
+        """
         results = {'success': [], 'failed': []}
         
-        for update in updates:
-            offer_id = update.get('offerId')
-            new_title = update.get('title')
+        if updates:
+            with ThreadPoolExecutor(max_workers=min(TITLE_UPDATE_WORKERS, len(updates))) as executor:
+                lookups = list(executor.map(self._retitled_item, updates))
+            pending = self._collect_retitled(updates, lookups, results)
             
-            try:
-                # GET offer
-                get_response = requests.get(f'{INVENTORY_URL}/offer/{offer_id}', headers=_get_headers())
-                if get_response.status_code == 401 and _refresh_token_if_needed(get_response):
-                     get_response = requests.get(f'{INVENTORY_URL}/offer/{offer_id}', headers=_get_headers())
-                
-                if get_response.status_code != 200:
-                    results['failed'].append({'offerId': offer_id, 'error': f'GET failed: {get_response.status_code}'})
-                    continue
-                
-                offer_data = get_response.json()
-                if 'listing' not in offer_data: offer_data['listing'] = {}
-                offer_data['listing']['listingTitle'] = new_title
-                
-                # PUT offer
-                put_response = requests.put(f'{INVENTORY_URL}/offer/{offer_id}', headers=_get_headers(), json=offer_data)
-                if put_response.status_code == 401 and _refresh_token_if_needed(put_response):
-                    put_response = requests.put(f'{INVENTORY_URL}/offer/{offer_id}', headers=_get_headers(), json=offer_data)
+            for start in range(0, len(pending), TITLE_BATCH_SIZE):
+                batch = pending[start:start + TITLE_BATCH_SIZE]
+                body = json_utils.dumps_bytes({'requests': [item for _, item in batch]})
+                try:
+                    response = _call('POST', '/bulk_create_or_replace_inventory_item', data=body)
+                    self._record_title_batch(batch, response.status_code, json_utils.loads(response.content) if response.status_code in _BULK_OK else response.text, results)
+                except Exception as e:
+                    self._record_title_batch(batch, 500, str(e), results)
+        
+        return {
+            'success': len(results['failed']) == 0,
+            'updated': len(results['success']),
+            'failed': len(results['failed']),
+            'details': results
+        }, 200
+
+    def _retitled_item(self, update):
+        """The update's inventory item with its new title, as (bulk request entry, None) or (None, error)"""
+        try:
+            sku = update.get('sku')
+            if not sku:
+                offer, status = self.get_offer(update.get('offerId'))
+                if status != 200:
+                    return None, f'GET failed: {status}'
+                sku = offer.get('sku')
+            
+            # The whole item is replaced, quantity included, so read it fresh:
+            # a cached copy could put back stock that has since sold
+            item, status = self.get_inventory_item(sku, max_age=0)
+            if status != 200:
+                return None, f'GET failed: {status}'
+            return self._with_title(item, sku, update.get('title')), None
+        except Exception as e:
+            return None, str(e)
+
+    def _with_title(self, item, sku, title):
+        """A bulk_create_or_replace_inventory_item entry: the full item with product.title replaced"""
+        return dict(item, sku=sku, product=dict(item.get('product', {}), title=title))
+
+    def _collect_retitled(self, updates, lookups, results):
+        """Pair updates with their retitled items, recording lookup failures in results"""
+        pending = []
+        for update, (item, error) in zip(updates, lookups):
+            if item is None:
+                results['failed'].append({'offerId': update.get('offerId'), 'error': error})
+            else:
+                pending.append((update, item))
+        return pending
+
+    def _record_title_batch(self, batch, status_code, body, results):
+        """Sort one bulk_create_or_replace_inventory_item batch into success/failed by per-SKU status"""
+        if status_code not in _BULK_OK:
+            for update, _ in batch:
+                results['failed'].append({'offerId': update.get('offerId'), 'error': str(body)[:200]})
+            return
+        
+        statuses = {r.get('sku'): r for r in body.get('responses', [])}
+        for update, item in batch:
+            entry = statuses.get(item['sku'], {})
+            if entry.get('statusCode') in _ENTRY_OK:
+                # The item now is what we sent; keep it for the next edit
+                _remember_get(f"/inventory_item/{item['sku']}", item)
+                results['success'].append({'offerId': update.get('offerId'), 'title': update.get('title')})
+            else:
+                _forget_get(f"/inventory_item/{item['sku']}")
+                results['failed'].append({'offerId': update.get('offerId'), 'error': str(entry.get('errors', 'No response for SKU'))[:200]})
+
+    async def bulk_update_titles_async(self, updates):
+        """bulk_update_titles as coroutines sharing one httpx client; same result shape"""
+        results = {'success': [], 'failed': []}
+        
+        if updates:
+            async with self._async_client() as client:
+                refresh_lock = asyncio.Lock()
+                lookups = await asyncio.gather(*(
+                    self._retitled_item_async(client, refresh_lock, update) for update in updates
+                ))
+                pending = self._collect_retitled(updates, lookups, results)
                 
-                if put_response.status_code in [200, 204]:
-                    results['success'].append({'offerId': offer_id, 'title': new_title})
-                else:
-                    results['failed'].append({'offerId': offer_id, 'error': put_response.text[:200]})
-            except Exception as e:
-                results['failed'].append({'offerId': offer_id, 'error': str(e)})
+                batches = [pending[start:start + TITLE_BATCH_SIZE] for start in range(0, len(pending), TITLE_BATCH_SIZE)]
+                responses = await asyncio.gather(*(
+                    self._request_async(client, refresh_lock, 'POST', '/bulk_create_or_replace_inventory_item',
+                                        content=json_utils.dumps_bytes({'requests': [item for _, item in batch]}))
+                    for batch in batches
+                ), return_exceptions=True)
+            
+            for batch, response in zip(batches, responses):
+                try:
+                    if isinstance(response, Exception):
+                        raise response
+                    self._record_title_batch(batch, response.status_code, json_utils.loads(response.content) if response.status_code in _BULK_OK else response.text, results)
+                except Exception as e:
+                    self._record_title_batch(batch, 500, str(e), results)
         
         return {
             'success': len(results['failed']) == 0,
@@ -286,23 +575,86 @@ class InventoryService:
             'failed': len(results['failed']),
             'details': results
         }, 200
-    def get_inventory_item(self, sku):
-        """Fetch single inventory item raw data"""
+
+    async def _retitled_item_async(self, client, refresh_lock, update):
+        """Async _retitled_item over the shared httpx client"""
         try:
-            INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
-            response = requests.get(
-                f'{INVENTORY_URL}/inventory_item/{sku}',
-                headers=_get_headers()
-            )
+            sku = update.get('sku')
+            if not sku:
+                offer_path = f"/offer/{update.get('offerId')}"
+                offer = _cached_get(offer_path)
+                if offer is None:
+                    response = await self._request_async(client, refresh_lock, 'GET', offer_path)
+                    if response.status_code != 200:
+                        return None, f'GET failed: {response.status_code}'
+                    offer = json_utils.loads(response.content)
+                    _remember_get(offer_path, offer)
+                sku = offer.get('sku')
             
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.get(
-                    f'{INVENTORY_URL}/inventory_item/{sku}',
-                    headers=_get_headers()
-                )
+            # Always fresh, as in _retitled_item: the replace includes quantity
+            item_path = f'/inventory_item/{sku}'
+            response = await self._request_async(client, refresh_lock, 'GET', item_path)
+            if response.status_code != 200:
+                return None, f'GET failed: {response.status_code}'
+            item = json_utils.loads(response.content)
+            _remember_get(item_path, item)
+            return self._with_title(item, sku, update.get('title')), None
+        except Exception as e:
+            return None, str(e)
+
+    def _async_client(self):
+        """
+        A new httpx.AsyncClient for one batch of async calls.
+        
+        Built per call rather than at module scope because httpx connections
+        are tied to the event loop that opened them.
+        """
+        if not HAS_HTTPX:
+            raise RuntimeError("httpx is required for the async Inventory API methods")
+        return httpx.AsyncClient(
+            base_url=INVENTORY_URL,
+            headers=_get_headers(),
+            http2=HAS_HTTP2,
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(_TIMEOUT[1], connect=_TIMEOUT[0])
+        )
+
+    async def _request_async(self, client, refresh_lock, method, path, **kwargs):
+        """_call on the batch client: refresh the token once on auth failure, back off on 429/503"""
+        response = await client.request(method, path, **kwargs)
+        
+        if response.status_code in _REFRESH_CODES:
+            sent_auth = response.request.headers.get('Authorization')
+            async with refresh_lock:
+                # Only the first failing coroutine refreshes; the rest reuse its token
+                if client.headers.get('Authorization') == sent_auth:
+                    token = await asyncio.to_thread(_refresh_token_if_needed, response)
+                    if not token:
+                        return response
+                    client.headers['Authorization'] = f'Bearer {token}'
+            response = await client.request(method, path, **kwargs)
+        
+        attempt = 0
+        while response.status_code in RATE_LIMIT_CODES and attempt < MAX_RETRIES:
+            await asyncio.sleep(_retry_delay(response, attempt))
+            attempt += 1
+            response = await client.request(method, path, **kwargs)
+        
+        return response
+
+    def get_inventory_item(self, sku, max_age=GET_CACHE_TTL):
+        """Fetch single inventory item raw data (from cache if fetched within max_age seconds)"""
+        cached = _cached_get(f'/inventory_item/{sku}', max_age)
+        if cached is not None:
+            return cached, 200
+        
+        try:
+            response = _call('GET', f'/inventory_item/{sku}')
                 
             if response.status_code == 200:
-                return response.json(), 200
+                data = json_utils.loads(response.content)
+                _remember_get(f'/inventory_item/{sku}', data)
+                return data, 200
             return {'error': f'eBay API error: {response.status_code}', 'details': response.text}, response.status_code
             
         except Exception as e:
@@ -313,9 +665,11 @@ class InventoryService:
         """
         Update inventory item details (Title, Description).
         This performs a GET -> MERGE -> PUT to ensure we don't wipe existing data.
+        The PUT replaces the whole item, so the GET always goes to eBay: a
+        cached copy could undo someone else's quantity or aspect change.
         """
-        # 1. Fetch existing
-        current_data, status = self.get_inventory_item(sku)
+        # 1. Fetch existing (live, never from cache)
+        current_data, status = self.get_inventory_item(sku, max_age=0)
         if status != 200:
             return current_data, status
             
@@ -331,22 +685,12 @@ class InventoryService:
         current_data['product'] = product
         
         # 3. PUT update
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
         try:
-            response = requests.put(
-                f'{INVENTORY_URL}/inventory_item/{sku}',
-                headers=_get_headers(),
-                json=current_data
-            )
+            response = _call('PUT', f'/inventory_item/{sku}', data=json_utils.dumps_bytes(current_data))
             
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.put(
-                    f'{INVENTORY_URL}/inventory_item/{sku}',
-                    headers=_get_headers(),
-                    json=current_data
-                )
-                
-            if response.status_code in [200, 204]:
+            if response.status_code in _OK_CODES:
+                # What we just PUT is the item now; keep it for the next edit
+                _remember_get(f'/inventory_item/{sku}', current_data)
                 return {'success': True}, 200
             
             return {'error': f'Update failed: {response.status_code}', 'details': response.text}, response.status_code
@@ -360,23 +704,12 @@ class InventoryService:
         Create or Replace an Inventory Item record.
         PUT /sell/inventory/v1/inventory_item/{sku}
         """
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
         try:
             logger.info(f"Creating Inventory Item: {sku}")
-            response = requests.put(
-                f'{INVENTORY_URL}/inventory_item/{sku}',
-                headers=_get_headers(),
-                json=item_data
-            )
+            response = _call('PUT', f'/inventory_item/{sku}', data=json_utils.dumps_bytes(item_data))
             
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.put(
-                    f'{INVENTORY_URL}/inventory_item/{sku}',
-                    headers=_get_headers(),
-                    json=item_data
-                )
-                
-            if response.status_code in [200, 204]:
+            _forget_get(f'/inventory_item/{sku}')
+            if response.status_code in _OK_CODES:
                 return {'success': True}, 200
             
             return {'error': f'Create Item Failed: {response.status_code}', 'details': response.text}, response.status_code
@@ -390,24 +723,12 @@ class InventoryService:
         Create an Offer for an Inventory Item.
         POST /sell/inventory/v1/offer
         """
-        INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
         try:
             logger.info(f"Creating Offer for SKU: {offer_data.get('sku')}")
-            response = requests.post(
-                f'{INVENTORY_URL}/offer',
-                headers=_get_headers(),
-                json=offer_data
-            )
-            
-            if response.status_code in [401, 500] and _refresh_token_if_needed(response):
-                response = requests.post(
-                    f'{INVENTORY_URL}/offer',
-                    headers=_get_headers(),
-                    json=offer_data
-                )
+            response = _call('POST', '/offer', data=json_utils.dumps_bytes(offer_data))
                 
-            if response.status_code in [200, 201]:
-                result = response.json()
+            if response.status_code in _CREATE_OK:
+                result = json_utils.loads(response.content)
                 return {'success': True, 'offerId': result.get('offerId')}, 200
             
             return {'error': f'Create Offer Failed: {response.status_code}', 'details': response.text}, response.status_code
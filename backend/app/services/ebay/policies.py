@@ -3,15 +3,26 @@ eBay Policies API Module
 Fetches fulfillment, payment, return policies and inventory locations.
 """
 import requests
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from backend.app.core.env_file import read_env
+
 ACCOUNT_URL = 'https://api.ebay.com/sell/account/v1'
 INVENTORY_URL = 'https://api.ebay.com/sell/inventory/v1'
 
 
-def load_env():
-    """Load credentials from .env file (Robust lookup)"""
+# .env location once found; the directory walk is only repeated while missing
+_env_path: Optional[Path] = None
+
+
+def _find_env_path() -> Optional[Path]:
+    """Locate .env by walking up from this file, then the CWD"""
+    global _env_path
+    if _env_path is not None and _env_path.exists():
+        return _env_path
+    
     current_path = Path(__file__).resolve()
     env_path = None
     
@@ -27,22 +38,22 @@ def load_env():
         cwd_env = Path.cwd() / ".env"
         if cwd_env.exists():
             env_path = cwd_env
-            
-    credentials = {}
-    if env_path and env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    credentials[key.strip()] = value.strip()
-    return credentials
+    
+    _env_path = env_path
+    return env_path
 
 
-def _get_headers() -> Dict:
-    """Get authorization headers with current token"""
-    credentials = load_env()
-    token = credentials.get('EBAY_USER_TOKEN')
+def load_env():
+    """Load credentials from .env file (Robust lookup)"""
+    env_path = _find_env_path()
+    if not env_path:
+        return {}
+    return read_env(env_path)
+
+
+@lru_cache(maxsize=1)
+def _headers_for_token(token: Optional[str]) -> Dict:
+    """Header dict for a user token; rebuilt only when the token changes"""
     return {
         'Authorization': f'Bearer {token}',
         'Content-Type': 'application/json',
@@ -51,16 +62,28 @@ def _get_headers() -> Dict:
     }
 
 
-def _refresh_token_if_needed(response) -> bool:
-    """Refresh token if auth failed"""
+def _get_headers() -> Dict:
+    """Get authorization headers with current token (a copy, safe to modify)"""
+    return dict(_headers_for_token(load_env().get('EBAY_USER_TOKEN')))
+
+
+def _refresh_token_if_needed(response) -> Optional[str]:
+    """
+    Refresh token if auth failed.
+    
+    Returns:
+        The new access token (truthy) so callers can patch the Authorization
+        header they already built, or None if no refresh happened
+    """
     if response.status_code in [401, 500]:
         try:
             from backend.app.services.ebay.auth import eBayOAuth
             oauth = eBayOAuth(use_sandbox=False)
-            return oauth.refresh_access_token()
+            if oauth.refresh_access_token():
+                return oauth.user_token
         except Exception:
             pass
-    return False
+    return None
 
 
 def get_fulfillment_policies(retry: bool = True) -> List[Dict]:
@@ -24,7 +24,7 @@ class eBayService:
         self.inventory_service = InventoryService()
         # Pass a lambda to resolve circular dependency for active count
         self.analytics_service = AnalyticsService(
-            inventory_service_callback=lambda: self.get_active_listings()[0]
+            inventory_service_callback=lambda: self.inventory_service.get_inventory_count()[0]
         )
 
     # --- Connection Check --- 
@@ -10,6 +10,37 @@ try:
 except ImportError:
     print("⚠️ google-genai or PIL not installed")
 
+# Optional local barcode reader: lets callers find an ISBN without an API call
+try:
+    from pyzbar.pyzbar import decode as decode_barcodes, ZBarSymbol
+    HAS_PYZBAR = True
+except ImportError:
+    HAS_PYZBAR = False
+
+
+def scan_barcode(image_path: str) -> Optional[str]:
+    """
+    Read an ISBN-13 from a Bookland EAN barcode locally.
+    
+    Returns None when pyzbar isn't installed or no book barcode is found.
+    """
+    if not HAS_PYZBAR:
+        return None
+    
+    try:
+        with Image.open(image_path) as img:
+            img.draft('L', (1600, 1600))
+            barcodes = decode_barcodes(img.convert('L'), symbols=[ZBarSymbol.EAN13])
+    except Exception as e:
+        print(f"⚠️ Barcode scan failed for {image_path}: {e}")
+        return None
+    
+    for barcode in barcodes:
+        digits = barcode.data.decode('ascii', 'ignore')
+        if digits.startswith(('978', '979')):
+            return digits
+    return None
+
 class ISBNScanner:
     """
     Extracts ISBNs from images using Gemini Vision.
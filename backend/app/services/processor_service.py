@@ -19,7 +19,7 @@ logger = get_logger('processor_service')
 class ProcessorService:
     def __init__(self):
         self.pricing_engine = PricingEngine()
-        self.ai_analyzer = AIAnalyzer()
+        self.ai_analyzer = AIAnalyzer.get_instance()
         self.ebay_service = eBayService()
         self.template_manager = get_template_manager()
         
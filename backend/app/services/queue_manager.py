@@ -185,45 +185,50 @@ class QueueManager:
         for job in self.jobs:
             self._sync_to_supabase(job)
     
-    def add_folder(self, folder_path: str) -> QueueJob:
-        """Add a single folder to the queue"""
+    def _new_job(self, folder_path: str) -> QueueJob:
+        """Build a pending QueueJob for a folder"""
         path = Path(folder_path)
-        job = QueueJob(
+        return QueueJob(
             id=uuid.uuid4().hex[:8].upper(),
             folder_path=str(path),
             folder_name=path.name
         )
+    
+    def _to_model(self, job: QueueJob):
+        """Map a new QueueJob to its database row"""
+        return self.JobModel(
+            id=job.id,
+            folder_path=job.folder_path,
+            folder_name=job.folder_name,
+            status=job.status.value,
+            created_at=datetime.fromisoformat(job.created_at)
+        )
+    
+    def add_folder(self, folder_path: str) -> QueueJob:
+        """Add a single folder to the queue"""
+        return self.add_batch([folder_path])[0]
+
+    def add_batch(self, folder_paths: List[str]) -> List[QueueJob]:
+        """Add multiple folders to the queue in a single transaction"""
+        jobs = [self._new_job(path) for path in folder_paths]
         
         session = self.SessionFactory()
         try:
-            db_job = self.JobModel(
-                id=job.id,
-                folder_path=job.folder_path,
-                folder_name=job.folder_name,
-                status=job.status.value,
-                created_at=datetime.fromisoformat(job.created_at)
-            )
-            session.add(db_job)
+            session.add_all([self._to_model(job) for job in jobs])
             session.commit()
-            
-            with self._lock:
-                self.jobs.append(job)
-            
-            self._sync_to_supabase(job)
-            self.emit_event('job_added', job.to_dict())
-            return job
         except Exception as e:
             session.rollback()
             self.logger.error(f"Failed to add job to database: {e}")
             raise
         finally:
             session.close()
-
-    def add_batch(self, folder_paths: List[str]) -> List[QueueJob]:
-        """Add multiple folders to the queue"""
-        jobs = []
-        for path in folder_paths:
-            jobs.append(self.add_folder(path))
+        
+        with self._lock:
+            self.jobs.extend(jobs)
+        
+        for job in jobs:
+            self._sync_to_supabase(job)
+            self.emit_event('job_added', job.to_dict())
         return jobs
     
     def remove_job(self, job_id: str) -> bool:
@@ -483,7 +488,7 @@ class QueueManager:
         """Load queue state from SQLite database"""
         session = self.SessionFactory()
         try:
-            db_jobs = session.query(self.JobModel).all()
+            db_jobs = session.query(self.JobModel).order_by(self.JobModel.created_at).all()
             self.jobs = []
             for db_j in db_jobs:
                 # Map DB model to QueueJob dataclass
@@ -69,12 +69,13 @@ class TemplateManager:
         session = self.SessionFactory()
         try:
             db_t = session.query(self.TemplateModel).filter_by(name=name).first()
-            if db_t:
-                db_t.data = data
-                db_t.updated_at = datetime.utcnow()
-            else:
+            if not db_t:
                 db_t = self.TemplateModel(name=name)
-                db_t.data = data
+            db_t.data = data
+            # Stamped here rather than left to onupdate: a re-save with
+            # identical data still counts as saved, and microseconds keep
+            # same-second saves in order
+            db_t.updated_at = datetime.utcnow()
             
             session.add(db_t)
             session.commit()
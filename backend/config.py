@@ -19,5 +19,11 @@ class Config:
     # Upload Limits (eBay 2026 Video Support: 150MB max + overhead)
     MAX_CONTENT_LENGTH = 160 * 1024 * 1024 # 160MB
     
+    # Static Serving
+    # When fronted by nginx/Apache, let the proxy stream files via sendfile(2)
+    # (X-Sendfile header). Leave off for direct serving, where Werkzeug already
+    # hands files to the server's wsgi.file_wrapper when one is available.
+    USE_X_SENDFILE = os.environ.get('EBAY_USE_X_SENDFILE', 'false').lower() == 'true'
+    
     # Feature Flags
     AUTO_PUBLISH = os.environ.get('EBAY_AUTO_PUBLISH', 'false').lower() == 'true'
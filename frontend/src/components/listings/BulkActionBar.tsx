@@ -90,7 +90,7 @@ export function BulkActionBar({
                     }
                     // eBay title max is 80 chars
                     newTitle = newTitle.substring(0, 80)
-                    updates.push({ offerId: item.offerId, title: newTitle })
+                    updates.push({ offerId: item.offerId, sku, title: newTitle })
                 }
             }
             if (updates.length > 0) {
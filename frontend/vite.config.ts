@@ -1,9 +1,32 @@
-import { defineConfig } from 'vite'
+import { defineConfig, type Plugin } from 'vite'
 import react from '@vitejs/plugin-react'
 import tailwindcss from '@tailwindcss/vite'
+import fs from 'fs'
 import path from 'path'
+import zlib from 'zlib'
 import { VitePWA } from 'vite-plugin-pwa'
 
+// Emit .br/.gz siblings for hashed text bundles so Flask can serve them
+// pre-compressed instead of compressing on every request.
+function precompressAssets(): Plugin {
+  return {
+    name: 'precompress-assets',
+    apply: 'build',
+    writeBundle(options, bundle) {
+      for (const fileName of Object.keys(bundle)) {
+        if (!fileName.startsWith('assets/') || !/\.(js|css|svg|json)$/.test(fileName)) continue
+        const file = path.join(options.dir!, fileName)
+        const source = fs.readFileSync(file)
+        if (source.length < 1024) continue
+        fs.writeFileSync(`${file}.br`, zlib.brotliCompressSync(source, {
+          params: { [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY },
+        }))
+        fs.writeFileSync(`${file}.gz`, zlib.gzipSync(source, { level: 9 }))
+      }
+    },
+  }
+}
+
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [
@@ -39,7 +62,8 @@ export default defineConfig({
         categories: ["productivity", "business"],
         prefer_related_applications: false
       }
-    })
+    }),
+    precompressAssets(),
   ],
   resolve: {
     alias: {
@@ -0,0 +1,88 @@
+"""
+Shared test doubles for the stubbed HTTP sessions and Gemini clients.
+
+Test modules import these with `from helpers import FakeResponse`; pytest
+puts this directory on sys.path when it collects them.
+"""
+import json
+
+
+class FakeResponse:
+    """A requests.Response stand-in carrying a JSON payload"""
+
+    def __init__(self, payload=None, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(payload if payload is not None else {}).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+        self.headers = {'Content-Length': str(len(self.content))}
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeGeminiModels:
+    """
+    Stands in for a google-genai client.models.
+
+    Every generation answers `text` and is counted in `calls`, with its
+    contents logged to `queries`; embed_content looks queries up in
+    `embeddings`.
+    """
+
+    def __init__(self, text, embeddings=None):
+        self.text = text
+        self.embeddings = embeddings or {}
+        self.calls = 0
+        self.queries = []
+
+    def _record(self, contents):
+        self.calls += 1
+        self.queries.append(contents)
+
+    def generate_content(self, model, contents, config=None):
+        self._record(contents)
+        return type('Response', (), {'text': self.text, 'candidates': None})()
+
+    def generate_content_stream(self, model=None, contents=None, config=None):
+        self._record(contents)
+        half = len(self.text) // 2
+        for text in (self.text[:half], None, self.text[half:]):
+            yield type('Chunk', (), {'text': text})()
+
+    def embed_content(self, model, contents):
+        embedding = type('Embedding', (), {'values': self.embeddings[contents]})()
+        return type('EmbedResponse', (), {'embeddings': [embedding]})()
+
+
+class FakeAsyncGeminiModels(FakeGeminiModels):
+    """Stands in for client.aio.models"""
+
+    async def generate_content(self, model, contents, config=None):
+        return FakeGeminiModels.generate_content(self, model, contents, config)
+
+    async def generate_content_stream(self, model=None, contents=None, config=None):
+        chunks = FakeGeminiModels.generate_content_stream(self, model, contents, config)
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        return stream()
+
+
+def fake_gemini_client(text, embeddings=None):
+    """A client with sync and aio models that both answer `text`"""
+    aio = type('AsyncClient', (), {'models': FakeAsyncGeminiModels(text, embeddings)})()
+    return type('Client', (), {'models': FakeGeminiModels(text, embeddings), 'aio': aio})()
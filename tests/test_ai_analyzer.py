@@ -0,0 +1,278 @@
+"""
+Test Suite for AI Analyzer image preparation
+Tests the local (non-Gemini) parts of the analysis pipeline.
+"""
+import asyncio
+import io
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services import ai_analyzer
+from backend.app.services.ai_analyzer import AIAnalyzer
+from helpers import fake_gemini_client
+
+
+@pytest.fixture
+def folder():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def _save(path: Path, size, fmt=None):
+    Image.new('RGB', size, 'red').save(path, fmt)
+    return path
+
+
+def test_large_photo_is_downscaled(folder):
+    """Photos over MAX_IMAGE_EDGE are resized to JPEG and cached"""
+    photo = _save(folder / "photo.jpg", (3000, 2000))
+
+    part = ai_analyzer._load_image(photo)
+
+    assert part.inline_data.mime_type == 'image/jpeg'
+    assert max(Image.open(io.BytesIO(part.inline_data.data)).size) == ai_analyzer.MAX_IMAGE_EDGE
+    assert (folder / ai_analyzer.THUMB_DIR_NAME / "photo.jpg.jpg").exists()
+
+
+def test_small_photo_passes_through(folder):
+    """Small natively-supported files are sent byte-for-byte"""
+    photo = _save(folder / "small.png", (200, 100))
+
+    part = ai_analyzer._load_image(photo)
+
+    assert part.inline_data.mime_type == 'image/png'
+    assert part.inline_data.data == photo.read_bytes()
+
+
+def test_unsupported_format_is_transcoded(folder):
+    """BMP is re-encoded as PNG for Gemini"""
+    photo = _save(folder / "scan.bmp", (200, 100))
+
+    part = ai_analyzer._load_image(photo)
+
+    assert part.inline_data.mime_type == 'image/png'
+
+
+def test_unreadable_file_is_skipped(folder):
+    """Garbage files return None instead of raising"""
+    bogus = folder / "notes.jpg"
+    bogus.write_text("not an image")
+
+    assert ai_analyzer._load_image(bogus) is None
+
+
+def test_get_images_from_folder(folder):
+    """Image files are listed case-insensitively, sorted, and capped"""
+    _save(folder / "b.JPG", (10, 10), 'JPEG')
+    _save(folder / "a.png", (10, 10))
+    _save(folder / "c.Webp", (10, 10), 'WEBP')
+    (folder / "notes.txt").write_text("notes")
+    (folder / "sub.jpg").mkdir()
+
+    images = AIAnalyzer.__new__(AIAnalyzer).get_images_from_folder(folder, max_images=2)
+
+    assert images == [str(folder / "a.png"), str(folder / "b.JPG")]
+
+
+def test_get_images_skips_mislabelled_files(folder):
+    """Files with an image extension but no image header are ignored"""
+    (folder / "a.jpg").write_bytes(b"8BPS" + b"\0" * 64)  # Photoshop file
+    _save(folder / "b.bmp", (10, 10))
+    _save(folder / "c.webp", (10, 10), 'WEBP')
+
+    images = AIAnalyzer.__new__(AIAnalyzer).get_images_from_folder(folder)
+
+    assert images == [str(folder / "b.bmp"), str(folder / "c.webp")]
+
+
+def test_duplicate_images_sent_once(folder):
+    """Byte-identical photos collapse to a single image Part"""
+    photo = _save(folder / "a.png", (200, 100))
+    copy = folder / "b.png"
+    copy.write_bytes(photo.read_bytes())
+    other = _save(folder / "c.bmp", (200, 100))
+
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    _, contents, _ = analyzer._prepare_analysis([str(photo), str(copy), str(other)])
+
+    assert len(contents) == 3  # prompt + two distinct images
+
+
+@pytest.fixture
+def analyzer(folder, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, 'get_data_dir', lambda: folder)
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.client = fake_gemini_client('{"identification": {"brand": "Ross"}}')
+    return analyzer
+
+
+def test_analysis_cached_by_image_content(folder, analyzer):
+    """A copy of the same photo reuses the cached Gemini response"""
+    photo = _save(folder / "a.png", (200, 100))
+    copy = folder / "b.png"
+    copy.write_bytes(photo.read_bytes())
+
+    first = analyzer.analyze_item([str(photo)])
+    second = analyzer.analyze_item([str(copy)])
+
+    assert analyzer.client.models.calls == 1
+    assert second['identification'] == first['identification']
+    assert second['image_paths'] == [str(copy)]
+
+
+def test_async_analysis_uses_async_client(folder, analyzer):
+    """analyze_item_async reads the photos off-thread and asks the aio client"""
+    photo = _save(folder / "a.png", (200, 100))
+
+    result = asyncio.run(analyzer.analyze_item_async([str(photo)]))
+
+    assert result['identification'] == {'brand': 'Ross'}
+    assert analyzer.client.aio.models.calls == 1
+    assert analyzer.client.models.calls == 0
+
+
+@pytest.mark.parametrize('text', [
+    '{"a": 1}',
+    '```json\n{"a": 1}\n```',
+    '```\n{"a": 1}\n```',
+    'Here is the result:\n{"a": 1}\nHope this helps!',
+])
+def test_parse_json_response(text):
+    """Fenced or prose-wrapped model output still decodes"""
+    assert ai_analyzer._parse_json_response(text) == {'a': 1}
+
+
+def test_parse_json_response_rejects_garbage():
+    with pytest.raises(ValueError):
+        ai_analyzer._parse_json_response('no json here')
+
+
+def test_phase1_specifics_skip_mapper(analyzer, monkeypatch):
+    """item_specifics/seo_title/condition_id from Phase 1 are kept as-is"""
+    phase1 = {
+        'identification': {'brand': 'Ross', 'product_type': 'Router'},
+        'condition': {'state': 'Used - Good'},
+        'listing': {},
+        'item_specifics': {'Brand': 'Ross', 'MPN': 'NK-3G64'},
+        'seo_title': 'Ross NK-3G64 SDI Router',
+        'condition_id': 5000,
+    }
+    monkeypatch.setattr(analyzer, 'analyze_item', lambda paths: dict(phase1))
+    monkeypatch.setattr(analyzer, 'research_part_number', lambda *a: {'researched': False})
+
+    result = analyzer.analyze_with_research(['photo.jpg'])
+
+    assert result['item_specifics'] == {'Brand': 'Ross', 'MPN': 'NK-3G64'}
+    assert result['seo_title'] == 'Ross NK-3G64 SDI Router'
+    assert result['condition_id'] == 5000
+    assert 'condition_description' in result
+
+
+def test_book_barcode_skips_gemini(analyzer, monkeypatch):
+    """A scannable ISBN barcode short-circuits Phase 1 entirely"""
+    monkeypatch.setattr(ai_analyzer, 'HAS_PYZBAR', True)
+    monkeypatch.setattr(ai_analyzer, 'scan_barcode', lambda path: '9780131103627')
+    monkeypatch.setattr(ai_analyzer.BookService, 'lookup_isbn', lambda self, isbn: {
+        'success': True, 'title': 'The C Programming Language', 'authors': ['Kernighan', 'Ritchie'],
+        'publisher': 'Prentice Hall', 'publishedDate': '1988', 'isbn': isbn,
+    })
+    monkeypatch.setattr(analyzer, 'analyze_item', lambda paths: pytest.fail("Gemini was called"))
+
+    result = analyzer.analyze_with_research(['cover.jpg'])
+
+    assert result['analysis_mode'] == 'book_scan'
+    assert result['identification']['mpn'] == '9780131103627'
+    assert result['listing']['suggested_title'].startswith('The C Programming Language by Kernighan, Ritchie (1988)')
+    assert result['item_specifics']['ISBN'] == '9780131103627'
+    assert result['item_specifics']['Author'] == 'Kernighan, Ritchie'
+    assert result['seo_title'] == result['listing']['suggested_title'][:80]
+    assert result['condition_id'] == 5000
+    assert result['ebay_category_suggestion'] == ai_analyzer.BOOK_CATEGORY_SUGGESTION
+
+
+def test_unknown_barcode_isbn_is_not_rescanned(analyzer, monkeypatch):
+    """An ISBN Google Books doesn't know falls through to Phase 1 without a second scan"""
+    monkeypatch.setattr(ai_analyzer, 'HAS_PYZBAR', True)
+    monkeypatch.setattr(ai_analyzer, 'scan_barcode', lambda path: '9780000000000')
+    lookups = []
+    monkeypatch.setattr(ai_analyzer.BookService, 'lookup_isbn', lambda self, isbn: lookups.append(isbn) or {'success': False})
+    monkeypatch.setattr(ai_analyzer, 'ISBNScanner', lambda: pytest.fail("ISBN scanned twice"))
+    monkeypatch.setattr(analyzer, 'analyze_item', lambda paths: {'identification': {'product_type': 'Book'}, 'condition': {}, 'listing': {}})
+
+    result = analyzer.analyze_with_research(['cover.jpg'])
+
+    assert lookups == ['9780000000000']
+    assert 'book_metadata' not in result
+
+
+def test_research_resumes_from_phase_artifacts(folder, analyzer, monkeypatch):
+    """A re-run reuses saved phase outputs instead of calling Gemini again"""
+    photo = str(_save(folder / "a.png", (200, 100)))
+    monkeypatch.setattr(analyzer, 'research_part_number', lambda *a: {'researched': True, 'compatible_with': ['X1']})
+
+    first = analyzer.analyze_with_research([photo])
+    assert (folder / ai_analyzer.PHASE1_ARTIFACT).exists()
+    assert (folder / ai_analyzer.PHASE2_ARTIFACT).exists()
+    assert (folder / ai_analyzer.PHASE3_ARTIFACT).exists()
+
+    monkeypatch.setattr(analyzer, 'analyze_item', lambda paths: pytest.fail("Phase 1 re-ran"))
+    monkeypatch.setattr(analyzer, 'research_part_number', lambda *a: pytest.fail("Phase 2 re-ran"))
+    second = analyzer.analyze_with_research([photo])
+
+    assert second['identification'] == first['identification']
+    assert second['item_specifics'] == first['item_specifics']
+    assert second['analysis_mode'] == 'research_enhanced'
+
+
+def test_shared_instance_waits_for_api_key(monkeypatch):
+    """An analyzer built before the key is saved isn't kept; the first configured one is"""
+    key = [None]
+    monkeypatch.setattr(ai_analyzer, '_load_api_key', lru_cache(maxsize=1)(lambda: key[0]))
+    monkeypatch.setattr(ai_analyzer.genai, 'Client', lambda **kwargs: object())
+    monkeypatch.setattr(ai_analyzer, '_INSTANCE', None)
+
+    assert AIAnalyzer.get_instance().client is None
+    key[0] = 'saved-later'
+    shared = AIAnalyzer.get_instance()
+
+    assert shared.client is not None
+    assert AIAnalyzer.get_instance() is shared
+    AIAnalyzer.reset()
+    assert AIAnalyzer.get_instance() is not shared
+
+
+def test_unconfigured_analyzer_fails_before_reading_images(folder, monkeypatch):
+    """Without a client, analyze_item returns at once rather than hashing and resizing"""
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.client = None
+    monkeypatch.setattr(analyzer, '_prepare_analysis', lambda *a: pytest.fail("images were prepared"))
+
+    assert 'error' in analyzer.analyze_item([str(folder / 'a.png')])
+
+
+def test_gemini_errors_retry_only_transient_codes():
+    """429/5xx are retried with doubling delays until MAX_RETRIES; other codes raise at once"""
+    throttled = ai_analyzer.errors.APIError(429, {})
+
+    assert ai_analyzer._should_retry(throttled, 0)
+    assert not ai_analyzer._should_retry(throttled, ai_analyzer.MAX_RETRIES - 1)
+    assert not ai_analyzer._should_retry(ai_analyzer.errors.APIError(400, {}), 0)
+    assert [ai_analyzer._backoff(throttled, n) for n in range(3)] == [2.0, 4.0, 8.0]
+
+
+def test_barcode_scan_stops_after_first_photos(analyzer, monkeypatch):
+    """Only the first BARCODE_SCAN_IMAGES photos are decoded looking for an ISBN"""
+    scanned = []
+    monkeypatch.setattr(ai_analyzer, 'HAS_PYZBAR', True)
+    monkeypatch.setattr(ai_analyzer, 'scan_barcode', lambda path: scanned.append(path))
+
+    assert analyzer._scan_book_barcode([f'{i}.jpg' for i in range(8)]) is None
+    assert scanned == ['0.jpg', '1.jpg']
@@ -0,0 +1,182 @@
+"""
+Test Suite for the AI Price Estimator
+Tests response handling with a stubbed Gemini client (no network).
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services import ai_price
+from backend.app.services.ai_price import AIPriceEstimator, PriceCache, PriceEstimateQueue
+from helpers import fake_gemini_client
+
+ESTIMATE_JSON = '{"estimate": {"low": 10, "mid": 20, "high": 30}, "confidence": "high"}'
+
+
+@pytest.fixture
+def estimator(tmp_path):
+    estimator = AIPriceEstimator.__new__(AIPriceEstimator)
+    estimator.legacy_model = None
+    estimator.cache = PriceCache(tmp_path)
+    estimator.client = fake_gemini_client(ESTIMATE_JSON)
+    return estimator
+
+
+def test_batch_returns_results_in_order(estimator):
+    """estimate_prices_batch yields one parsed result per item"""
+    items = [{'query': 'Polaroid Land Camera 100'}, {'query': 'Ross NK-3G64', 'condition': 'New'}]
+
+    results = asyncio.run(estimator.estimate_prices_batch(items, concurrency=1))
+
+    assert [r['query'] for r in results] == ['Polaroid Land Camera 100', 'Ross NK-3G64']
+    assert results[0]['stats']['median'] == 20.0
+    assert len(estimator.client.aio.models.queries) == 2
+
+
+def test_exact_repeat_is_cached(estimator):
+    """Whitespace/case variants of a query hit the cache; other conditions don't"""
+    estimator.client.models.embeddings = {'Ross NK-3G64': [1.0, 0.0], 'ross  nk-3g64': [1.0, 0.0]}
+    estimator.estimate_price('Ross NK-3G64', condition='Used')
+    estimator.estimate_price('ross  nk-3g64', condition='Used')
+
+    assert len(estimator.client.models.queries) == 1
+    assert estimator.cache.get('missing') is None
+
+
+def test_exact_hit_is_a_copy(estimator):
+    """Editing a returned estimate doesn't change what the next lookup gets"""
+    first = estimator.estimate_price('Ross NK-3G64')
+    first['stats']['median'] = 0
+
+    assert estimator.estimate_price('Ross NK-3G64')['stats']['median'] == 20.0
+    assert len(estimator.client.models.queries) == 1
+
+
+def test_semantic_cache_is_opt_in(estimator):
+    """With the flag off, exact-key misses neither embed nor reuse similar queries"""
+    estimator.client.models.embeddings = {}  # an embed call would raise KeyError
+    estimator.estimate_price('Vintage Polaroid 100')
+    estimator.estimate_price('Polaroid Land Camera Model 100')
+
+    assert len(estimator.client.models.queries) == 2
+
+
+def test_similar_query_needs_same_model_numbers(estimator, monkeypatch):
+    """Near-identical embeddings don't match when the model numbers differ"""
+    monkeypatch.setattr(ai_price, 'SEMANTIC_CACHE_ENABLED', True)
+    estimator.client.models.embeddings = {'Apple iPhone 12 128GB': [1.0, 0.1], 'Apple iPhone 13 128GB': [1.0, 0.1]}
+    estimator.estimate_price('Apple iPhone 12 128GB')
+    other = estimator.estimate_price('Apple iPhone 13 128GB')
+
+    assert other['query'] == 'Apple iPhone 13 128GB'
+    assert len(estimator.client.models.queries) == 2
+
+
+def test_similar_query_reuses_estimate(estimator, monkeypatch):
+    """A query whose embedding is close to a cached one skips Gemini"""
+    monkeypatch.setattr(ai_price, 'SEMANTIC_CACHE_ENABLED', True)
+    estimator.client.models.embeddings = {
+        'Vintage Polaroid 100': [1.0, 0.1],
+        'Polaroid Land Camera Model 100': [1.0, 0.12],
+        'Canon AE-1': [0.0, 1.0],
+    }
+    estimator.estimate_price('Vintage Polaroid 100')
+    similar = estimator.estimate_price('Polaroid Land Camera Model 100')
+    estimator.estimate_price('Canon AE-1')
+
+    assert similar['query'] == 'Vintage Polaroid 100'
+    assert len(estimator.client.models.queries) == 2
+
+
+def test_extract_prices_from_prose():
+    """Dollar amounts in a non-JSON reply become a sorted price range"""
+    text = "Sold listings ranged from $1,250.00 down to $80, typically around $400.50."
+
+    result = AIPriceEstimator.__new__(AIPriceEstimator)._extract_from_text(text, 'Amp', [])
+
+    assert result['stats']['low'] == 80.0
+    assert result['stats']['median'] == 400.5
+    assert result['stats']['high'] == 1250.0
+
+
+def test_prose_fallback_is_not_cached(estimator):
+    """Regex-scraped estimates are returned but the next request asks Gemini again"""
+    estimator.client = fake_gemini_client('Sold listings went for about $20.')
+
+    first = estimator.estimate_price('Amp')
+    calls = estimator.client.models.calls
+    estimator.estimate_price('Amp')
+
+    assert first['ai_analysis']['pricing_notes'] == ai_price.FALLBACK_PRICING_NOTES
+    assert estimator.client.models.calls == 2 * calls
+
+
+def test_photos_uploaded_once(estimator, tmp_path, monkeypatch):
+    """Identical photos are uploaded once and sent as file references"""
+    monkeypatch.setattr(ai_price, '_UPLOADED_FILES', {})
+    uploads = []
+    estimator.client.files = type('Files', (), {'upload': lambda self, file: uploads.append(file) or f'file:{file}'})()
+    photo = tmp_path / 'a.jpg'
+    photo.write_bytes(b'jpeg bytes')
+    copy = tmp_path / 'b.jpg'
+    copy.write_bytes(b'jpeg bytes')
+
+    estimator.estimate_price('Amp', image_paths=[str(photo)])
+    estimator.estimate_price('Amp', condition='New', image_paths=[str(copy)])
+
+    assert uploads == [str(photo)]
+    assert estimator.client.models.queries[-1][1] == f'file:{photo}'
+
+
+def test_off_format_answer_restructured_in_json_mode(estimator):
+    """Prose from the grounded call gets one JSON-mode pass instead of regex scraping"""
+    calls = []
+
+    def generate_content(model, contents, config=None):
+        calls.append(config)
+        if config.response_schema is None:
+            return type('Response', (), {'text': 'Roughly $20 used.', 'candidates': None})()
+        parsed = {'estimate': {'low': 15, 'mid': 20, 'high': 25}, 'confidence': 'medium', 'reasoning': 'eBay solds'}
+        return type('Response', (), {'text': '', 'parsed': parsed})()
+
+    estimator.client.models.generate_content = generate_content
+    result = estimator.estimate_price('Amp')
+
+    assert calls[0].tools and calls[1].response_mime_type == 'application/json'
+    assert result['stats']['median'] == 20.0
+    assert result['ai_analysis']['confidence'] == 'medium'
+
+
+def test_queue_retries_rate_limits(estimator, monkeypatch):
+    """429s are retried with backoff; progress is reported per item"""
+    monkeypatch.setattr(ai_price, 'RETRY_BASE_DELAY', 0)
+    models = estimator.client.aio.models
+    respond = models.generate_content
+    failures = {'Amp 1': 1, 'Amp 2': 5}
+
+    async def flaky(model, contents, config=None):
+        item = contents.splitlines()[0].removeprefix('ITEM: ')
+        if failures.get(item, 0) > 0:
+            failures[item] -= 1
+            raise ai_price.errors.APIError(429, {'error': {'message': 'quota'}})
+        return await respond(model, contents, config)
+
+    models.generate_content = flaky
+    progress = []
+
+    async def run():
+        async with PriceEstimateQueue(estimator, max_qpm=6000, max_concurrency=2,
+                                      progress_callback=lambda done, total: progress.append(done)) as queue:
+            futures = [await queue.submit({'query': f'Amp {i}'}) for i in range(3)]
+            return await asyncio.gather(*futures)
+
+    results = asyncio.run(run())
+
+    assert [r['success'] for r in results] == [True, True, False]
+    assert '429' in results[2]['error']
+    assert sorted(progress) == [1, 2, 3]
@@ -0,0 +1,129 @@
+"""
+Test Suite for the eBay Analytics Service
+Tests order paging and summary math against a stubbed Fulfillment API.
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services.ebay import analytics
+from backend.app.services.ebay.analytics import AnalyticsService
+from helpers import FakeResponse
+
+
+def _order(i, day='2026-01-05', total='10.00', qty=1, title='Widget'):
+    return {
+        'orderId': f'O{i}',
+        'creationDate': f'{day}T10:00:00.000Z',
+        'pricingSummary': {'total': {'value': total}},
+        'lineItems': [{'title': title, 'quantity': qty, 'total': {'value': total}}],
+    }
+
+
+@pytest.fixture
+def fulfillment(monkeypatch):
+    """Serve `orders` in pages the way getOrders does"""
+    state = {'orders': [], 'offsets': []}
+    monkeypatch.setattr(analytics, 'HAS_IJSON', False)
+
+    def get(url, headers=None, params=None, **kwargs):
+        offset = params.get('offset', 0)
+        state['offsets'].append(offset)
+        page = state['orders'][offset:offset + params['limit']]
+        return FakeResponse({'orders': page, 'total': len(state['orders'])})
+
+    monkeypatch.setattr(analytics, '_get_headers', lambda: {})
+    monkeypatch.setattr(analytics._SESSION, 'get', get)
+    return state
+
+
+def test_summary_reads_every_page(fulfillment):
+    """Orders beyond the first 200 are fetched and counted"""
+    fulfillment['orders'] = [_order(i) for i in range(450)]
+
+    summary, status = AnalyticsService().get_analytics_summary()
+
+    assert status == 200
+    assert sorted(fulfillment['offsets']) == [0, 200, 400]
+    assert summary['orders_count'] == 450
+    assert summary['total_revenue'] == 4500.0
+
+
+def test_summary_totals(fulfillment):
+    """Revenue, chart buckets and best sellers are aggregated per day/title"""
+    fulfillment['orders'] = [
+        _order(1, day='2026-01-05', total='20.00', qty=2, title='Router'),
+        _order(2, day='2026-01-05', total='5.00', title='Cable'),
+        _order(3, day='2026-01-07', total='30.00', title='Router'),
+    ]
+
+    summary, _ = AnalyticsService().get_analytics_summary()
+
+    assert summary['items_sold'] == 4
+    assert summary['average_order_value'] == 18.33
+    assert {'date': '2026-01-05', 'sales': 25.0} in summary['chart_data']
+    assert {'date': '2026-01-07', 'sales': 30.0} in summary['chart_data']
+    assert summary['best_sellers'][0] == {'title': 'Router', 'qty': 3, 'revenue': 50.0}
+
+
+def test_best_sellers_capped_by_revenue(fulfillment):
+    """Only the top BEST_SELLER_COUNT titles by revenue are returned"""
+    fulfillment['orders'] = [_order(i, total=f'{i}.00', title=f'Item {i}') for i in range(1, 9)]
+
+    summary, _ = AnalyticsService().get_analytics_summary()
+
+    assert [item['title'] for item in summary['best_sellers']] == ['Item 8', 'Item 7', 'Item 6', 'Item 5', 'Item 4']
+
+
+def test_page_totals_merge():
+    """Totals reduced per page and merged match a single pass"""
+    orders = [_order(1, total='20.00', qty=2, title='Router'), _order(2, day='2026-01-06', total='5.00', title='Cable')]
+
+    merged = analytics._OrderTotals().add(orders[:1]).merge(analytics._OrderTotals().add(orders[1:]))
+    single = analytics._OrderTotals().add(orders)
+
+    assert merged.orders_count == single.orders_count == 2
+    assert merged.items_sold == single.items_sold == 3
+    assert merged.daily_sales == single.daily_sales
+    assert merged.item_sales == single.item_sales
+
+
+def test_chart_fills_missing_days():
+    """Days without orders appear with zero sales, in order"""
+    chart = analytics._daily_chart({'2026-01-05': 25.0, '2026-01-07': 30.0}, date(2026, 1, 4), date(2026, 1, 6))
+
+    assert chart == [
+        {'date': '2026-01-04', 'sales': 0.0},
+        {'date': '2026-01-05', 'sales': 25.0},
+        {'date': '2026-01-06', 'sales': 0.0},
+        {'date': '2026-01-07', 'sales': 30.0},
+    ]
+
+
+def test_expired_token_patched_in_place(fulfillment, monkeypatch):
+    """A refreshed token is swapped into the existing headers, not rebuilt"""
+    fulfillment['orders'] = [_order(1)]
+    header_builds = []
+    monkeypatch.setattr(analytics, '_get_headers', lambda: header_builds.append(1) or {'Authorization': 'Bearer OLD'})
+    monkeypatch.setattr(analytics, '_refresh_token_if_needed', lambda response: 'NEW')
+    serve = analytics._SESSION.get
+    seen = []
+
+    def get(url, headers=None, params=None, **kwargs):
+        seen.append(headers['Authorization'])
+        if headers['Authorization'] == 'Bearer OLD':
+            return FakeResponse({}, status_code=401)
+        return serve(url, headers=headers, params=params, **kwargs)
+
+    monkeypatch.setattr(analytics._SESSION, 'get', get)
+
+    summary, status = AnalyticsService().get_analytics_summary()
+
+    assert status == 200
+    assert seen == ['Bearer OLD', 'Bearer NEW']
+    assert len(header_builds) == 1
@@ -0,0 +1,64 @@
+"""
+Test Suite for the Google Books lookup service
+Tests batched and cached ISBN lookups against a stubbed API.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services import book_service
+from backend.app.services.book_service import BookService
+from helpers import FakeResponse
+
+
+def _volume(isbn, title):
+    return {'volumeInfo': {'title': title, 'industryIdentifiers': [{'type': 'ISBN_13', 'identifier': isbn}]}}
+
+
+@pytest.fixture
+def google_books(monkeypatch):
+    """Answer isbn: queries from `catalog`, recording each query string"""
+    state = {'catalog': {}, 'queries': []}
+
+    def get(url, params=None, **kwargs):
+        state['queries'].append(params['q'])
+        isbns = [term.removeprefix('isbn:') for term in params['q'].split(' OR ')]
+        items = [_volume(isbn, state['catalog'][isbn]) for isbn in isbns if isbn in state['catalog']]
+        return FakeResponse({'totalItems': len(items), 'items': items})
+
+    monkeypatch.setattr(book_service._SESSION, 'get', get)
+    book_service._fetch_isbn.cache_clear()
+    yield state
+    book_service._fetch_isbn.cache_clear()
+
+
+def test_lookup_isbns_batches_queries(google_books):
+    """Matched ISBNs come from one OR query; unmatched ones are retried singly"""
+    google_books['catalog'] = {'9780131103627': 'K&R', '9780201633610': 'Design Patterns'}
+
+    results = BookService().lookup_isbns(['9780131103627', '9780201633610', '9780000000002'])
+
+    assert results['9780131103627']['title'] == 'K&R'
+    assert results['9780201633610']['title'] == 'Design Patterns'
+    assert results['9780000000002'] == {'success': False, 'error': 'Book not found'}
+    assert google_books['queries'][0].count(' OR ') == 2
+    assert google_books['queries'][1:] == ['isbn:9780000000002']
+
+
+def test_lookup_isbn_cached(google_books):
+    """Repeat single lookups hit the cache, and callers get their own copy"""
+    google_books['catalog'] = {'9780131103627': 'K&R'}
+    service = BookService()
+
+    first = service.lookup_isbn('9780131103627')
+    first['title'] = 'changed'
+    first['authors'].append('changed')
+    second = service.lookup_isbn('9780131103627')
+
+    assert len(google_books['queries']) == 1
+    assert second['title'] == 'K&R'
+    assert second['authors'] == []
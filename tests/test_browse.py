@@ -0,0 +1,219 @@
+"""
+Test Suite for the eBay Browse API client
+Tests token handling and result parsing against a stubbed session.
+"""
+import asyncio
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services.ebay import browse
+from backend.app.services.ebay.browse import eBayBrowseAPI
+from helpers import FakeResponse
+
+
+def _summary(i, price):
+    return {
+        'title': f'Camera {i}',
+        'price': {'value': str(price)},
+        'condition': 'Used',
+        'itemWebUrl': f'https://www.ebay.com/itm/{i}',
+        'seller': {'username': 'seller'},
+    }
+
+
+@pytest.fixture
+def ebay(monkeypatch):
+    """Stub the token and search endpoints on the shared sessions"""
+    state = {'summaries': [], 'tokens': 0, 'searches': []}
+
+    def post(url, headers=None, data=None, timeout=None, **kwargs):
+        assert timeout == browse.REQUEST_TIMEOUT
+        state['tokens'] += 1
+        return FakeResponse({'access_token': f"T{state['tokens']}", 'expires_in': 7200})
+
+    def get(url, headers=None, params=None, timeout=None, **kwargs):
+        assert timeout == browse.REQUEST_TIMEOUT
+        state['searches'].append((headers['Authorization'], params))
+        if headers['Authorization'] in state.get('revoked', ()):
+            return FakeResponse({}, status_code=401)
+        offset = params.get('offset', 0)
+        return FakeResponse({'itemSummaries': state['summaries'][offset:offset + params['limit']]})
+
+    monkeypatch.setattr(browse._TOKEN_SESSION, 'post', post)
+    monkeypatch.setattr(browse._SESSION, 'get', get)
+    monkeypatch.setattr(browse, '_search_cache', OrderedDict())
+    return state
+
+
+def _new_client():
+    client = eBayBrowseAPI.__new__(eBayBrowseAPI)
+    client.app_id, client.cert_id = 'app', 'cert'
+    client._basic_auth_header = 'Basic YXBwOmNlcnQ='
+    client._inflight = {}
+    return client
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A client over fresh shared token state; the refresh timer is cancelled afterwards"""
+    monkeypatch.setattr(browse, '_token_state', {
+        'basic_auth': None, 'access_token': None, 'expiry': 0.0, 'search_headers': None, 'used': False
+    })
+    monkeypatch.setattr(browse, '_refresh_timer', None)
+    yield _new_client()
+    if browse._refresh_timer is not None:
+        browse._refresh_timer.cancel()
+
+
+def test_search_reuses_token(ebay, client):
+    """One token request serves repeated searches"""
+    ebay['summaries'] = [_summary(i, price) for i, price in enumerate([10, 20, 30])]
+
+    client.search_items('camera')
+    result = client.search_items('lens')
+
+    assert ebay['tokens'] == 1
+    assert [auth for auth, _ in ebay['searches']] == ['Bearer T1', 'Bearer T1']
+    assert result['stats']['median'] == 20
+    assert len(result['items']) == 3
+
+
+def test_search_many_keeps_query_order(ebay, client, monkeypatch):
+    """Concurrent searches return one result per query, in order"""
+    monkeypatch.setattr(browse, 'HAS_AIOHTTP', False)
+    ebay['summaries'] = [_summary(1, 15)]
+
+    results = asyncio.run(client.search_many(['camera', 'lens', 'tripod']))
+
+    assert len(results) == 3
+    assert ebay['tokens'] == 1
+    assert all(result['stats']['median'] == 15 for result in results)
+    assert sorted(params['q'] for _, params in ebay['searches']) == ['camera', 'lens', 'tripod']
+
+
+def test_expired_token_is_renewed(ebay, client, monkeypatch):
+    """Tokens are reused until expires_in (less a margin) has passed"""
+    now = [1000.0]
+    monkeypatch.setattr(browse.time, 'monotonic', lambda: now[0])
+
+    client.get_access_token()
+    now[0] += 7200 - browse.TOKEN_EXPIRY_MARGIN - 1
+    assert client.get_access_token() == 'T1'
+    now[0] += 2
+    assert client.get_access_token() == 'T2'
+
+
+def test_revoked_token_retried_once(ebay, client):
+    """A 401 drops the cached token and the search is retried with a new one"""
+    ebay['summaries'] = [_summary(1, 15)]
+    ebay['revoked'] = {'Bearer T1'}
+
+    result = client.search_items('camera')
+
+    assert [auth for auth, _ in ebay['searches']] == ['Bearer T1', 'Bearer T2']
+    assert result['stats']['median'] == 15
+
+
+def test_even_count_median_is_midpoint(client):
+    """With an even number of prices the median averages the middle two"""
+    stats, items = client._parse_and_summarize([_summary(i, price) for i, price in enumerate([40, 10, 30, 20])])
+
+    assert (stats['low'], stats['median'], stats['high']) == (10, 25, 40)
+    assert [item['price'] for item in items] == [40, 10, 30, 20]
+
+
+def test_search_many_pages_merges_offsets(ebay, client, monkeypatch):
+    """120 listings are fetched as three concurrent offset pages"""
+    monkeypatch.setattr(browse, 'HAS_AIOHTTP', False)
+    ebay['summaries'] = [_summary(i, 10 + i) for i in range(130)]
+
+    result = asyncio.run(client.search_many_pages('camera', 120))
+
+    pages = sorted((params.get('offset', 0), params['limit']) for _, params in ebay['searches'])
+    assert pages == [(0, 50), (50, 50), (100, 20)]
+    assert len(result['items']) == 120
+    assert result['stats']['high'] == 129
+
+
+def test_repeat_search_served_from_cache(ebay, client, monkeypatch):
+    """Identical searches within the TTL skip eBay and return independent copies"""
+    now = [1000.0]
+    monkeypatch.setattr(browse.time, 'monotonic', lambda: now[0])
+    ebay['summaries'] = [_summary(1, 15)]
+
+    first = client.search_items('camera')
+    first['items'].clear()
+    second = client.search_items('camera')
+    now[0] += browse.SEARCH_CACHE_TTL
+    client.search_items('camera')
+
+    assert len(second['items']) == 1
+    assert len(ebay['searches']) == 2
+
+
+def test_concurrent_identical_searches_coalesce(ebay, client, monkeypatch):
+    """Simultaneous async searches for one query make a single request"""
+    monkeypatch.setattr(browse, 'HAS_AIOHTTP', False)
+    ebay['summaries'] = [_summary(1, 15)]
+
+    async def run():
+        return await asyncio.gather(*(client.search_items_async('camera') for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert len(ebay['searches']) == 1
+    assert all(result['stats']['median'] == 15 for result in results)
+    assert client._inflight == {}
+
+
+def test_token_prefetched_before_expiry(ebay, client):
+    """A used token is renewed by the background timer; an idle one is left to lapse"""
+    client.get_access_token()
+    timer = browse._refresh_timer
+    assert timer.interval == pytest.approx(7200 * browse.TOKEN_PREFETCH_FRACTION)
+
+    browse._prefetch_token()
+    assert ebay['tokens'] == 2 and client.get_access_token() == 'T2'
+    assert browse._refresh_timer is not timer
+
+    browse._refresh_timer.cancel()
+    browse._token_state['used'] = False
+    browse._prefetch_token()  # not used since the last fetch
+    assert ebay['tokens'] == 2 and browse._refresh_timer is None
+
+
+def test_clients_share_one_token_and_timer(ebay, client):
+    """Per-request clients reuse the process-wide token instead of each arming a timer"""
+    threads_before = threading.active_count()
+
+    tokens = [_new_client().get_access_token() for _ in range(20)]
+
+    assert set(tokens) == {'T1'} and ebay['tokens'] == 1
+    assert threading.active_count() <= threads_before + 1
+
+
+def test_oversized_response_discarded(ebay, client, monkeypatch):
+    """Bodies past MAX_RESPONSE_BYTES are abandoned instead of parsed"""
+    monkeypatch.setattr(browse, 'MAX_RESPONSE_BYTES', 1024)
+    ebay['summaries'] = [_summary(i, 10) for i in range(50)]
+
+    assert client.search_items('camera') == client._empty_result()
+
+    ebay['summaries'] = [_summary(1, 15)]
+    assert client.search_items('lens')['stats']['median'] == 15
+
+
+def test_non_json_response_returns_empty_result(ebay, client, monkeypatch):
+    """An HTML error page with a 200 status is treated as a failed search"""
+    page = FakeResponse()
+    page.content = b'<html>Service Unavailable</html>'
+    monkeypatch.setattr(browse._SESSION, 'get', lambda *args, **kwargs: page)
+
+    assert client.search_items('camera') == client._empty_result()
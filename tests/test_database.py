@@ -0,0 +1,108 @@
+"""
+Test Suite for the SQLite persistence layer
+Tests engine setup and the JSON-backed model properties.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.core import database
+from backend.app.core.database import init_db, JobModel, TemplateModel
+
+
+@pytest.fixture
+def session_factory():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        factory = init_db(Path(tmpdir) / "test.db")
+        yield factory
+        factory.kw['bind'].dispose()
+
+
+def test_timing_round_trip(session_factory):
+    """timing survives a commit and reload"""
+    with session_factory() as session:
+        job = JobModel(id="JOB1", folder_path="/tmp/item", folder_name="item")
+        job.timing = {'total': 12.5, 'ai_analysis': 3.1}
+        session.add(job)
+        session.commit()
+
+    with session_factory() as session:
+        job = session.query(JobModel).filter_by(id="JOB1").first()
+        assert job.timing == {'total': 12.5, 'ai_analysis': 3.1}
+
+
+def test_timing_parsed_once(session_factory, monkeypatch):
+    """Repeated reads reuse the decoded value until the column changes"""
+    parsed = []
+    loads = database.json_utils.loads
+    monkeypatch.setattr(database.json_utils, 'loads', lambda raw: parsed.append(raw) or loads(raw))
+    job = JobModel(id="JOB2", folder_path="/tmp/item", folder_name="item")
+    job.timing_json = '{"total": 1.0}'
+
+    assert job.timing == job.timing == {'total': 1.0}
+    assert len(parsed) == 1
+
+    job.timing_json = '{"total": 2.0}'
+    assert job.timing == {'total': 2.0}
+    assert len(parsed) == 2
+
+
+def test_in_place_edits_do_not_diverge_from_column(session_factory):
+    """Mutating a decoded dict changes neither later reads nor the stored JSON; the setter does"""
+    with session_factory() as session:
+        template = TemplateModel(name="t1")
+        template.data = {'price': '10'}
+        session.add(template)
+        session.commit()
+
+        template.data.update(price='99')
+        template.data['shipping'] = 'free'
+        assert template.data == {'price': '10'}
+        assert not session.dirty
+
+        data = template.data
+        data['price'] = '12'
+        template.data = data
+        data['price'] = 'later edit'
+        session.commit()
+
+    with session_factory() as session:
+        assert session.query(TemplateModel).filter_by(name="t1").first().data == {'price': '12'}
+
+
+def test_template_data_defaults_to_empty(session_factory):
+    """Missing data_json decodes to an empty dict"""
+    template = TemplateModel(name="empty")
+
+    assert template.data == {}
+
+
+def test_job_indexes_created(session_factory):
+    """Queue dispatch indexes exist on a fresh database"""
+    indexes = {ix['name'] for ix in inspect(session_factory.kw['bind']).get_indexes('jobs')}
+
+    assert {'ix_jobs_status', 'ix_jobs_status_created'} <= indexes
+
+
+def test_init_db_reuses_engine(session_factory):
+    """Repeated init_db calls for one file share a single session factory"""
+    db_path = Path(session_factory.kw['bind'].url.database)
+
+    assert init_db(db_path) is session_factory
+
+
+def test_template_resave_bumps_updated_at(tmp_path):
+    """Saving a template again, even with identical data, moves updated_at forward"""
+    from backend.app.services.template_manager import TemplateManager
+    manager = TemplateManager(tmp_path / "templates.db")
+
+    first = manager.save("t1", {'price': '10'})
+    second = manager.save("t1", {'price': '10'})
+
+    assert second.updated_at > first.updated_at
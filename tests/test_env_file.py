@@ -0,0 +1,47 @@
+"""
+Test Suite for cached .env parsing
+"""
+import os
+import sys
+from pathlib import Path
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.core import env_file
+
+
+def test_read_env_cached_until_file_changes(tmp_path):
+    """Unchanged files are parsed once; a rewrite is picked up"""
+    env = tmp_path / ".env"
+    env.write_text("# comment\nEBAY_APP_ID = app\nEBAY_USER_TOKEN=v1=abc\nEBAY_RU_NAME='Name With Spaces'\n")
+    env_file._parse_env.cache_clear()
+
+    first = env_file.read_env(env)
+    first['EBAY_APP_ID'] = 'mutated'
+    second = env_file.read_env(env)
+
+    assert second == {'EBAY_APP_ID': 'app', 'EBAY_USER_TOKEN': 'v1=abc', 'EBAY_RU_NAME': 'Name With Spaces'}
+    assert env_file._parse_env.cache_info().misses == 1
+
+    env.write_text("EBAY_APP_ID=app\nEBAY_USER_TOKEN=v2\n")
+    os.utime(env, ns=(env.stat().st_atime_ns, env.stat().st_mtime_ns + 1_000_000))
+
+    assert env_file.read_env(env)['EBAY_USER_TOKEN'] == 'v2'
+
+
+def test_missing_env_is_empty(tmp_path):
+    assert env_file.read_env(tmp_path / ".env") == {}
+
+
+def test_write_env_replaces_file(tmp_path):
+    """write_env swaps in the new contents, leaves no temp file, and readers see it"""
+    env = tmp_path / ".env"
+    env.write_text("EBAY_USER_TOKEN=old\n")
+    env_file._parse_env.cache_clear()
+    assert env_file.read_env(env)['EBAY_USER_TOKEN'] == 'old'
+
+    env_file.write_env(env, "EBAY_USER_TOKEN=new\n")
+
+    assert env_file.read_env(env)['EBAY_USER_TOKEN'] == 'new'
+    assert [p.name for p in tmp_path.iterdir()] == ['.env']
@@ -0,0 +1,272 @@
+"""
+Test Suite for the eBay Inventory Service
+Tests offer and inventory item calls against a stubbed Inventory API.
+"""
+import asyncio
+import json
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services.ebay import inventory
+from backend.app.services.ebay.inventory import InventoryService
+from helpers import FakeResponse
+
+
+@pytest.fixture
+def ebay(monkeypatch):
+    """
+    Stub the Inventory API on the shared session.
+
+    `offers` maps offerId -> offer payload and `skus` maps sku -> inventory
+    item; every call is logged to `calls` as (method, path, params, body).
+    """
+    state = {'offers': {}, 'items': [], 'skus': {}, 'calls': []}
+    lock = threading.Lock()
+
+    def request(method, url, params=None, data=None, **kwargs):
+        path = url.removeprefix('https://api.ebay.com/sell/inventory/v1')
+        body = json.loads(data) if data else None
+        with lock:
+            state['calls'].append((method, path, params, body))
+        if path.startswith('/offer/'):
+            offer_id = path.split('/')[2]
+            if offer_id not in state['offers']:
+                return FakeResponse({}, status_code=404)
+            if method == 'PUT':
+                state['offers'][offer_id] = body
+                return FakeResponse(None, status_code=204)
+            return FakeResponse(state['offers'][offer_id])
+        if path.startswith('/inventory_item/'):
+            sku = path.split('/')[2]
+            if method == 'PUT':
+                state['skus'][sku] = body
+                return FakeResponse(None, status_code=204)
+            if sku not in state['skus']:
+                return FakeResponse({}, status_code=404)
+            return FakeResponse(state['skus'][sku])
+        if path == '/bulk_create_or_replace_inventory_item':
+            responses = []
+            for entry in body['requests']:
+                if entry['sku'] in state['skus']:
+                    state['skus'][entry['sku']] = entry
+                    responses.append({'sku': entry['sku'], 'statusCode': 200})
+                else:
+                    responses.append({'sku': entry['sku'], 'statusCode': 400, 'errors': [{'errorId': 25702}]})
+            return FakeResponse({'responses': responses}, status_code=207)
+        if path == '/inventory_item':
+            page = state['items'][params['offset']:params['offset'] + params['limit']]
+            return FakeResponse({'inventoryItems': page, 'total': len(state['items'])})
+        return FakeResponse({}, status_code=404)
+
+    monkeypatch.setattr(inventory._SESSION, 'request', request)
+    monkeypatch.setattr(inventory, '_get_headers', lambda: {'Authorization': 'Bearer T'})
+    monkeypatch.setattr(inventory, '_refresh_token_if_needed', lambda response: None)
+    monkeypatch.setattr(inventory, '_get_cache', OrderedDict())
+
+    def handle_async(req):
+        params = {key: int(value) if value.isdigit() else value for key, value in req.url.params.items()} or None
+        response = request(req.method, str(req.url.copy_with(query=None)), params=params, data=req.content)
+        return httpx.Response(response.status_code, content=response.content)
+
+    monkeypatch.setattr(InventoryService, '_async_client', lambda self: httpx.AsyncClient(
+        base_url='https://api.ebay.com/sell/inventory/v1',
+        headers={'Authorization': 'Bearer T'},
+        transport=httpx.MockTransport(handle_async)
+    ))
+    return state
+
+
+def _listings(count):
+    """Offers 0..count-1, each with an inventory item SKU0..SKUn"""
+    offers = {str(i): {'offerId': str(i), 'sku': f'SKU{i}'} for i in range(count)}
+    skus = {f'SKU{i}': {'sku': f'SKU{i}', 'condition': 'USED_GOOD', 'product': {'title': 'old', 'brand': 'Acme'}} for i in range(count)}
+    return offers, skus
+
+
+def test_bulk_update_titles_batches_item_writes(ebay):
+    """Titles go out in bulk item writes of 25; results keep request order and report failures"""
+    ebay['offers'], ebay['skus'] = _listings(30)
+    del ebay['skus']['SKU5']
+    updates = [{'offerId': str(i), 'title': f'New {i}'} for i in range(30)] + [{'offerId': 'missing', 'title': 'x'}]
+
+    result, status = InventoryService().bulk_update_titles(updates)
+
+    assert status == 200
+    assert result['updated'] == 29 and result['failed'] == 2
+    assert [entry['offerId'] for entry in result['details']['success']] == [str(i) for i in range(30) if i != 5]
+    assert {entry['offerId'] for entry in result['details']['failed']} == {'5', 'missing'}
+    assert ebay['skus']['SKU7']['product'] == {'title': 'New 7', 'brand': 'Acme'}
+    assert ebay['skus']['SKU7']['condition'] == 'USED_GOOD'
+    batches = [len(body['requests']) for method, path, _, body in ebay['calls'] if path == '/bulk_create_or_replace_inventory_item']
+    assert batches == [25, 4]
+
+
+def test_bulk_update_titles_async_matches_sync(ebay):
+    """The async variant applies the same updates and reports the same shape"""
+    ebay['offers'], ebay['skus'] = _listings(5)
+    updates = [{'offerId': str(i), 'title': f'New {i}'} for i in range(5)] + [{'offerId': 'missing', 'title': 'x'}]
+
+    result, status = asyncio.run(InventoryService().bulk_update_titles_async(updates))
+
+    assert status == 200
+    assert result['updated'] == 5 and result['failed'] == 1
+    assert [entry['offerId'] for entry in result['details']['success']] == [str(i) for i in range(5)]
+    assert ebay['skus']['SKU3']['product']['title'] == 'New 3'
+
+
+def test_get_inventory_items_fetches_every_page(ebay):
+    """Inventories past one page are fetched at the API's page size and merged in order"""
+    ebay['items'] = [{'sku': f'SKU{i}', 'product': {'title': f'Item {i}'}} for i in range(450)]
+
+    result, status = InventoryService().get_inventory_items()
+
+    assert status == 200
+    assert result['total'] == 450
+    assert [item['sku'] for item in result['listings']] == [f'SKU{i}' for i in range(450)]
+    pages = sorted(params['offset'] for method, path, params, _ in ebay['calls'] if path == '/inventory_item')
+    assert pages == [0, 200, 400]
+
+
+def test_inventory_count_reads_one_item_page(ebay):
+    """get_inventory_count takes 'total' from a limit=1 page rather than paging every item"""
+    ebay['items'] = [{'sku': f'SKU{i}', 'product': {'title': f'Item {i}'}} for i in range(450)]
+
+    result, status = InventoryService().get_inventory_count()
+
+    assert status == 200
+    assert result == {'total': 450}
+    assert [params for _, path, params, _ in ebay['calls']] == [{'limit': 1, 'offset': 0}]
+
+
+def test_offer_gets_cached_until_written(ebay):
+    """Repeat get_offer calls are served from cache; a write to the offer invalidates it"""
+    ebay['offers'] = {'1': {'offerId': '1', 'status': 'PUBLISHED'}}
+    service = InventoryService()
+
+    first, _ = service.get_offer('1')
+    first['status'] = 'mutated'
+    second, _ = service.get_offer('1')
+    service.withdraw_listing('1')
+    ebay['offers']['1']['status'] = 'UNPUBLISHED'
+    third, _ = service.get_offer('1')
+
+    offer_gets = [call for call in ebay['calls'] if call[:2] == ('GET', '/offer/1')]
+    assert len(offer_gets) == 2
+    assert second['status'] == 'PUBLISHED'
+    assert third['status'] == 'UNPUBLISHED'
+
+
+def test_item_edits_merge_onto_a_live_get(ebay):
+    """Every edit re-reads the item, so a change made between edits survives the full PUT"""
+    ebay['skus'] = {'A1': {'sku': 'A1', 'product': {'title': 'Old', 'description': 'Desc', 'brand': 'Acme'}}}
+    service = InventoryService()
+
+    assert service.update_inventory_item('A1', {'title': 'New'}) == ({'success': True}, 200)
+    ebay['skus']['A1']['condition'] = 'USED_GOOD'  # changed by another client
+    assert service.update_inventory_item('A1', {'description': 'Better'}) == ({'success': True}, 200)
+
+    methods = [method for method, path, _, _ in ebay['calls'] if path == '/inventory_item/A1']
+    assert methods == ['GET', 'PUT', 'GET', 'PUT']
+    assert ebay['skus']['A1']['product'] == {'title': 'New', 'description': 'Better', 'brand': 'Acme'}
+    assert ebay['skus']['A1']['condition'] == 'USED_GOOD'
+
+
+def test_rate_limited_requests_back_off_and_retry(ebay, monkeypatch):
+    """A 401 refreshes the token once; a 429 is retried after its Retry-After delay"""
+    ebay['offers'] = {'1': {'offerId': '1'}}
+    sleeps, statuses = [], [401, 429]
+    stub_request = inventory._SESSION.request
+
+    def flaky(method, url, **kwargs):
+        if not statuses:
+            return stub_request(method, url, **kwargs)
+        response = FakeResponse({}, status_code=statuses.pop(0))
+        response.headers = {'Retry-After': '2'}
+        return response
+
+    monkeypatch.setattr(inventory._SESSION, 'request', flaky)
+    monkeypatch.setattr(inventory, '_refresh_token_if_needed', lambda response: 'T2')
+    monkeypatch.setattr(inventory.time, 'sleep', sleeps.append)
+
+    offer, status = InventoryService().get_offer('1')
+
+    assert (offer, status) == ({'offerId': '1'}, 200)
+    assert sleeps == [2.0]
+
+
+def test_listing_details_fetches_offer_and_item_together(ebay, monkeypatch):
+    """Both GETs are in flight at once, and a shared 401 refreshes the token only once"""
+    ebay['offers'], ebay['skus'] = _listings(1)
+    ebay['offers']['0']['pricingSummary'] = {'price': {'value': '9.99', 'currency': 'USD'}}
+    both_sent = threading.Barrier(2, timeout=5)
+    token, refreshes = ['T'], []
+    stub_request = inventory._SESSION.request
+
+    def offers_by_sku(method, url, params=None, headers=None, **kwargs):
+        if headers['Authorization'] == 'Bearer T':
+            both_sent.wait()
+            return FakeResponse({}, status_code=401)
+        if url.endswith('/offer'):
+            offers = [offer for offer in ebay['offers'].values() if offer['sku'] == params['sku']]
+            return FakeResponse({'offers': offers})
+        return stub_request(method, url, params=params, **kwargs)
+
+    def refresh(response):
+        refreshes.append(response.status_code)
+        token[0] = 'T2'
+        return 'T2'
+
+    monkeypatch.setattr(inventory._SESSION, 'request', offers_by_sku)
+    monkeypatch.setattr(inventory, '_get_headers', lambda: {'Authorization': f'Bearer {token[0]}'})
+    monkeypatch.setattr(inventory, '_refresh_token_if_needed', refresh)
+
+    details, status = InventoryService().get_listing_details('SKU0')
+
+    assert status == 200
+    assert details['price'] == 9.99 and details['title'] == 'old'
+    assert refreshes == [401]
+
+
+def test_every_request_is_sent_with_a_timeout(ebay, monkeypatch):
+    """Plain calls get the default (connect, read) timeout; the price/quantity batch a longer read"""
+    ebay['offers'] = {'1': {'offerId': '1'}}
+    timeouts = []
+    stub_request = inventory._SESSION.request
+
+    def timed(method, url, timeout=None, **kwargs):
+        timeouts.append((url.rsplit('/', 1)[-1], timeout))
+        if url.endswith('/bulk_update_price_quantity'):
+            return FakeResponse({'responses': []})
+        return stub_request(method, url, **kwargs)
+
+    monkeypatch.setattr(inventory._SESSION, 'request', timed)
+    service = InventoryService()
+    service.get_offer('1')
+    service.bulk_update([{'sku': 'SKU1', 'quantity': 2}])
+
+    assert timeouts == [('1', inventory._TIMEOUT), ('bulk_update_price_quantity', inventory._BULK_TIMEOUT)]
+
+
+@pytest.mark.parametrize('run', [
+    lambda updates: InventoryService().bulk_update_titles(updates),
+    lambda updates: asyncio.run(InventoryService().bulk_update_titles_async(updates)),
+], ids=['sync', 'async'])
+def test_bulk_titles_replace_with_live_quantity(ebay, run):
+    """A title edit re-reads the item, so a sale inside the cache window isn't undone"""
+    ebay['offers'], ebay['skus'] = _listings(1)
+    ebay['skus']['SKU0']['availability'] = {'shipToLocationAvailability': {'quantity': 3}}
+    InventoryService().get_inventory_item('SKU0')  # cached with quantity 3
+    ebay['skus']['SKU0']['availability'] = {'shipToLocationAvailability': {'quantity': 0}}  # sold out elsewhere
+
+    run([{'offerId': '0', 'title': 'New'}])
+
+    assert ebay['skus']['SKU0']['availability']['shipToLocationAvailability']['quantity'] == 0
+    assert ebay['skus']['SKU0']['product']['title'] == 'New'
@@ -0,0 +1,103 @@
+"""
+Test Suite for UI Blueprint static serving
+Tests caching headers and conditional responses for the Vite build output.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app import create_app
+
+APP_DIR = Path(__file__).resolve().parent.parent / 'static' / 'app'
+
+
+@pytest.fixture(scope='module')
+def client():
+    app = create_app()
+    return app.test_client()
+
+
+def _hashed_asset() -> str:
+    """Pick any content-hashed bundle from the build output"""
+    return 'assets/' + next(f.name for f in (APP_DIR / 'assets').iterdir() if f.suffix == '.js')
+
+
+def test_hashed_assets_are_immutable(client):
+    """Hashed bundles get a one-year immutable cache"""
+    resp = client.get(f'/app/{_hashed_asset()}')
+
+    assert resp.status_code == 200
+    assert resp.cache_control.public
+    assert resp.cache_control.max_age == 31536000
+    assert resp.cache_control.immutable
+    assert not resp.cache_control.no_cache
+
+
+def test_icons_revalidate_daily(client):
+    """Unhashed PWA icons get a short cache and an ETag, never immutable"""
+    resp = client.get('/icons/icon-192.png')
+
+    assert resp.status_code == 200
+    assert resp.cache_control.max_age == 86400
+    assert not resp.cache_control.immutable
+    assert client.get('/icons/icon-192.png', headers={'If-None-Match': resp.headers['ETag']}).status_code == 304
+
+
+@pytest.mark.parametrize('url', ['/app/', '/app/some/spa/route', '/sw.js', '/manifest.json', '/offline.html'])
+def test_entry_points_revalidate(client, url):
+    """index.html / sw.js / manifests must revalidate with an ETag"""
+    resp = client.get(url)
+
+    assert resp.status_code == 200
+    assert resp.cache_control.max_age == 0
+    assert resp.cache_control.must_revalidate
+    assert resp.headers.get('ETag')
+
+
+def test_entry_point_conditional_get(client):
+    """Matching If-None-Match returns 304"""
+    etag = client.get('/sw.js').headers['ETag']
+
+    resp = client.get('/sw.js', headers={'If-None-Match': etag})
+
+    assert resp.status_code == 304
+
+
+@pytest.mark.parametrize('accept, encoding', [('br, gzip', 'br'), ('gzip', 'gzip'), ('identity', None)])
+def test_precompressed_variants(client, accept, encoding):
+    """Pre-compressed siblings are negotiated via Accept-Encoding"""
+    resp = client.get(f'/app/{_hashed_asset()}', headers={'Accept-Encoding': accept})
+
+    assert resp.status_code == 200
+    assert resp.content_encoding == encoding
+    assert resp.mimetype == 'text/javascript'
+    assert 'Accept-Encoding' in resp.vary
+
+
+def test_dashboard_shell_conditional_get(client):
+    """The mobile dashboard shell carries a strong ETag and supports 304s"""
+    first = client.get('/')
+    etag = first.headers['ETag']
+
+    resp = client.get('/', headers={'If-None-Match': etag})
+
+    assert first.status_code == 200
+    assert not etag.startswith('W/')
+    assert resp.status_code == 304
+    assert resp.data == b''
+
+
+def test_known_files_use_x_sendfile_when_enabled():
+    """sw.js and friends follow USE_X_SENDFILE like the other static routes"""
+    app = create_app()
+    app.config['USE_X_SENDFILE'] = True
+
+    resp = app.test_client().get('/sw.js')
+
+    assert resp.status_code == 200
+    assert resp.headers['X-Sendfile'].endswith('sw.js')
+    assert resp.cache_control.must_revalidate
@@ -188,7 +188,7 @@ def create_listing_from_folder(folder_path, price="29.99", condition="USED_EXCEL
         from backend.app.services.ai_analyzer import AIAnalyzer
         
         print("\n[AI] Analyzing images with AI...")
-        analyzer = AIAnalyzer()
+        analyzer = AIAnalyzer.get_instance()
         ai_data = analyzer.analyze_item([str(img) for img in images])
         
         title = ai_data.get('listing', {}).get('suggested_title', folder_path.name)
@@ -535,7 +535,7 @@ def create_listing_structured(folder_path, price="29.99", condition="USED_EXCELL
     ai_start = time.time()
     try:
         from backend.app.services.ai_analyzer import AIAnalyzer
-        analyzer = AIAnalyzer()
+        analyzer = AIAnalyzer.get_instance()
         ai_data = analyzer.analyze_item([str(img) for img in images])
         
         title = ai_data.get('listing', {}).get('suggested_title', folder_path.name)
@@ -166,7 +166,7 @@ def create_research_draft(
     print("=" * 60)
     
     from backend.app.services.ai_analyzer import AIAnalyzer
-    analyzer = AIAnalyzer()
+    analyzer = AIAnalyzer.get_instance()
     
     if use_research:
         analysis = analyzer.analyze_with_research(image_paths)